@@ -0,0 +1 @@
+# Intentially Left Blank
\ No newline at end of file
@@ -0,0 +1,77 @@
+# External Imports
+import copy
+
+# Internal Imports
+from benchmarks.fixtures import make_full_board, make_upkeep_state, make_combat_state
+from benchmarks.harness import Benchmark
+from game.phases import AdventurePhase, ExplorePhase
+from game.replay import ScriptedConnection
+
+BOARD_SIZES = (8, 16, 32, 64)
+
+def _path_benchmark(size: int) -> Benchmark:
+    state = make_full_board(size)
+    return Benchmark(f"check_path_between_gates[{size}x{size}]", state.check_path_between_gates,
+                     number=max(1, 2048 // (size * size)), rounds=15)
+
+def _combat_setup(template):
+    def setup():
+        state, choice = copy.deepcopy(template)
+        return AdventurePhase(state, ScriptedConnection([choice])), "Player1"
+    return setup
+
+def _combat(phase, player):
+    phase._step_combat(player)
+
+# A full board with a handful of Ruins placed face down this turn
+def _reveal_setup(template, placed: int):
+    def setup():
+        state = copy.deepcopy(template)
+        for i in range(placed):
+            pos = (i % state.rows, (i * 7) % state.cols)
+            state.map.set_face_up(pos, False)
+            state.pending_reveals.append(pos)
+        return ExplorePhase(state, (ScriptedConnection([]), ScriptedConnection([]))),
+    return setup
+
+# The Player1 hero walking along the bottom row of a full board, through whatever tile rules it meets
+def _move_setup(template):
+    def setup():
+        state = copy.deepcopy(template)
+        hero = state.players[0].hero
+        hero.movement, hero.health = 5, 10 ** 6
+        state.occupants = {state.gate_positions["Player1"]: [("Player1", hero)]}
+        state.moved_units = set()
+        return AdventurePhase(state, ScriptedConnection([])), state
+    return setup
+
+def _walk(phase, state, moves: int = 100):
+    row, col = state.gate_positions["Player1"]
+    for i in range(moves):
+        step = 1 if (i // (state.cols - 1)) % 2 == 0 else -1
+        phase._move("Player1", {"from": (row, col), "to": (row, col + step)})
+        state.exhausted_units.clear()
+        col += step
+
+def benchmarks():
+    benches = [_path_benchmark(size) for size in BOARD_SIZES]
+
+    upkeep_template = make_upkeep_state()
+    benches.append(Benchmark("pay_upkeep[30 units, 10 relics]",
+                             lambda state: state.pay_upkeep(),
+                             setup=lambda: copy.deepcopy(upkeep_template), rounds=30))
+
+    for size in (16, 64):
+        template = make_full_board(size)
+        benches.append(Benchmark(f"_step_reveal_and_resolve[{size}x{size}, 8 placed]",
+                                 lambda phase: phase._step_reveal_and_resolve(),
+                                 setup=_reveal_setup(template, 8), rounds=15))
+
+    move_template = make_full_board(64)
+    benches.append(Benchmark("_move[64x64, 100 moves]", _walk, setup=_move_setup(move_template), rounds=15))
+
+    for attacks in (10, 100):
+        template = make_combat_state(attacks)
+        benches.append(Benchmark(f"_step_combat[{attacks} attacks]", _combat,
+                                 setup=_combat_setup(template), rounds=15))
+    return benches
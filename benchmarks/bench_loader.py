@@ -0,0 +1,10 @@
+# Internal Imports
+from benchmarks.harness import Benchmark
+from resources.loader import load_all_cards, load_ruins, load_heroes
+
+def benchmarks():
+    return [
+        Benchmark("load_ruins", load_ruins, rounds=20),
+        Benchmark("load_heroes", load_heroes, rounds=20),
+        Benchmark("load_all_cards", load_all_cards, rounds=10),
+    ]
@@ -0,0 +1,48 @@
+# External Imports
+import random
+
+# Internal Imports
+from benchmarks.harness import Benchmark
+from network.matchmaking import MatchmakingQueue, Ticket
+
+DECKS = [{"hero": f"hero{i}", "gate": f"gate{i}"} for i in range(4)]
+
+def _tickets(count: int, seed: int = 1234):
+    rng = random.Random(seed)
+    return [Ticket(f"p{i}", None, rng.gauss(1500, 300), DECKS[rng.randrange(len(DECKS))], 0.0)
+            for i in range(count)]
+
+# Fill an empty queue with `count` players arriving at 100 per simulated second
+def _enqueue_all(queue, tickets):
+    pairs = 0
+    for i, ticket in enumerate(tickets):
+        ticket.enqueued_at = i / 100.0
+        if queue.enqueue(ticket, now=ticket.enqueued_at):
+            pairs += 1
+    return pairs
+
+# Widen windows on a queue of players who have all waited a while
+def _tick_backlog(queue):
+    queue.tick(now=30.0, budget=len(queue))
+
+def _backlog(count: int):
+    def setup():
+        # Narrow, slow-growing windows leave a realistic backlog to drain
+        queue = MatchmakingQueue(base_window=5.0, widen_per_second=0.0)
+        for ticket in _tickets(count):
+            ticket.enqueued_at = 0.0
+            ticket.active = True
+            queue.enqueue(ticket, now=0.0)
+        queue.widen_per_second = 25.0
+        return queue
+    return setup
+
+def benchmarks():
+    benches = []
+    for count in (1_000, 10_000):
+        benches.append(Benchmark(
+            f"matchmaking_enqueue[{count} players]", _enqueue_all,
+            setup=lambda count=count: (MatchmakingQueue(), _tickets(count)), rounds=10))
+        benches.append(Benchmark(
+            f"matchmaking_tick[{count} waiting]", _tick_backlog, setup=_backlog(count), rounds=10))
+    return benches
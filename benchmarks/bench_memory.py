@@ -0,0 +1,90 @@
+# External Imports
+import dataclasses
+import gc
+import random
+import tracemalloc
+
+# Internal Imports
+from benchmarks.harness import Benchmark
+from game.init import build_game_state, prepare_match
+from resources.loader import CARDS, card_pool, current_cards, load_ruins, load_minions, load_gears, load_spells, load_relics, load_glyphs, load_gates, load_heroes
+
+LOADERS = (load_ruins, load_minions, load_gears, load_spells, load_relics, load_glyphs, load_gates, load_heroes)
+
+# Bytes still allocated after building `count` objects, per object
+def retained_bytes(build, count: int) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build() for _ in range(count)]
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) // count
+
+def _load_everything():
+    return [loader() for loader in LOADERS]
+
+def _load_everything_mutable():
+    return [[_MutableCard(card) for card in loader()] for loader in LOADERS]
+
+# A seeded match ready for its first Explore turn
+def _new_match(seed: int = 1234):
+    pool = card_pool()
+    choice1 = {"hero": pool["heroes"][0], "gate": pool["gates"][0]}
+    choice2 = {"hero": pool["heroes"][1], "gate": pool["gates"][1]}
+    state, _ = build_game_state(choice1, choice2, rng=random.Random(seed))
+    prepare_match(state)
+    return state
+
+# Stand-in for a card from before prototypes were frozen: a __dict__ per card and lists for its
+# collections
+class _MutableCard:
+    def __init__(self, card):
+        for field in dataclasses.fields(card):
+            value = getattr(card, field.name)
+            setattr(self, field.name, list(value) if isinstance(value, tuple) else value)
+
+# Baseline for _new_match: the match loads every card set itself into mutable cards of its own,
+# as every match did before they were dealt from the shared pool
+def _new_match_own_cards(seed: int = 1234):
+    cards = current_cards()
+    pool = {kind: tuple(_MutableCard(card) for card in loader()) for kind, (_, loader) in CARDS.sources.items()}
+    choice1 = {"hero": pool["heroes"][0], "gate": pool["gates"][0]}
+    choice2 = {"hero": pool["heroes"][1], "gate": pool["gates"][1]}
+    state, _ = build_game_state(choice1, choice2, rng=random.Random(seed), cards=dataclasses.replace(cards, pool=pool))
+    prepare_match(state)
+    return state
+
+# What a worker pays for the numeric card tables: building its own against attaching to the copy
+# published in shared memory. Needs NumPy.
+def _card_table_benchmarks():
+    try:
+        from resources.card_table import CardTable, publish_card_table
+    except ImportError:
+        print("numpy not installed, skipping card table benchmarks")
+        return []
+    shared = publish_card_table()
+    attach = lambda: CardTable.attach(shared.name)
+    return [
+        Benchmark("memory: build card table", CardTable.build, rounds=20,
+                  extra={"cards": len(shared.cards), "bytes_per_process": retained_bytes(CardTable.build, 10)}),
+        Benchmark("memory: attach shared card table", attach, rounds=20,
+                  extra={"shared_bytes": shared.shm.size, "bytes_per_process": retained_bytes(attach, 10)}),
+    ]
+
+def benchmarks():
+    cards = sum(len(cards) for cards in _load_everything())
+    # Warm the shared card pool and compiled-rule cache so only per-match state is counted
+    _new_match()
+    return _card_table_benchmarks() + [
+        Benchmark("memory: load every card set", _load_everything, rounds=5,
+                  extra={"cards": cards, "bytes_per_card": retained_bytes(_load_everything, 3) // cards}),
+        Benchmark("memory: load every card set (baseline: mutable cards)", _load_everything_mutable, rounds=5,
+                  extra={"cards": cards, "bytes_per_card": retained_bytes(_load_everything_mutable, 3) // cards}),
+        Benchmark("memory: build one match", _new_match, rounds=20,
+                  extra={"bytes_per_match": retained_bytes(_new_match, 20)}),
+        Benchmark("memory: build one match (baseline: own mutable cards)", _new_match_own_cards, rounds=5,
+                  extra={"bytes_per_match": retained_bytes(_new_match_own_cards, 5)}),
+    ]
@@ -0,0 +1,31 @@
+# External Imports
+import copy
+
+# Internal Imports
+from benchmarks.harness import Benchmark
+from game.headless import explore_turns
+
+BATCH = 1024
+
+# Snapshots of every Explore turn from a few seeded headless matches, repeated to fill a batch
+def _headless_states(count: int):
+    states = []
+    seed = 0
+    while len(states) < count:
+        states.extend(copy.deepcopy(state) for state in explore_turns(seed))
+        seed += 1
+    return states[:count]
+
+def benchmarks():
+    try:
+        from game.observation import ObservationEncoder
+    except ImportError:
+        print("numpy not installed, skipping observation benchmarks")
+        return []
+    states = _headless_states(BATCH)
+    encoder = ObservationEncoder(states[0].rows, states[0].cols, capacity=BATCH)
+    # Each state's board builds its dense codes on the first encode (the warmup rounds)
+    return [
+        Benchmark(f"encode_observations[{BATCH} states]", encoder.encode, setup=lambda: (states,),
+                  rounds=20, extra={"states": BATCH}),
+    ]
@@ -0,0 +1,38 @@
+# Internal Imports
+from benchmarks.fixtures import make_state, make_full_board
+from benchmarks.harness import Benchmark
+from game.init import prepare_match
+from network.protocol import serialize_message, deserialize_message, compress_payload, CompressionStream
+from resources.loader import load_heroes, load_gates
+
+def benchmarks():
+    opening = make_state()
+    prepare_match(opening)
+    late = make_full_board(16)
+    messages = {
+        "state_update[opening]": {"type": "state_update", "state": opening},
+        "state_update[16x16 board]": {"type": "state_update", "state": late},
+        "deck_options": {"heroes": load_heroes(), "gates": load_gates()},
+        "placement_prompt": {"phase": "explore", "step": "placement", "player": "Player1"},
+    }
+    benches = []
+    for name, msg in messages.items():
+        raw = serialize_message(msg)
+        benches.append(Benchmark(f"serialize_message[{name}]", serialize_message,
+                                 setup=lambda msg=msg: msg, number=20))
+        benches.append(Benchmark(f"deserialize_message[{name}]", deserialize_message,
+                                 setup=lambda raw=raw: raw, number=20))
+
+        # CPU versus bytes: one-shot frames (broadcasts) and a per-connection stream resending the same message
+        oneshot, _ = compress_payload(raw)
+        stream = CompressionStream()
+        compress_payload(raw, stream=stream)
+        streamed, _ = compress_payload(raw, stream=stream)
+        benches.append(Benchmark(f"compress_payload[{name}, one-shot]", compress_payload,
+                                 setup=lambda raw=raw: raw, number=20,
+                                 extra={"raw_bytes": len(raw), "bytes": len(oneshot)}))
+        benches.append(Benchmark(f"compress_payload[{name}, stream repeat]",
+                                 lambda raw, stream: compress_payload(raw, stream=stream),
+                                 setup=lambda raw=raw, stream=stream: (raw, stream), number=20,
+                                 extra={"raw_bytes": len(raw), "bytes": len(streamed)}))
+    return benches
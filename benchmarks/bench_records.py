@@ -0,0 +1,47 @@
+# External Imports
+import atexit
+import shutil
+import tempfile
+from pathlib import Path
+
+# Internal Imports
+from benchmarks.harness import Benchmark
+
+ROWS = 100_000
+SCAN_ROWS = 1_000_000
+
+def benchmarks():
+    try:
+        from game.records import COLUMN_NAMES, RecordReader, RecordWriter
+    except ImportError:
+        print("numpy not installed, skipping record benchmarks")
+        return []
+    root = Path(tempfile.mkdtemp(prefix="ror-records-"))
+    atexit.register(shutil.rmtree, root, True)
+    row = (1,) * len(COLUMN_NAMES)
+    runs = iter(range(10 ** 6))
+
+    # Queue rows one turn at a time, as the phases do, then wait for them to reach disk
+    def write(writer):
+        put = writer._queue.put
+        for _ in range(ROWS):
+            put(row)
+        writer.close()
+
+    # One fresh writer per round so every round writes to new shards
+    def new_writer():
+        return RecordWriter(root / f"write-{next(runs)}")
+
+    scan_dir = root / "scan"
+    writer = RecordWriter(scan_dir)
+    writer.record_rows([row] * SCAN_ROWS)
+    writer.close()
+    reader = RecordReader(scan_dir)
+
+    def scan():
+        return sum(int(block["p1_echoes"].sum()) for block in reader.scan(("p1_echoes",)))
+
+    return [
+        Benchmark(f"write_records[{ROWS} rows]", write, setup=new_writer, rounds=5, extra={"rows": ROWS}),
+        Benchmark(f"scan_records[{SCAN_ROWS} rows, 1 column]", scan, rounds=20, extra={"rows": SCAN_ROWS}),
+    ]
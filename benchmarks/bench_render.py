@@ -0,0 +1,95 @@
+# External Imports
+import atexit
+import os
+import random
+import shutil
+import tempfile
+from pathlib import Path
+
+# Render offscreen; must be set before pygame initialises its display
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+# Internal Imports
+from benchmarks.fixtures import make_state, make_full_board
+from benchmarks.harness import Benchmark
+from game.init import prepare_match
+from resources.loader import card_pool
+
+SNAPSHOT_BATCH = 256
+
+def benchmarks():
+    try:
+        import pygame
+    except ImportError:
+        print("pygame not installed, skipping render benchmarks")
+        return []
+    from ui.display import render_state, draw_hand
+    from ui.atlas import CardAtlas
+    from tools.build_atlas import build_atlas, card_names
+
+    pygame.init()
+    surface = pygame.Surface((800, 600))
+    opening = make_state()
+    prepare_match(opening)
+    full = make_full_board(8)
+    # Only the chunks inside the 800x600 viewport are drawn
+    large = make_full_board(64)
+    return [
+        Benchmark("render_state[opening]", render_state, setup=lambda: (surface, opening), rounds=20),
+        Benchmark("render_state[8x8 full]", render_state, setup=lambda: (surface, full), rounds=20),
+        Benchmark("render_state[64x64 full]", render_state, setup=lambda: (surface, large), rounds=20),
+    ] + _art_benchmarks(pygame, surface, full, render_state, draw_hand, CardAtlas, build_atlas, card_names) \
+      + _snapshot_benchmarks(full)
+
+# Stand-in art (flat colour cards at the size of typical scans) packed into a throwaway atlas
+def _art_benchmarks(pygame, surface, full, render_state, draw_hand, CardAtlas, build_atlas, card_names):
+    root = Path(tempfile.mkdtemp(prefix="ror-art-"))
+    atexit.register(shutil.rmtree, root, True)
+    rng = random.Random(0)
+    names = list(card_names())
+    for name in names:
+        image = pygame.Surface((600, 840))
+        image.fill((rng.randrange(256), rng.randrange(256), rng.randrange(256)))
+        pygame.image.save(image, str(root / f"{name}.png"))
+    build_atlas(root, root / "atlas", names=names)
+    # Pages are converted to the display format, as in the client
+    pygame.display.set_mode((800, 600))
+    atlas = CardAtlas.load(root / "atlas")
+    # A full hand of distinct cards
+    hand = [card for card in card_pool()["heroes"] if card.name][:10]
+    files = [str(root / f"{card.name}.png") for card in hand]
+
+    # What each card costs without the atlas: decode the file and scale it
+    def decode_and_scale():
+        for path in files:
+            pygame.transform.smoothscale(pygame.image.load(path).convert(), (60, 84))
+
+    return [
+        Benchmark("render_state[8x8 full, art]", render_state, setup=lambda: (surface, full, None, atlas), rounds=20),
+        Benchmark(f"draw_hand[{len(hand)} cards, atlas]", draw_hand, setup=lambda: (surface, hand, (10, 500), atlas), rounds=50),
+        Benchmark(f"decode+scale[{len(hand)} cards, no atlas]", decode_and_scale, rounds=10),
+    ]
+
+# One snapshot in this process, and a batch through the worker pool (throughput is states / mean)
+def _snapshot_benchmarks(full):
+    from game.views import project_state
+    from ui.snapshots import BoardSnapshotter, SnapshotRenderer
+
+    view = project_state(full, None)
+    snapshotter = BoardSnapshotter()
+    snapshotter.warm()
+    renderer = SnapshotRenderer(atlas_dir=None)
+    atexit.register(renderer.close)
+    batch = [full] * SNAPSHOT_BATCH
+    # Start the workers before timing
+    list(renderer.render(batch[:renderer.workers]))
+
+    def render_batch():
+        for _ in renderer.render(batch):
+            pass
+
+    return [
+        Benchmark("snapshot[8x8 full, png]", snapshotter.png, setup=lambda: (view,), rounds=20),
+        Benchmark(f"snapshot_pool[{SNAPSHOT_BATCH} states, {renderer.workers} workers]", render_batch, rounds=5,
+                  extra={"states": SNAPSHOT_BATCH, "workers": renderer.workers}),
+    ]
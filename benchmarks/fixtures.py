@@ -0,0 +1,71 @@
+# External Imports
+import random
+from dataclasses import replace
+
+# Internal Imports
+from game.board import make_board
+from game.init import build_game_state
+from game.triggers import TriggerIndex
+from models import UnitInstance
+from resources.loader import load_heroes, load_gates, load_ruins, load_minions, load_gears
+
+# Seeded two-player state with the first two reference heroes and gates
+def make_state(seed: int = 1234):
+    heroes, gates = load_heroes(), load_gates()
+    choice1 = {"hero": heroes[0], "gate": gates[0]}
+    choice2 = {"hero": heroes[1], "gate": gates[1]}
+    state, _ = build_game_state(choice1, choice2, rng=random.Random(seed))
+    state.match_id = "bench"
+    return state
+
+# Fill an n×n board with face-up Ruins and put the Gates at opposite corners
+def make_full_board(size: int, seed: int = 1234):
+    state = make_state(seed)
+    rng = random.Random(seed)
+    ruins = load_ruins()
+    state.map = make_board((size, size))
+    state.rows = state.cols = size
+    for r in range(size):
+        for c in range(size):
+            state.map[(r, c)] = {"card": rng.choice(ruins), "face_up": True}
+    p1_pos, p2_pos = (size - 1, 0), (0, size - 1)
+    state.map[p1_pos] = {"card": state.players[0].gate, "face_up": True}
+    state.map[p2_pos] = {"card": state.players[1].gate, "face_up": True}
+    state.gate_positions = {"Player1": p1_pos, "Player2": p2_pos}
+    state.triggers = TriggerIndex.from_map(state.map)
+    return state
+
+# Active player with a full staging area and relic area, some cards carrying upkeep costs
+def make_upkeep_state(units: int = 30, relics: int = 10, seed: int = 1234):
+    state = make_state(seed)
+    player = state.players[state.active_player]
+    minions, gears = load_minions(), load_gears()
+    player.echoes = 10 ** 6
+    for i in range(units):
+        minion = minions[i % len(minions)]
+        if i % 3 == 0:
+            minion = replace(minion, ability="At the beginning of your turn pay 1 Echo or lose 1 Health.")
+        player.staging_area.append(UnitInstance.from_card(minion))
+    for i in range(relics):
+        item = gears[i % len(gears)]
+        if i % 2 == 0:
+            item = replace(item, ability="Pay 1 Echo during your Maintenance step.")
+        player.relic_area.append(item)
+    return state
+
+# A row of attackers facing a row of defenders, one attack declared per column
+def make_combat_state(attacks: int = 50, seed: int = 1234):
+    state = make_full_board(max(attacks, 3), seed)
+    minions = load_minions()
+    p1, p2 = state.players
+    attack_list = []
+    for c in range(attacks):
+        attacker = UnitInstance.from_card(minions[c % len(minions)])
+        defender = UnitInstance.from_card(minions[(c + 1) % len(minions)])
+        p1.staging_area.append(attacker)
+        p2.staging_area.append(defender)
+        state.occupants[(1, c)] = [("Player1", attacker)]
+        state.occupants[(2, c)] = [("Player2", defender)]
+        attack_list.append({"from": (1, c), "to": (2, c)})
+    state.just_summoned = []
+    return state, {"attacks": attack_list}
@@ -0,0 +1,98 @@
+# External Imports
+import json
+import platform
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# A single named benchmark; setup runs untimed before every round.
+# `extra` holds non-timing measurements (e.g. byte counts) copied into the result.
+class Benchmark:
+    def __init__(self, name: str, func: Callable, setup: Optional[Callable] = None,
+                 number: int = 1, rounds: int = 20, warmup: int = 2, extra: Optional[Dict] = None):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.number = number
+        self.rounds = rounds
+        self.warmup = warmup
+        self.extra = extra or {}
+
+    # Time `number` calls per round and report per-call statistics
+    def run(self) -> Dict:
+        timings: List[float] = []
+        for i in range(self.warmup + self.rounds):
+            args = self.setup() if self.setup else ()
+            if not isinstance(args, tuple):
+                args = (args,)
+            start = perf_counter()
+            for _ in range(self.number):
+                self.func(*args)
+            elapsed = (perf_counter() - start) / self.number
+            if i >= self.warmup:
+                timings.append(elapsed)
+        return {
+            "name": self.name,
+            "rounds": self.rounds,
+            "number": self.number,
+            "min": min(timings),
+            "median": statistics.median(timings),
+            "mean": statistics.fmean(timings),
+            "stdev": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "ops_per_sec": 1.0 / statistics.median(timings) if statistics.median(timings) else 0.0,
+            **self.extra,
+        }
+
+def git_revision() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, cwd=Path(__file__).parent, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+# Run a list of benchmarks, printing one line per result
+def run_suite(benchmarks: List[Benchmark], name_filter: str = "") -> List[Dict]:
+    results = []
+    for bench in benchmarks:
+        if name_filter and name_filter not in bench.name:
+            continue
+        result = bench.run()
+        results.append(result)
+        extra = "".join(f"  {key}={value}" for key, value in bench.extra.items())
+        print(f"{result['name']:<48} median {result['median'] * 1e6:>12.2f} µs   "
+              f"({result['ops_per_sec']:,.0f} ops/s){extra}")
+    return results
+
+def save_results(results: List[Dict], path: Optional[Path] = None) -> Path:
+    revision = git_revision()
+    path = path or RESULTS_DIR / f"{revision}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "revision": revision,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "results": results,
+    }
+    path.write_text(json.dumps(payload, indent=2))
+    return path
+
+# Print the median change for every benchmark present in both files
+def compare_results(old_path: Path, new_path: Path, threshold: float = 0.10) -> bool:
+    old = {r["name"]: r for r in json.loads(Path(old_path).read_text())["results"]}
+    new = {r["name"]: r for r in json.loads(Path(new_path).read_text())["results"]}
+    regressed = False
+    for name in sorted(old.keys() & new.keys()):
+        before, after = old[name]["median"], new[name]["median"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressed = True
+        print(f"{name:<48} {before * 1e6:>12.2f} -> {after * 1e6:>12.2f} µs  {change:+.1%}{flag}")
+    return regressed
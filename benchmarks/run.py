@@ -0,0 +1,50 @@
+# External Imports
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Allow running from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Internal Imports
+from benchmarks import bench_engine, bench_protocol, bench_loader, bench_render, bench_matchmaking, bench_memory, bench_observation, bench_records
+from benchmarks.harness import run_suite, save_results, compare_results
+from utils import setup_logging
+
+SUITES = {
+    "engine": bench_engine,
+    "protocol": bench_protocol,
+    "loader": bench_loader,
+    "render": bench_render,
+    "matchmaking": bench_matchmaking,
+    "memory": bench_memory,
+    "observation": bench_observation,
+    "records": bench_records,
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Ruins of Ragnir benchmark suite")
+    parser.add_argument("--suite", choices=sorted(SUITES), action="append",
+                        help="Suite to run (repeatable, default: all)")
+    parser.add_argument("-k", dest="name_filter", default="", help="Only run benchmarks containing this text")
+    parser.add_argument("--output", type=Path, help="Results file (default: benchmarks/results/<rev>.json)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    # Engine steps log warnings for rejected moves; keep benchmark output readable
+    setup_logging(level=40)
+
+    results = []
+    for name in args.suite or sorted(SUITES):
+        print(f"== {name} ==")
+        results.extend(run_suite(SUITES[name].benchmarks(), args.name_filter))
+
+    path = save_results(results, args.output)
+    print(f"Results written to {path}")
+    if args.compare:
+        regressed = compare_results(args.compare, path)
+        sys.exit(1 if regressed else 0)
+
+if __name__ == "__main__":
+    main()
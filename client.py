@@ -1,40 +1,113 @@
 # External Imports
 import sys
 import os
+import select
 import pygame
 
 # Allow running from this folder by putting parent on the import path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Internal imports
-from network.client_core import connect_to_server, safe_send, safe_recv
+from network.client_core import connect_to_server, safe_send, safe_recv, load_session, save_session, rejoin, \
+    load_tokens, save_token
 from ui.deck_selection import choose_deck
 from utils import setup_logging
-from ui.display import render_state
+from ui.display import render_state, default_viewport
+from ui.atlas import CardAtlas
+from game.client_policy import respond
+from game.preview import TurnPreview
+from network.protocol import set_preset_dictionary
+from resources.loader import compression_dictionary
 
 # Override the bind-all host so clients connect to localhost on Windows
-from config import SERVER_PORT
+from config import SERVER_PORT, SPECTATOR_PORT, SESSION_DIR, TOKENS_FILE
 SERVER_HOST = "127.0.0.1"
 
 def main():
     setup_logging()
-
-    # Connect to the locally-bound server
-    sock = connect_to_server(SERVER_HOST, SERVER_PORT)
-
-    # Deck selection
-    deck_options = safe_recv(sock)
-    choice = choose_deck(deck_options)
-    safe_send(sock, {'deck_choice': choice})
+    # Offer the server the card dictionary for compressing frames
+    set_preset_dictionary(compression_dictionary())
+    spectating = '--spectate' in sys.argv[1:]
+    # Spectators may name the match to watch: --spectate MATCH_ID (default: the latest one)
+    watch = None
+    if spectating and '--spectate' in sys.argv[1:-1] and not sys.argv[sys.argv.index('--spectate') + 1].startswith('--'):
+        watch = sys.argv[sys.argv.index('--spectate') + 1]
+    # Answer every prompt individually instead of sending whole-turn plans
+    step_mode = '--step-mode' in sys.argv[1:]
+
+    # Connect to the locally-bound server (spectators use their own port)
+    sock = connect_to_server(SERVER_HOST, SPECTATOR_PORT if spectating else SERVER_PORT)
+
+    name = sys.argv[sys.argv.index('--name') + 1] if '--name' in sys.argv[1:-1] else None
+    # The seat of the match this client was last in, kept until that match ends
+    session_file = SESSION_DIR / f"{name or 'player'}.json"
+
+    # Deck selection, skipped when rejoining a match the server is resuming
+    deck_options = {} if spectating else safe_recv(sock)
+    session = None if spectating else load_session(session_file)
+    if spectating:
+        live = safe_recv(sock)['matches']
+        if not live:
+            print("No matches in progress")
+            return
+        for match in live:
+            print(f"Match {match['match_id']} ({match['spectators']} watching)")
+        watch = watch or live[-1]['match_id']
+        print(f"Spectating match {watch}")
+        safe_send(sock, {'watch': watch})
+    if session is not None:
+        print(f"Rejoining match {session['match_id']} as {session['player']}, waiting for the other player")
+        answer = rejoin(sock, session)
+        if answer.get('type') == 'redirect':
+            # Under several workers, the match is held by the one listening on this port
+            sock.close()
+            sock = connect_to_server(SERVER_HOST, answer['port'])
+            deck_options = safe_recv(sock)
+            answer = rejoin(sock, session)
+        if answer.get('type') == 'resume':
+            print(f"Rejoined match {answer['match_id']} at turn {answer['turn']}")
+        else:
+            print(f"Could not rejoin match {session['match_id']}: {answer.get('reason')}")
+            session_file.unlink(missing_ok=True)
+            session = None
+    if not spectating and session is None:
+        choice = choose_deck(deck_options)
+        reply = {'deck_choice': choice}
+        if name:
+            reply['player_id'] = name
+            # Proves the name is ours to a matchmaking server; it issues one on first use
+            reply['token'] = load_tokens(TOKENS_FILE).get(name)
+        safe_send(sock, reply)
 
     # Enter main game loop
     pygame.init()
     screen = pygame.display.set_mode((800, 600))
+    viewport = default_viewport(screen)
+    # Card art, if tools/build_atlas.py has been run; pages load once the window exists
+    atlas = CardAtlas.load()
     player_id = None
+    state_obj = None
+    # This turn's moves played locally ahead of the server, until its next state update
+    preview = None
+    # Cells this client has placed Ruins on since the last state update (step mode)
+    placed = set()
     running = True
 
     while running:
-        data = safe_recv(sock)
+        # Poll the socket so panning and zooming stay responsive between messages
+        data = None
+        if select.select([sock], [], [], 0.05)[0]:
+            data = safe_recv(sock)
+
+        # Allow window close; arrow keys, right-drag and the wheel move the board view
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif viewport.handle_event(event) and state_obj is not None:
+                viewport.clamp_to(state_obj.rows, state_obj.cols)
+                render_state(screen, preview.state if preview else state_obj, viewport, atlas)
+                pygame.display.flip()
+
         if not data:
             continue
 
@@ -47,98 +120,68 @@ def main():
                     player_id = data['player']
                 if data['player'] != player_id:
                     continue
-            render_state(screen, state)
+            # Large boards start centred on this player's Gate
+            if state_obj is None and player_id in state.gate_positions and \
+                    (state.rows * viewport.tile_size > viewport.rect.height or state.cols * viewport.tile_size > viewport.rect.width):
+                viewport.center_on(state.gate_positions[player_id])
+            # The server's state is authoritative; it replaces any preview
+            state_obj = state
+            preview = None
+            placed.clear()
+            render_state(screen, state, viewport, atlas)
             pygame.display.flip()
 
+        # Our seat in a new match, needed to rejoin it should the server restart
+        elif data.get('type') == 'seat':
+            save_session(session_file, data)
+
+        # A matchmaking server registered our name, or found it registered to someone else
+        elif data.get('type') == 'registered':
+            save_token(TOKENS_FILE, data['player_id'], data['token'])
+        elif data.get('type') == 'login_refused':
+            print(f"Cannot play as {data['player_id']}: {data['reason']}")
+            running = False
+        elif data.get('type') == 'watch_refused':
+            print(f"Cannot watch match {data['match_id']}: {data['reason']}")
+            running = False
+
         # Game end notification
         elif data.get('type') == 'game_end':
             winner = data.get('winner')
             phase = data.get('phase')
             print(f"Game over! Winner: {winner} (Phase: {phase})")
+            session_file.unlink(missing_ok=True)
             running = False
 
+        # Outcome of every entry in a submitted plan
+        elif data.get('step') == 'plan_result':
+            rejected = [r for r in data.get('results', []) if not r['ok']]
+            for result in rejected:
+                print(f"Plan {result['action']} rejected: {result['detail']}")
+            if preview is not None:
+                for predicted, actual in preview.reconcile(data.get('results', [])):
+                    print(f"Preview of {predicted['action']} was {predicted['detail']!r}, server says {actual['detail']!r}")
+
+        # Adventure prompts are answered from the preview: the turn shows at once, and entries
+        # the rules reject are dropped instead of sent
+        elif data.get('phase') == 'adventure' and state_obj is not None:
+            if preview is None or data.get('step') == 'summoning':
+                preview = TurnPreview(state_obj, player_id, data)
+            reply = respond(data, preview.state, player_id, step_mode)
+            if reply is not None:
+                checked = len(preview.rejected)
+                reply = preview.check(data.get('step'), reply)
+                for result in preview.rejected[checked:]:
+                    print(f"Not sending {result['action']}: {result['detail']}")
+                render_state(screen, preview.state, viewport, atlas)
+                pygame.display.flip()
+                safe_send(sock, reply)
+
         # Phase‐specific prompts
         elif 'phase' in data:
-            phase = data['phase']
-            step = data.get('step')
-
-            if phase == 'explore' and step == 'placement':
-                choice_msg = {}
-                state_obj = data.get('state')
-                if state_obj:
-                    if player_id == "Player1" and state_obj.players[0].hand:
-                        choice_msg = {
-                            "card_index": 0,
-                            "pos": (state_obj.rows - 2, state_obj.cols // 2)
-                        }
-                    elif player_id == "Player2" and state_obj.players[1].hand:
-                        choice_msg = {
-                            "card_index": 0,
-                            "pos": (1, state_obj.cols // 2)
-                        }
-                if not choice_msg:
-                    choice_msg = {"pass": True}
-                safe_send(sock, choice_msg)
-
-            # Adventure Phase: summoning step
-            elif phase == 'adventure' and step == 'summoning' and state_obj:
-                summon_msg = {}
-                ps = state_obj.players[0] if player_id == "Player1" else state_obj.players[1]
-                for idx, card in enumerate(ps.hand):
-                    cost = getattr(card, "cost", 0)
-                    if ps.echoes >= cost:
-                        summon_msg = {"card_index": idx}
-                        break
-                safe_send(sock, summon_msg)
-
-            # Adventure Phase: movement step
-            elif phase == 'adventure' and step == 'movement' and state_obj:
-                move_msg = {"moves": []}
-                hero = state_obj.board[player_id]["hero"]
-                hero_pos = None
-                for pos, occ in state_obj.occupants.items():
-                    for owner, unit in occ:
-                        if owner == player_id and unit is hero:
-                            hero_pos = pos
-                            break
-                    if hero_pos:
-                        break
-                if hero_pos:
-                    for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
-                        tgt = (hero_pos[0] + dr, hero_pos[1] + dc)
-                        if tgt in state_obj.map:
-                            move_msg["moves"].append({"from": hero_pos, "to": tgt})
-                            break
-                safe_send(sock, move_msg)
-
-            # Adventure Phase: combat step
-            elif phase == 'adventure' and step == 'combat' and state_obj:
-                combat_msg = {"attacks": []}
-                hero = state_obj.board[player_id]["hero"]
-                hero_pos = None
-                for pos, occ in state_obj.occupants.items():
-                    for owner, unit in occ:
-                        if owner == player_id and unit is hero:
-                            hero_pos = pos
-                            break
-                    if hero_pos:
-                        break
-                if hero_pos:
-                    for dr, dc in [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]:
-                        neigh = (hero_pos[0] + dr, hero_pos[1] + dc)
-                        if neigh in state_obj.occupants:
-                            for owner, unit in state_obj.occupants[neigh]:
-                                if owner != player_id:
-                                    combat_msg["attacks"].append({"from": hero_pos, "to": neigh})
-                                    break
-                            if combat_msg["attacks"]:
-                                break
-                safe_send(sock, combat_msg)
-
-        # Allow window close
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
+            reply = respond(data, state_obj, player_id, step_mode, placed)
+            if reply is not None:
+                safe_send(sock, reply)
 
     pygame.quit()
     input("Press Enter to close window…")
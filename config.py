@@ -8,5 +8,105 @@ DATA_DIR = pathlib.Path(__file__).parent / "resources"
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 54321
 
+# Spectators connect on a separate port; slow viewers skip ahead to the latest state
+SPECTATOR_PORT = 54322
+SPECTATOR_QUEUE_FRAMES = 32
+
+# The match loop buffers frames for a player who isn't reading up to PLAYER_SEND_BUFFER bytes,
+# then aborts their match. A finished match's last frames get PLAYER_DRAIN_SECONDS to go out.
+PLAYER_SEND_BUFFER = 8 * 2 ** 20
+PLAYER_DRAIN_SECONDS = 10.0
+
+# Elo ratings used by matchmaking mode
+RATINGS_FILE = DATA_DIR.parent / "ratings.json"
+
+# Frame compression: zlib against a preset dictionary of card data, for frames of at least
+# COMPRESS_MIN_BYTES. Message kinds that stop shrinking below COMPRESS_MAX_RATIO are sent raw.
+COMPRESSION_ENABLED = True
+COMPRESS_MIN_BYTES = 512
+COMPRESS_LEVEL = 6
+COMPRESS_MAX_RATIO = 0.9
+
+# Largest message accepted from a peer, on the wire and once decompressed; anything bigger
+# ends the connection.
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+# Seconds between checks for edited card files while the server runs (None to disable).
+# Running matches keep the card data they started with; new matches get the latest.
+CARD_RELOAD_INTERVAL = 2.0
+
 # Game settings
-TURN_TIMEOUT = 30
\ No newline at end of file
+TURN_TIMEOUT = 30
+
+# Cards per Explore and Adventure deck. Ruins are limited by their own `limit`; every other
+# Adventure card by ADVENTURE_COPY_LIMIT copies per deck.
+DECK_SIZE = 40
+ADVENTURE_COPY_LIMIT = 3
+
+# Default board (rows, cols); override per match with server.py --board-size.
+# Tiles are stored sparsely in square chunks of BOARD_CHUNK_SIZE (a power of two).
+BOARD_SIZE = (7, 7)
+BOARD_CHUNK_SIZE = 16
+
+# Observation encoder (game/observation.py): hand slots per player and states per batch
+OBS_HAND_SLOTS = 8
+OBS_BATCH_SIZE = 4096
+
+# Numeric card tables (resources/card_table.py). publish_card_table() puts them in shared memory
+# once and passes its name to the processes started afterwards in $ROR_CARD_TABLE.
+CARD_TABLE_ENV = "ROR_CARD_TABLE"
+
+# Card art: images in ART_DIR named after their card ("Ashen Vale.png"), packed by
+# tools/build_atlas.py into ATLAS_PAGE_SIZE pages of ATLAS_CARD_SIZE cells in ATLAS_DIR.
+# The client keeps the last ART_CACHE_SIZE scaled images; tiles smaller than ART_MIN_TILE stay plain.
+ART_DIR = DATA_DIR / "art"
+ATLAS_DIR = DATA_DIR / "atlas"
+ATLAS_PAGE_SIZE = (2048, 2048)
+ATLAS_CARD_SIZE = (200, 280)
+ART_CACHE_SIZE = 512
+ART_MIN_TILE = 16
+
+# Board snapshots (ui/snapshots.py): boards are drawn at SNAPSHOT_RENDER_SIZE, scaled down to
+# SNAPSHOT_SIZE PNGs compressed at SNAPSHOT_PNG_LEVEL (zlib 0-9), and handed to worker
+# processes SNAPSHOT_CHUNK_SIZE at a time.
+SNAPSHOT_DIR = DATA_DIR.parent / "snapshots"
+SNAPSHOT_RENDER_SIZE = (800, 600)
+SNAPSHOT_SIZE = (320, 240)
+SNAPSHOT_PNG_LEVEL = 1
+SNAPSHOT_CHUNK_SIZE = 16
+
+# Replay recording
+REPLAY_DIR = DATA_DIR.parent / "replays"
+REPLAY_CHECKPOINT_EVERY = 10
+
+# Turn-level analytics records (game/records.py): columnar .npy shards of RECORD_SHARD_ROWS turns.
+# Set RECORDS_DIR to None to disable.
+RECORDS_DIR = DATA_DIR.parent / "records"
+RECORD_SHARD_ROWS = 65536
+
+# Per-match profiling (profiling.py), off unless a match is switched on: list match IDs in
+# $ROR_PROFILE_MATCHES ("*" for all), in PROFILE_REQUEST_FILE followed by SIGUSR1, or via
+# /profile/start?match=ID on the metrics port. PROFILE_MODE is "sample" (collapsed stacks for
+# flamegraphs) or "cprofile" (pstats files).
+PROFILE_DIR = DATA_DIR.parent / "profiles"
+PROFILE_ENV = "ROR_PROFILE_MATCHES"
+PROFILE_REQUEST_FILE = PROFILE_DIR / "requests.txt"
+PROFILE_MODE = "sample"
+PROFILE_SAMPLE_INTERVAL = 0.002
+
+# Crash-safe match checkpoints (SQLite, written on a background thread), shared by all workers
+CHECKPOINT_DB = DATA_DIR.parent / "matches.sqlite3"
+
+# Worker N of a pre-forked server also listens on WORKER_PORT + N, where players rejoining a
+# match that worker owns are redirected from whichever worker they reached first
+WORKER_PORT = 54400
+
+# Where clients keep the seat token of the match they are in, one file per --name, to rejoin
+# it after a server restart, and the tokens matchmaking issued for their names
+SESSION_DIR = DATA_DIR.parent / "sessions"
+TOKENS_FILE = SESSION_DIR / "tokens.json"
+
+# Metrics export (set METRICS_PORT to None to disable the HTTP endpoint)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
+METRICS_FILE = None
\ No newline at end of file
@@ -0,0 +1,228 @@
+# External Imports
+from collections import deque
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Dict, Iterator, Optional, Tuple
+
+# Internal Imports
+from config import BOARD_SIZE, BOARD_CHUNK_SIZE
+from resources.loader import card_pool
+
+Pos = Tuple[int, int]
+
+NEIGHBOUR_OFFSETS = tuple((dr, dc) for dr in (-1, 0, 1) for dc in (-1, 0, 1) if dr or dc)
+
+# Dense cell codes: nothing placed, a face-down tile, then one per face-up terrain
+EMPTY_CODE = 0
+FACE_DOWN_CODE = 1
+FIRST_TERRAIN_CODE = 2
+
+# Terrains in sorted order, so every process numbers them the same way. Fixed at first use so
+# codes stay stable while card data reloads; a brand new terrain needs a restart.
+@lru_cache(maxsize=1)
+def terrain_codes() -> Dict[str, int]:
+    pool = card_pool()
+    terrains = sorted({card.terrain for card in pool["ruins"] + pool["gates"]})
+    return {terrain: FIRST_TERRAIN_CODE + i for i, terrain in enumerate(terrains)}
+
+def tile_code(tile: dict) -> int:
+    if not tile["face_up"]:
+        return FACE_DOWN_CODE
+    return terrain_codes().get(tile["card"].terrain, FACE_DOWN_CODE)
+
+# Sparse tile storage for boards of any size: (row, col) -> tile dict, kept in square
+# chunks that are only allocated once a tile is placed in them
+class ChunkedBoard(MutableMapping):
+    def __init__(self, rows: int, cols: int, chunk_size: int = 16):
+        if chunk_size & (chunk_size - 1):
+            raise ValueError(f"chunk_size must be a power of two, got {chunk_size}")
+        self.rows = rows
+        self.cols = cols
+        self.chunk_size = chunk_size
+        self._shift = chunk_size.bit_length() - 1
+        self._chunks: Dict[Pos, Dict[Pos, dict]] = {}
+        self._size = 0
+        # Row-major tile codes, built on first use by dense_codes() and kept current after that
+        self._codes: Optional[bytearray] = None
+
+    def chunk_of(self, pos: Pos) -> Pos:
+        return (pos[0] >> self._shift, pos[1] >> self._shift)
+
+    def in_bounds(self, pos: Pos) -> bool:
+        return 0 <= pos[0] < self.rows and 0 <= pos[1] < self.cols
+
+    def __getitem__(self, pos: Pos) -> dict:
+        chunk = self._chunks.get((pos[0] >> self._shift, pos[1] >> self._shift))
+        if chunk is None:
+            raise KeyError(pos)
+        return chunk[pos]
+
+    def get(self, pos: Pos, default=None):
+        chunk = self._chunks.get((pos[0] >> self._shift, pos[1] >> self._shift))
+        if chunk is None:
+            return default
+        return chunk.get(pos, default)
+
+    def __contains__(self, pos) -> bool:
+        chunk = self._chunks.get((pos[0] >> self._shift, pos[1] >> self._shift))
+        return chunk is not None and pos in chunk
+
+    def __setitem__(self, pos: Pos, tile: dict):
+        if not self.in_bounds(pos):
+            raise KeyError(f"{pos} is outside the {self.rows}x{self.cols} board")
+        chunk = self._chunks.setdefault(self.chunk_of(pos), {})
+        if pos not in chunk:
+            self._size += 1
+        chunk[pos] = tile
+        if self._codes is not None:
+            self._codes[pos[0] * self.cols + pos[1]] = tile_code(tile)
+
+    def __delitem__(self, pos: Pos):
+        key = self.chunk_of(pos)
+        chunk = self._chunks.get(key)
+        if chunk is None:
+            raise KeyError(pos)
+        del chunk[pos]
+        self._size -= 1
+        if self._codes is not None:
+            self._codes[pos[0] * self.cols + pos[1]] = EMPTY_CODE
+        if not chunk:
+            del self._chunks[key]
+
+    def __iter__(self) -> Iterator[Pos]:
+        for chunk in self._chunks.values():
+            yield from chunk
+
+    def __len__(self) -> int:
+        return self._size
+
+    # (pos, tile) pairs straight from the chunks; much cheaper than the generic items() view
+    def tiles(self) -> Iterator[Tuple[Pos, dict]]:
+        for chunk in self._chunks.values():
+            yield from chunk.items()
+
+    def copy(self) -> "ChunkedBoard":
+        board = ChunkedBoard(self.rows, self.cols, self.chunk_size)
+        board._chunks = {key: dict(chunk) for key, chunk in self._chunks.items()}
+        board._size = self._size
+        if self._codes is not None:
+            board._codes = bytearray(self._codes)
+        return board
+
+    # The dense codes are a cache; leave them out of pickles (they can be large) and rebuild on demand
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_codes"] = None
+        return state
+
+    def __setstate__(self, state):
+        state.setdefault("_codes", None)
+        self.__dict__.update(state)
+
+    # Turn a placed tile face up or down, keeping the dense codes in step
+    def set_face_up(self, pos: Pos, face_up: bool = True):
+        tile = self[pos]
+        tile["face_up"] = face_up
+        if self._codes is not None:
+            self._codes[pos[0] * self.cols + pos[1]] = tile_code(tile)
+
+    # One code per cell, row-major; see EMPTY_CODE. Tiles must be revealed through set_face_up().
+    def dense_codes(self) -> bytearray:
+        if self._codes is None:
+            codes = bytearray(self.rows * self.cols)
+            cols = self.cols
+            for (r, c), tile in self.tiles():
+                codes[r * cols + c] = tile_code(tile)
+            self._codes = codes
+        return self._codes
+
+    # Placed tiles around `pos`; interior cells need only their own chunk
+    def neighbours(self, pos: Pos) -> Iterator[Tuple[Pos, dict]]:
+        r, c = pos
+        mask = self.chunk_size - 1
+        if 0 < r & mask < mask and 0 < c & mask < mask:
+            chunk = self._chunks.get((r >> self._shift, c >> self._shift))
+            if chunk is None:
+                return
+            for dr, dc in NEIGHBOUR_OFFSETS:
+                tile = chunk.get((r + dr, c + dc))
+                if tile is not None:
+                    yield (r + dr, c + dc), tile
+            return
+        chunks = self._chunks
+        shift = self._shift
+        for dr, dc in NEIGHBOUR_OFFSETS:
+            npos = (r + dr, c + dc)
+            chunk = chunks.get((npos[0] >> shift, npos[1] >> shift))
+            if chunk is not None:
+                tile = chunk.get(npos)
+                if tile is not None:
+                    yield npos, tile
+
+    # Breadth-first search over face-up tiles; the chunk lookups are inlined since this runs every turn.
+    # `start` must be a placed tile.
+    def face_up_path(self, start: Pos, goal: Pos) -> bool:
+        chunks = self._chunks
+        shift = self._shift
+        mask = self.chunk_size - 1
+        visited = {start}
+        queue = deque([start])
+        while queue:
+            pos = queue.popleft()
+            if pos == goal:
+                return True
+            r, c = pos
+            if 0 < r & mask < mask and 0 < c & mask < mask:
+                # Every neighbour of an interior cell lives in the cell's own chunk
+                get = chunks[(r >> shift, c >> shift)].get
+                for dr, dc in NEIGHBOUR_OFFSETS:
+                    npos = (r + dr, c + dc)
+                    if npos not in visited:
+                        tile = get(npos)
+                        if tile is not None and tile["face_up"]:
+                            visited.add(npos)
+                            queue.append(npos)
+                continue
+            for dr, dc in NEIGHBOUR_OFFSETS:
+                npos = (r + dr, c + dc)
+                if npos in visited:
+                    continue
+                chunk = chunks.get((npos[0] >> shift, npos[1] >> shift))
+                tile = chunk.get(npos) if chunk is not None else None
+                if tile is not None and tile["face_up"]:
+                    visited.add(npos)
+                    queue.append(npos)
+        return False
+
+    def has_face_up_neighbour(self, pos: Pos) -> bool:
+        return any(tile["face_up"] for _, tile in self.neighbours(pos))
+
+    # Tiles in the rows/cols range [top, bottom) x [left, right), visiting only overlapping chunks
+    def tiles_in_rect(self, top: int, left: int, bottom: int, right: int) -> Iterator[Tuple[Pos, dict]]:
+        shift = self._shift
+        for cr in range(max(top, 0) >> shift, ((min(bottom, self.rows) - 1) >> shift) + 1):
+            for cc in range(max(left, 0) >> shift, ((min(right, self.cols) - 1) >> shift) + 1):
+                chunk = self._chunks.get((cr, cc))
+                if chunk is None:
+                    continue
+                for pos, tile in chunk.items():
+                    if top <= pos[0] < bottom and left <= pos[1] < right:
+                        yield pos, tile
+
+    def chunk_count(self) -> int:
+        return len(self._chunks)
+
+    def __repr__(self):
+        return f"ChunkedBoard({self.rows}x{self.cols}, {self._size} tiles in {len(self._chunks)} chunks)"
+
+# Parse a board size given as "64" or "64x48"
+def parse_board_size(text: str) -> Tuple[int, int]:
+    rows, _, cols = text.lower().partition("x")
+    rows, cols = int(rows), int(cols or rows)
+    if rows < 3 or cols < 1:
+        raise ValueError(f"Board must be at least 3 rows by 1 column, got {rows}x{cols}")
+    return rows, cols
+
+def make_board(size: Optional[Tuple[int, int]] = None, chunk_size: Optional[int] = None) -> ChunkedBoard:
+    rows, cols = size or BOARD_SIZE
+    return ChunkedBoard(rows, cols, chunk_size or BOARD_CHUNK_SIZE)
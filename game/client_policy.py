@@ -0,0 +1,112 @@
+# How a client answers the server's prompts, from the state view it was last sent. Shared by
+# client.py and the load-test bots, so neither needs pygame to decide a move.
+
+NEIGHBOURS = [(-1,-1),(-1,0),(-1,1),(0,-1),(0,1),(1,-1),(1,0),(1,1)]
+
+# Find the board position of this player's hero in a state view
+def find_hero(state_obj, player_id):
+    hero = state_obj.board[player_id]["hero"]
+    for pos, occ in state_obj.occupants.items():
+        for owner, unit in occ:
+            if owner == player_id and unit is hero:
+                return pos
+    return None
+
+# Ruin placements for the whole hand: empty cells next to face-up tiles, nearest the enemy Gate first.
+# `hand` is the one sent with the prompt, which the view from the start of the turn predates, and
+# `taken` holds cells already filled this turn that the view doesn't show yet.
+def plan_placements(state_obj, player_id, hand=None, taken=()):
+    me = 0 if player_id == "Player1" else 1
+    if hand is None:
+        hand = state_obj.players[me].hand
+    enemy_gate = state_obj.gate_positions.get("Player2" if me == 0 else "Player1")
+    if not hand or enemy_gate is None:
+        return []
+    frontier = set()
+    for (r, c), tile in state_obj.map.items():
+        if not tile["face_up"]:
+            continue
+        for dr, dc in NEIGHBOURS:
+            cell = (r + dr, c + dc)
+            if 0 <= cell[0] < state_obj.rows and 0 <= cell[1] < state_obj.cols and cell not in state_obj.map \
+                    and cell not in taken:
+                frontier.add(cell)
+    ranked = sorted(frontier, key=lambda p: (max(abs(p[0] - enemy_gate[0]), abs(p[1] - enemy_gate[1])), p))
+    return [{"card_index": idx, "pos": pos} for idx, pos in zip(range(len(hand)), ranked)]
+
+# First affordable card in hand, going by the hand and echoes sent with the prompt if given
+def choose_summon(state_obj, player_id, hand=None, echoes=None):
+    ps = state_obj.players[0] if player_id == "Player1" else state_obj.players[1]
+    hand = ps.hand if hand is None else hand
+    echoes = ps.echoes if echoes is None else echoes
+    for idx, card in enumerate(hand):
+        if echoes >= getattr(card, "cost", 0):
+            return {"card_index": idx}
+    return {}
+
+# Step the hero onto the first orthogonal Ruin
+def choose_moves(state_obj, player_id):
+    move_msg = {"moves": []}
+    hero_pos = find_hero(state_obj, player_id)
+    if hero_pos:
+        for dr, dc in [(-1,0),(1,0),(0,-1),(0,1)]:
+            tgt = (hero_pos[0] + dr, hero_pos[1] + dc)
+            if tgt in state_obj.map:
+                move_msg["moves"].append({"from": hero_pos, "to": tgt})
+                break
+    return move_msg
+
+# Attack the first adjacent enemy unit with the hero
+def choose_attacks(state_obj, player_id):
+    combat_msg = {"attacks": []}
+    hero_pos = find_hero(state_obj, player_id)
+    if hero_pos:
+        for dr, dc in NEIGHBOURS:
+            neigh = (hero_pos[0] + dr, hero_pos[1] + dc)
+            if neigh in state_obj.occupants:
+                for owner, unit in state_obj.occupants[neigh]:
+                    if owner != player_id:
+                        combat_msg["attacks"].append({"from": hero_pos, "to": neigh})
+                        break
+                if combat_msg["attacks"]:
+                    break
+    return combat_msg
+
+# Reply to a phase prompt, or None when the message needs no answer. Prompts offering
+# plans get the whole turn at once unless step_mode asks for one answer per prompt. Answering
+# placements one at a time adds each chosen cell to `placed`, which the caller empties on every
+# state update, since the view isn't sent again until the turn is over.
+def respond(data, state_obj, player_id, step_mode=False, placed=None):
+    phase = data.get('phase')
+    step = data.get('step')
+    use_plan = data.get('plans') and not step_mode
+
+    if phase == 'explore' and step == 'placement':
+        placements = plan_placements(state_obj, player_id, data.get('hand'), placed or ()) if state_obj else []
+        if use_plan:
+            return {"plan": placements}
+        if not placements:
+            return {"pass": True}
+        if placed is not None:
+            placed.add(placements[0]["pos"])
+        return placements[0]
+
+    # Adventure Phase: summoning step, or the whole turn as one plan
+    if phase == 'adventure' and step == 'summoning' and state_obj:
+        summon_msg = choose_summon(state_obj, player_id, data.get('hand'), data.get('echoes'))
+        if use_plan:
+            return {"plan": {
+                "summon": [summon_msg["card_index"]] if summon_msg else [],
+                "moves": choose_moves(state_obj, player_id)["moves"],
+                "attacks": choose_attacks(state_obj, player_id)["attacks"],
+            }}
+        return summon_msg
+
+    # Adventure Phase: movement step
+    if phase == 'adventure' and step == 'movement' and state_obj:
+        return choose_moves(state_obj, player_id)
+
+    # Adventure Phase: combat step
+    if phase == 'adventure' and step == 'combat' and state_obj:
+        return choose_attacks(state_obj, player_id)
+    return None
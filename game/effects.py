@@ -0,0 +1,48 @@
+# External Imports
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Tuple
+
+# A Ruin whose connection clause was satisfied by a newly adjacent tile
+class ConnectionEffect(NamedTuple):
+    pos: Tuple[int, int]
+    card: str
+    neighbour_pos: Tuple[int, int]
+    terrain: str
+
+    def __str__(self):
+        return f"{self.card} connected to {self.terrain}"
+
+# Abilities repeat across copies of a card, so the text checks are cached by string
+@lru_cache(maxsize=1024)
+def has_connection_clause(ability: str) -> bool:
+    return "Legally Connects" in ability or "Connection:" in ability
+
+@lru_cache(maxsize=4096)
+def clause_matches(ability: str, terrain: str, sub_terrain: str) -> bool:
+    return terrain in ability or bool(sub_terrain and sub_terrain in ability)
+
+def _check(effects: List[ConnectionEffect], pos, card, neighbour_pos, neighbour):
+    ability = card.ability
+    if not (ability and has_connection_clause(ability)):
+        return
+    # Board proxies carry no sub-terrain
+    if clause_matches(ability, neighbour.terrain, getattr(neighbour, "sub_terrain", "") or ""):
+        effects.append(ConnectionEffect(pos, card.name, neighbour_pos, neighbour.terrain))
+
+# Connection effects for tiles just turned face up, checking each new adjacency once
+def resolve_connections(tile_map, revealed: Iterable[Tuple[int, int]]) -> List[ConnectionEffect]:
+    revealed = list(revealed)
+    new = set(revealed)
+    effects: List[ConnectionEffect] = []
+    for pos in revealed:
+        card = tile_map[pos]["card"]
+        for neighbour_pos, tile in tile_map.neighbours(pos):
+            if not tile["face_up"]:
+                continue
+            # An edge between two new tiles is handled from its lower end only
+            if neighbour_pos in new and neighbour_pos < pos:
+                continue
+            neighbour = tile["card"]
+            _check(effects, pos, card, neighbour_pos, neighbour)
+            _check(effects, neighbour_pos, neighbour, pos, card)
+    return effects
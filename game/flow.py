@@ -0,0 +1,40 @@
+# External Imports
+from typing import Callable, NamedTuple
+
+# Internal Imports
+from metrics import CLIENT_WAIT_SECONDS
+from network.protocol import recv_obj
+from profiling import profiled_call
+
+# A game's flow is a generator: it sends prompts itself, yields an AwaitInput whenever it needs
+# a player's reply and is resumed with that reply by whoever drives it, returning the result when
+# it ends. A flow never waits on a socket itself, so one thread can interleave any number of
+# them (network.match_loop) or drive one at a time from blocking sockets (drive).
+
+# What a flow is waiting for: `player`'s reply to the prompt just sent for `step`
+class AwaitInput(NamedTuple):
+    player: str
+    step: str
+
+# Wait for `player`'s choice at `step`, passing it to the replay recorder if there is one
+def ask(player: str, step: str, recorder=None):
+    choice = yield AwaitInput(player, step)
+    if recorder is not None:
+        recorder.record_choice(player, step, choice)
+    return choice
+
+# Run a flow to the end on blocking connections, reading each reply from
+# connection_for(player). Returns what the flow returns. A profiled match is profiled
+# throughout, waits included, as headless policies compute their replies while being read.
+def drive(flow, connection_for: Callable, match_id: str = ""):
+    return profiled_call(match_id, _drive, flow, connection_for, match_id)
+
+def _drive(flow, connection_for: Callable, match_id: str):
+    reply = None
+    while True:
+        try:
+            request = flow.send(reply)
+        except StopIteration as stop:
+            return stop.value
+        with CLIENT_WAIT_SECONDS.time(match_id or "", request.step):
+            reply = recv_obj(connection_for(request.player))
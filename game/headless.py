@@ -0,0 +1,151 @@
+# External Imports
+import random
+from collections import deque
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+# Internal Imports
+from game.board import NEIGHBOUR_OFFSETS
+from game.init import build_game_state, prepare_match
+from game.phases import ExplorePhase, AdventurePhase
+from game.state import GameState
+from network.protocol import frame_message
+from models import HeroCard, MinionCard
+from resources.loader import card_pool
+
+# Empty in-bounds cells next to a face-up tile: where a Ruin may legally be placed
+def placement_frontier(state) -> set:
+    frontier = set()
+    for (r, c), tile in state.map.items():
+        if not tile["face_up"]:
+            continue
+        for dr, dc in NEIGHBOUR_OFFSETS:
+            cell = (r + dr, c + dc)
+            if 0 <= cell[0] < state.rows and 0 <= cell[1] < state.cols and cell not in state.map:
+                frontier.add(cell)
+    return frontier
+
+# Turn plan placing the hand's Ruins on shuffled frontier cells
+def random_placement_plan(state, player: str, rng: random.Random) -> dict:
+    me = 0 if player == "Player1" else 1
+    cells = sorted(placement_frontier(state))
+    rng.shuffle(cells)
+    hand = state.players[me].hand
+    return {"plan": [{"card_index": idx, "pos": pos} for idx, pos in zip(range(len(hand)), cells)]}
+
+# Steps from each face-up tile to `goal` over face-up tiles
+def face_up_distances(state, goal) -> Dict[Tuple[int, int], int]:
+    distances = {goal: 0}
+    queue = deque([goal])
+    while queue:
+        pos = queue.popleft()
+        for npos, tile in state.map.neighbours(pos):
+            if tile["face_up"] and npos not in distances:
+                distances[npos] = distances[pos] + 1
+                queue.append(npos)
+    return distances
+
+# Adventure turn plan: summon what the echoes allow, step every unit one tile along the
+# shortest face-up path to the enemy Gate, then attack whatever is in reach from there
+def greedy_adventure_plan(state, player: str, rng: random.Random) -> dict:
+    me = 0 if player == "Player1" else 1
+    mine = state.players[me]
+    enemy = "Player2" if player == "Player1" else "Player1"
+    enemy_gate = state.gate_positions[enemy]
+
+    summon, echoes = [], mine.echoes
+    for idx, card in enumerate(mine.hand):
+        # Heroes have no printed cost; price cards as game.rules.summon does
+        cost = getattr(card, "cost", 0)
+        if isinstance(card, (MinionCard, HeroCard)) and cost <= echoes:
+            if isinstance(card, HeroCard) and (mine.hero_area or any(isinstance(mine.hand[i], HeroCard) for i in summon)):
+                continue
+            summon.append(idx)
+            echoes -= cost
+
+    distances = face_up_distances(state, enemy_gate)
+    moves, destinations = [], set()
+    for pos, occupants in list(state.occupants.items()):
+        here = distances.get(pos)
+        count = sum(owner == player for owner, _ in occupants)
+        if not count:
+            continue
+        step = pos
+        if here:
+            closer = [npos for npos, _ in state.map.neighbours(pos) if distances.get(npos, here) < here]
+            if closer:
+                step = rng.choice(closer)
+                moves += [{"from": pos, "to": step}] * count
+        destinations.add(step)
+
+    attacks = []
+    enemy_cells = {pos for pos, occupants in state.occupants.items() if any(owner == enemy for owner, _ in occupants)}
+    for pos in destinations:
+        in_reach = [cell for cell in enemy_cells if max(abs(cell[0] - pos[0]), abs(cell[1] - pos[1])) <= 1]
+        if in_reach:
+            attacks.append({"from": pos, "to": rng.choice(in_reach)})
+        elif max(abs(enemy_gate[0] - pos[0]), abs(enemy_gate[1] - pos[1])) <= 1:
+            attacks.append({"from": pos, "to": enemy_gate})
+    return {"plan": {"summon": summon, "moves": moves, "attacks": attacks}}
+
+# Stands in for a client socket: each reply comes from the policy, computed from the live state
+# when the phase reads it. Everything the phase sends is dropped.
+class PolicyConnection:
+    def __init__(self, state: GameState, player: str, policy: Callable, rng: random.Random):
+        self.state = state
+        self.player = player
+        self.policy = policy
+        self.rng = rng
+        self._buffer = b""
+
+    def sendall(self, data: bytes):
+        pass
+
+    def recv(self, n: int) -> bytes:
+        if not self._buffer:
+            self._buffer = frame_message(self.policy(self.state, self.player, self.rng))
+        chunk, self._buffer = self._buffer[:n], self._buffer[n:]
+        return chunk
+
+# Seeded match between two policies, ready for its first turn. Without deck choices each
+# player gets a random hero and gate (see game.init.build_game_state for the choice format).
+def new_headless_match(seed: int, board_size: Optional[Tuple[int, int]] = None, policies=None, choices=None):
+    rng = random.Random(seed)
+    if choices is None:
+        pool = card_pool()
+        choices = [{"hero": rng.choice(pool["heroes"]), "gate": rng.choice(pool["gates"])} for _ in range(2)]
+    state, _ = build_game_state(choices[0], choices[1], rng=rng, board_size=board_size)
+    state.match_id = f"headless-{seed}"
+    prepare_match(state)
+    policies = policies or (random_placement_plan, random_placement_plan)
+    conns = (PolicyConnection(state, "Player1", policies[0], rng),
+             PolicyConnection(state, "Player2", policies[1], rng))
+    return state, conns
+
+# Play Explore turns with no sockets, yielding the state after each turn. The same state
+# object is updated in place, so copy or encode it before advancing the generator.
+def explore_turns(seed: int, board_size: Optional[Tuple[int, int]] = None, max_turns: int = 100,
+                  policies=None, records=None) -> Iterator[GameState]:
+    state, conns = new_headless_match(seed, board_size, policies)
+    for _ in range(max_turns):
+        ExplorePhase(state, conns, records=records).run()
+        yield state
+        if state.check_path_between_gates():
+            return
+
+# Play a whole seeded match, Explore then Adventure, and return the winner; None if
+# nobody has won after max_turns
+def play_headless_match(seed: int, choices=None, board_size: Optional[Tuple[int, int]] = None,
+                        max_turns: int = 200, policies=None, adventure_policy: Callable = greedy_adventure_plan):
+    state, conns = new_headless_match(seed, board_size, policies, choices)
+    rng = conns[0].rng
+    exploring = True
+    for _ in range(max_turns):
+        if exploring:
+            ExplorePhase(state, conns).run()
+            exploring = not state.check_path_between_gates()
+            continue
+        AdventurePhase(state, PolicyConnection(state, state.current_player(), adventure_policy, rng)).run()
+        winner = state.adventure_winner()
+        if winner:
+            return winner
+    return None
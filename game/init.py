@@ -1,33 +1,42 @@
 # Internal imports
-from resources.loader import (
-    load_heroes, load_gates,
-    load_ruins, load_minions,
-    load_gears, load_spells,
-    load_relics, load_glyphs
-)
+from resources.loader import card_pool, current_cards
 from network.protocol import send_obj, recv_obj
+from game.flow import ask
 from game.state import GameState, PlayerState
 
-# Initialize_game sets up the GameState and PlayerStates based on client choices
-def initialize_game(conn1, conn2):
-    # Load all card data
-    heroes = load_heroes()
-    gates = load_gates()
-    ruins = load_ruins()
-    minions = load_minions()
-    gears = load_gears()
-    spells = load_spells()
-    relics = load_relics()
-    glyphs = load_glyphs()
-
-    # Send deck options to both clients
-    deck_options = {'heroes': heroes, 'gates': gates}
+# Initialize_game sets up the GameState and PlayerStates based on client choices.
+# A flow (see game.flow) that waits for each client's deck choice.
+def initialize_game(conn1, conn2, rng=None, board_size=None):
+    # Send deck options to both clients; the match is built from the same card data version
+    cards = current_cards()
+    pool = cards.pool
+    deck_options = {'heroes': list(pool['heroes']), 'gates': list(pool['gates'])}
     send_obj(conn1, deck_options)
     send_obj(conn2, deck_options)
 
     # Receive each client's deck choice
-    choice1 = recv_obj(conn1)['deck_choice']
-    choice2 = recv_obj(conn2)['deck_choice']
+    choice1 = (yield from ask("Player1", "deck_choice"))['deck_choice']
+    choice2 = (yield from ask("Player2", "deck_choice"))['deck_choice']
+
+    return build_game_state(choice1, choice2, rng=rng, board_size=board_size, cards=cards)
+
+# Offer the deck list to a single client and return its full reply
+def request_deck_choice(conn) -> dict:
+    pool = card_pool()
+    send_obj(conn, {'heroes': list(pool['heroes']), 'gates': list(pool['gates'])})
+    return recv_obj(conn)
+
+# Build the GameState from two deck choices; shared by live matches and replays
+def build_game_state(choice1, choice2, rng=None, board_size=None, cards=None):
+    # Every match deals from the same shared prototypes, of the card data version it starts on
+    cards = cards or current_cards()
+    pool = cards.pool
+    ruins = pool['ruins']
+    minions = pool['minions']
+    gears = pool['gears']
+    spells = pool['spells']
+    relics = pool['relics']
+    glyphs = pool['glyphs']
 
     # Construct PlayerState for each player
     p1_state = PlayerState(
@@ -38,7 +47,10 @@ def initialize_game(conn1, conn2):
         gears=gears,
         spells=spells,
         relics=relics,
-        glyphs=glyphs
+        glyphs=glyphs,
+        rng=rng,
+        exp_cards=choice1.get('exp_deck'),
+        adventure_cards=choice1.get('adventure_deck'),
     )
 
     p2_state = PlayerState(
@@ -49,10 +61,66 @@ def initialize_game(conn1, conn2):
         gears=gears,
         spells=spells,
         relics=relics,
-        glyphs=glyphs
+        glyphs=glyphs,
+        rng=rng,
+        exp_cards=choice2.get('exp_deck'),
+        adventure_cards=choice2.get('adventure_deck'),
     )
 
     # Create shared GameState
-    state = GameState(p1_state, p2_state)
+    state = GameState(p1_state, p2_state, board_size=board_size)
+    state.card_version = cards.version
+    state.card_digest = cards.digest
+
+    return state, (p1_state, p2_state)
+
+# Look up a deck choice by card names (used when rebuilding a recorded match)
+def deck_choice_from_names(hero_name: str, gate_name: str) -> dict:
+    pool = card_pool()
+    hero = next(h for h in pool['heroes'] if h.name == hero_name)
+    gate = next(g for g in pool['gates'] if g.name == gate_name)
+    return {'hero': hero, 'gate': gate}
+
+# Deck choice with explicit decks from a decks.json entry. Names not in the card pool
+# (including blank placeholder slots) are skipped, so a deck may come back short.
+def deck_choice_from_decklist(entry: dict) -> dict:
+    pool = card_pool()
+    choice = deck_choice_from_names(entry['hero_name'], entry['gate_name'])
+    by_name = {card.name: card for key in ('ruins', 'minions', 'gears', 'spells', 'relics', 'glyphs') for card in pool[key]}
+    for deck in ('exp_deck', 'adventure_deck'):
+        if deck not in entry:
+            continue
+        cards = []
+        for line in entry[deck]:
+            card = by_name.get(line['name'])
+            if card is not None:
+                cards += [card] * line['count']
+        choice[deck] = cards
+    return choice
+
+# A deck choice as a decks.json-style entry, for deck_choice_from_decklist to rebuild. Each deck
+# is written as runs of the same card in the order given, since the shuffle depends on that order.
+# Decks left to be drawn at random are left out.
+def decklist_from_choice(choice: dict) -> dict:
+    entry = {'hero_name': choice['hero'].name, 'gate_name': choice['gate'].name}
+    for deck in ('exp_deck', 'adventure_deck'):
+        if choice.get(deck) is None:
+            continue
+        lines = []
+        for card in choice[deck]:
+            if lines and lines[-1]['name'] == card.name:
+                lines[-1]['count'] += 1
+            else:
+                lines.append({'name': card.name, 'count': 1})
+        entry[deck] = lines
+    return entry
+
+# Deal opening hands and seed the board; shared by live matches and replays
+def prepare_match(state):
+    state.deal_starting_hands()
+    setup_initial_board(state)
 
-    return state, (p1_state, p2_state)
\ No newline at end of file
+# Place the Gates and starting heroes so clients render the board immediately.
+def setup_initial_board(state):
+    state.pending_reveals = []
+    state.place_gates()
@@ -0,0 +1,209 @@
+# External Imports
+from typing import NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Internal Imports
+from config import OBS_HAND_SLOTS, OBS_BATCH_SIZE
+from game.board import NEIGHBOUR_OFFSETS, EMPTY_CODE, FIRST_TERRAIN_CODE, terrain_codes
+from game.rules import movement_allowance, opponent_of
+from game.triggers import movement_cost
+from resources.card_table import CARD_KINDS, TILE_KINDS, card_table
+
+# Per-player numbers, in column order of Observation.scalars
+SCALARS = (
+    "turn", "is_active", "echoes", "enemy_echoes", "gate_health", "enemy_gate_health",
+    "hand", "enemy_hand", "explore_deck", "enemy_explore_deck", "adventure_deck", "enemy_adventure_deck",
+)
+
+# Piece channels, in order
+PIECES = ("units", "enemy_units", "gate", "enemy_gate")
+
+# Attack targets of a cell, in order of the last axis of Observation.legal_attack: the enemy
+# unit on the cell itself or a neighbour, then the enemy Gate, which game.rules lets a unit
+# strike from any range while no enemy stands on it
+ATTACK_OFFSETS = ((0, 0),) + NEIGHBOUR_OFFSETS
+ATTACK_GATE = len(ATTACK_OFFSETS)
+
+# One batch of encoded states. Arrays are views into the encoder's buffers and are
+# overwritten by its next encode() call; copy them to keep them.
+class Observation(NamedTuple):
+    cells: np.ndarray        # (N, rows, cols, channels) uint8 one-hot cell code (see game.board.EMPTY_CODE)
+    pieces: np.ndarray       # (N, rows, cols, 4) uint8 counts, see PIECES
+    scalars: np.ndarray      # (N, len(SCALARS)) float32
+    hand: np.ndarray         # (N, hand_slots) int16 card ids, -1 for an empty slot
+    legal_place: np.ndarray  # (N, hand_slots, rows, cols) bool: hand slot may go on that cell
+    legal_summon: np.ndarray  # (N, hand_slots) bool: hand slot is affordable and playable now
+    legal_move: np.ndarray    # (N, rows, cols, 8) bool: unit on the cell may step to NEIGHBOUR_OFFSETS[k]
+    legal_attack: np.ndarray  # (N, rows, cols, ATTACK_GATE + 1) bool, see ATTACK_OFFSETS
+
+# Turns GameStates into fixed-shape arrays, many at a time, from one player's perspective:
+# face-down Ruins show only as face-down, the opponent's hand only as a count, and Player2's
+# board is flipped vertically so every player sees their own Gate on the bottom row.
+# Move and attack masks follow game.rules for the first friendly unit on each cell, the one a
+# move or attack without a "unit" key acts on, and take neighbour offsets in the flipped frame.
+class ObservationEncoder:
+    def __init__(self, rows: int, cols: int, hand_slots: int = OBS_HAND_SLOTS, capacity: int = OBS_BATCH_SIZE):
+        self.rows = rows
+        self.cols = cols
+        self.hand_slots = hand_slots
+        self.capacity = capacity
+
+        # Card ids are rows of the numeric card table, shared between processes when published
+        table = card_table()
+        self.channels = FIRST_TERRAIN_CODE + len(terrain_codes())
+        self.card_ids = table.ids
+        # Indexed by card id + 1, so the -1 padding maps to False
+        self._is_ruin = np.zeros(len(table.names) + 1, dtype=bool)
+        self._is_ruin[table.kind("ruins")["id"].astype(np.intp) + 1] = True
+        self._cost = np.zeros(len(table.names) + 1, dtype=np.int16)
+        self._cost[table.cards["id"].astype(np.intp) + 1] = table.cards["cost"]
+        # Tiles are never summoned; game.rules.summon plays every other kind from hand
+        self._playable = np.zeros(len(table.names) + 1, dtype=bool)
+        for kind in set(CARD_KINDS) - set(TILE_KINDS):
+            self._playable[table.kind(kind)["id"].astype(np.intp) + 1] = True
+        self._is_hero = np.zeros(len(table.names) + 1, dtype=bool)
+        self._is_hero[table.kind("heroes")["id"].astype(np.intp) + 1] = True
+        # Board offsets of each observation offset, per perspective (Player2's rows run backwards)
+        self._offsets = {"Player1": NEIGHBOUR_OFFSETS, "Player2": tuple((-dr, dc) for dr, dc in NEIGHBOUR_OFFSETS)}
+        self._attack_offsets = {"Player1": ATTACK_OFFSETS, "Player2": tuple((-dr, dc) for dr, dc in ATTACK_OFFSETS)}
+        self._one_hot = np.eye(self.channels, dtype=np.uint8)
+        self._padding = [-1] * hand_slots
+
+        # Preallocated outputs and scratch space
+        self._adjacent = np.zeros((capacity, rows + 2, cols + 2), dtype=bool)
+        self.cells = np.zeros((capacity, rows, cols, self.channels), dtype=np.uint8)
+        self.pieces = np.zeros((capacity, rows, cols, len(PIECES)), dtype=np.uint8)
+        self.scalars = np.zeros((capacity, len(SCALARS)), dtype=np.float32)
+        self.hand = np.zeros((capacity, hand_slots), dtype=np.int16)
+        self.legal_place = np.zeros((capacity, hand_slots, rows, cols), dtype=bool)
+        self.legal_summon = np.zeros((capacity, hand_slots), dtype=bool)
+        self.legal_move = np.zeros((capacity, rows, cols, len(NEIGHBOUR_OFFSETS)), dtype=bool)
+        self.legal_attack = np.zeros((capacity, rows, cols, ATTACK_GATE + 1), dtype=bool)
+
+    # Encode states[i] as seen by perspectives[i] ("Player1"/"Player2"; default: each state's active player)
+    def encode(self, states: Sequence, perspectives: Optional[Sequence[str]] = None) -> Observation:
+        n = len(states)
+        if n > self.capacity:
+            raise ValueError(f"Batch of {n} states exceeds encoder capacity {self.capacity}")
+        if perspectives is None:
+            perspectives = ["Player1" if state.active_player == 0 else "Player2" for state in states]
+        rows, cols, slots = self.rows, self.cols, self.hand_slots
+        cells_per_state = rows * cols
+
+        # One pass over the Python objects. Boards keep a dense code array, so each costs one copy;
+        # everything is gathered in board orientation and Player2's rows are flipped afterwards.
+        boards, flipped, piece_index, scalars, hand = [], [], [], [], []
+        heroes_out, move_index, attack_index = [], [], []
+        card_ids = self.card_ids
+        padding = self._padding
+        for i, (state, player) in enumerate(zip(states, perspectives)):
+            if (state.rows, state.cols) != (rows, cols):
+                raise ValueError(f"State board is {state.rows}x{state.cols}, encoder expects {rows}x{cols}")
+            me = 0 if player == "Player1" else 1
+            if me:
+                flipped.append(i)
+            boards.append(state.map.dense_codes())
+            base = i * cells_per_state
+            for (r, c), occupants in state.occupants.items():
+                cell = (base + r * cols + c) * 4
+                for owner, _ in occupants:
+                    piece_index.append(cell + (owner != player))
+            for label, (r, c) in state.gate_positions.items():
+                piece_index.append((base + r * cols + c) * 4 + (2 if label == player else 3))
+
+            mine, theirs = state.players[me], state.players[1 - me]
+            scalars.append((
+                state.turn, state.active_player == me, mine.echoes, theirs.echoes,
+                mine.gate.gate_health, theirs.gate.gate_health, len(mine.hand), len(theirs.hand),
+                len(mine.exp_deck), len(theirs.exp_deck), len(mine.adventure_deck), len(theirs.adventure_deck),
+            ))
+            ids = [card_ids[card.name] for card in mine.hand[:slots]]
+            hand += ids
+            hand += padding[:slots - len(ids)]
+            heroes_out.append(bool(mine.hero_area))
+            self._unit_actions(state, player, i, move_index, attack_index)
+
+        # Everything else is whole-batch array work
+        codes = np.frombuffer(b"".join(boards), dtype=np.uint8).reshape(n, rows, cols)
+        counts = np.bincount(piece_index, minlength=n * cells_per_state * 4).reshape(n, rows, cols, 4)
+        if flipped:
+            codes = codes.copy()
+            codes[flipped] = codes[flipped, ::-1]
+            counts[flipped] = counts[flipped, ::-1]
+        np.take(self._one_hot, codes, axis=0, out=self.cells[:n])
+        np.minimum(counts, 255, out=self.pieces[:n], casting="unsafe")
+        self.scalars[:n] = scalars
+        self.hand[:n] = np.asarray(hand, dtype=np.int16).reshape(n, slots)
+
+        # A Ruin from hand may go on any empty cell touching a face-up tile
+        adjacent = self._adjacent[:n]
+        adjacent.fill(False)
+        face_up = codes >= FIRST_TERRAIN_CODE
+        for dr, dc in NEIGHBOUR_OFFSETS:
+            adjacent[:, 1 + dr:1 + dr + rows, 1 + dc:1 + dc + cols] |= face_up
+        open_cells = adjacent[:, 1:-1, 1:-1] & (codes == EMPTY_CODE)
+        ruin_slots = self._is_ruin[self.hand[:n] + 1]
+        np.logical_and(ruin_slots[:, :, None, None], open_cells[:, None], out=self.legal_place[:n])
+
+        # A card from hand if the echoes cover it, and a Hero only while none is in play
+        hand_ids = self.hand[:n] + 1
+        summon = self.legal_summon[:n]
+        np.less_equal(self._cost[hand_ids], self.scalars[:n, 2:3], out=summon)
+        summon &= self._playable[hand_ids]
+        summon &= ~(self._is_hero[hand_ids] & np.asarray(heroes_out)[:, None])
+
+        # Moves and attacks were gathered as flat indices into their masks
+        for mask, index in ((self.legal_move[:n], move_index), (self.legal_attack[:n], attack_index)):
+            flat = mask.reshape(-1)
+            flat.fill(False)
+            flat[index] = True
+
+        return Observation(self.cells[:n], self.pieces[:n], self.scalars[:n], self.hand[:n], self.legal_place[:n],
+                           summon, self.legal_move[:n], self.legal_attack[:n])
+
+    # Flat mask indices of the moves and attacks open to the first unit `player` has on each
+    # cell of state i, checked as game.rules.move_unit and game.rules.attack check them
+    def _unit_actions(self, state, player: str, i: int, move_index: list, attack_index: list):
+        rows, cols = self.rows, self.cols
+        moves, attacks = len(NEIGHBOUR_OFFSETS), ATTACK_GATE + 1
+        flip = player != "Player1"
+        exhausted = state.exhausted_units
+        just_summoned = getattr(state, "just_summoned", ())
+
+        # The unit each friendly cell acts with, and the cells holding an enemy it may strike:
+        # Backline shields the first enemy on a Ruin while another shares it
+        units, targets = {}, set()
+        for pos, occupants in state.occupants.items():
+            enemies = []
+            for owner, u in occupants:
+                if owner != player:
+                    enemies.append(u)
+                elif pos not in units:
+                    units[pos] = u
+            if enemies and not (len(enemies) > 1 and "Backline" in getattr(enemies[0], "keywords", [])):
+                targets.add(pos)
+        enemy_gate = state.gate_positions.get(opponent_of(player))
+        gate_open = enemy_gate is not None and not any(owner != player for owner, _ in state.occupants.get(enemy_gate, ()))
+
+        for (r, c), unit in units.items():
+            cell = (i * rows + (rows - 1 - r if flip else r)) * cols + c
+            if id(unit) not in exhausted:
+                allowance = movement_allowance(state, unit, (r, c))
+                for k, (dr, dc) in enumerate(self._offsets[player]):
+                    dest = (r + dr, c + dc)
+                    if 0 <= dest[0] < rows and 0 <= dest[1] < cols and movement_cost(state, player, unit, (r, c), dest) <= allowance:
+                        move_index.append(cell * moves + k)
+
+            # Units summoned this turn only strike Gates, unless they have Bloodlust
+            if targets and not (unit in just_summoned and "Bloodlust" not in getattr(unit, "keywords", [])):
+                for k, (dr, dc) in enumerate(self._attack_offsets[player]):
+                    if (r + dr, c + dc) in targets:
+                        attack_index.append(cell * attacks + k)
+            if gate_open:
+                attack_index.append(cell * attacks + ATTACK_GATE)
+
+    # Board position of an observation cell for `player` (undoes Player2's flip)
+    def board_pos(self, cell: Tuple[int, int], player: str) -> Tuple[int, int]:
+        r, c = cell
+        return (r, c) if player == "Player1" else (self.rows - 1 - r, c)
@@ -0,0 +1,145 @@
+# External Imports
+import json
+import logging
+import pickle
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    match_id   TEXT PRIMARY KEY,
+    seed       INTEGER NOT NULL,
+    status     TEXT NOT NULL,
+    turn       INTEGER NOT NULL,
+    snapshot   BLOB,
+    updated_at REAL NOT NULL,
+    seats      TEXT,
+    owner      INTEGER
+)
+"""
+
+# Columns added since the first schema, for databases created before them
+MIGRATIONS = {
+    "seats": "ALTER TABLE matches ADD COLUMN seats TEXT",
+    "owner": "ALTER TABLE matches ADD COLUMN owner INTEGER",
+}
+
+# A match that was still running when its last checkpoint was written
+class SavedMatch(NamedTuple):
+    match_id: str
+    seed: int
+    turn: int
+    state: object
+    rng_state: object
+    # Digests of each seat's token (network.sessions), in player order; empty for older matches
+    seats: Tuple[str, ...] = ()
+    # Worker that last ran the match; None when a single-process server did
+    owner: Optional[int] = None
+
+# Persists the latest GameState of every live match; writes happen on a background thread.
+# Worker processes share one database, each saving its matches under its own worker ID (owner).
+class CheckpointStore:
+    def __init__(self, path, owner: Optional[int] = None):
+        self.path = Path(path)
+        self.owner = owner
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._queue: "queue.Queue" = queue.Queue()
+        with self._connect() as db:
+            db.execute(SCHEMA)
+            columns = {row[1] for row in db.execute("PRAGMA table_info(matches)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    try:
+                        db.execute(statement)
+                    except sqlite3.OperationalError:
+                        # Another worker starting alongside this one added it first
+                        if column not in {row[1] for row in db.execute("PRAGMA table_info(matches)")}:
+                            raise
+        self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        db = sqlite3.connect(self.path)
+        # WAL keeps each commit atomic on disk and lets readers run alongside the writer
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # Snapshot the state on the caller's thread, then hand the bytes to the writer
+    def save(self, match_id: str, seed: int, state, rng=None):
+        rng_state = rng.getstate() if rng is not None else None
+        blob = pickle.dumps((state, rng_state), protocol=pickle.HIGHEST_PROTOCOL)
+        self._queue.put(("save", match_id, seed, state.turn, blob, self.owner))
+
+    # Record the digests of the tokens players rejoin the match with after a restart
+    def seat(self, match_id: str, digests: Sequence[str]):
+        self._queue.put(("seat", match_id, json.dumps(list(digests))))
+
+    def finish(self, match_id: str):
+        self._queue.put(("finish", match_id))
+
+    def _write_loop(self):
+        db = self._connect()
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            try:
+                if item[0] == "save":
+                    _, match_id, seed, turn, blob, owner = item
+                    db.execute(
+                        "INSERT INTO matches (match_id, seed, status, turn, snapshot, updated_at, owner) "
+                        "VALUES (?, ?, 'running', ?, ?, ?, ?) ON CONFLICT (match_id) DO UPDATE SET "
+                        "seed = excluded.seed, status = 'running', turn = excluded.turn, "
+                        "snapshot = excluded.snapshot, updated_at = excluded.updated_at, owner = excluded.owner",
+                        (match_id, seed, turn, zlib.compress(blob, 1), time.time(), owner),
+                    )
+                elif item[0] == "seat":
+                    db.execute("UPDATE matches SET seats = ? WHERE match_id = ?", (item[2], item[1]))
+                else:
+                    db.execute(
+                        "UPDATE matches SET status = 'finished', snapshot = NULL, updated_at = ? WHERE match_id = ?",
+                        (time.time(), item[1]),
+                    )
+                db.commit()
+            except sqlite3.Error:
+                self.logger.exception("Failed to write checkpoint for %s", item[1])
+            finally:
+                self._queue.task_done()
+        db.close()
+
+    # Matches whose last checkpoint was never followed by a finish
+    def unfinished_matches(self) -> List[SavedMatch]:
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT match_id, seed, turn, snapshot, seats, owner FROM matches WHERE status = 'running' "
+                "ORDER BY updated_at"
+            ).fetchall()
+        saved = []
+        for match_id, seed, turn, snapshot, seats, owner in rows:
+            state, rng_state = pickle.loads(zlib.decompress(snapshot))
+            saved.append(SavedMatch(match_id, seed, turn, state, rng_state,
+                                    tuple(json.loads(seats)) if seats else (), owner))
+        return saved
+
+    # Whether a match is still running and which worker last ran it (see SavedMatch.owner)
+    def owner_of(self, match_id: str) -> Tuple[bool, Optional[int]]:
+        with self._connect() as db:
+            row = db.execute("SELECT owner FROM matches WHERE match_id = ? AND status = 'running'",
+                             (match_id,)).fetchone()
+        return (False, None) if row is None else (True, row[0])
+
+    # Block until every queued write has reached disk
+    def flush(self):
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = None):
+        self._queue.put(None)
+        self._writer.join(timeout)
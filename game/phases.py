@@ -1,50 +1,62 @@
 # External Imports
 import logging
-from typing import Tuple
+from collections import Counter, deque
+from typing import Deque, Optional, Tuple
 
 # Internal Imports
 from game.state import GameState
-from models import MinionCard, HeroCard, RelicCard, GearCard, SpellCard, GlyphCard
-from network.protocol import send_obj, recv_obj
+from game.effects import resolve_connections
+from game import rules
+from game.flow import ask, drive
+from game.triggers import fire_occupy, fire_start_of_turn
+from game.views import project_state, PLAYER_LABELS
+from network.protocol import send_obj
+from network.broadcast import Broadcaster
+from metrics import timed_step
 
 class ExplorePhase:
     # Runs one full turn of the Explore Phase
-    def __init__(self, state: GameState, connections: Tuple):
+    def __init__(self, state: GameState, connections: Tuple, recorder=None, broadcaster=None, records=None):
         self.state = state
         self.p1_conn, self.p2_conn = connections
+        self.recorder = recorder
+        self.broadcaster = broadcaster or Broadcaster(connections)
+        # Turn-level analytics sink (game.records.RecordWriter), if any
+        self.records = records
+        self.revealed = 0
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    # Play the turn on blocking connections
     def run(self):
+        drive(self.turn(), self.connection_for, self.state.match_id)
+
+    def connection_for(self, player: str):
+        return self.p1_conn if player == "Player1" else self.p2_conn
+
+    # The turn as a flow (see game.flow), waiting on each placement choice
+    def turn(self):
         self.logger.info("Explore Phase: turn %d start", self.state.turn)
         self._step_gate_placement()
         self._step_draw()
-        self._step_placement()
+        yield from self._step_placement()
         self._step_reveal_and_resolve()
         self._step_path_check()
+        if self.records is not None:
+            self.records.record_turn(self.state, "explore", placed=self.revealed)
         self.state.advance_turn()
         self.logger.info("Explore Phase: turn %d end", self.state.turn)
 
+    @timed_step("explore")
     def _step_gate_placement(self):
         # Place both Gates on the board at starting positions and notify clients
-        if not self.state.map:
-            # Define starting positions (Player1 bottom middle, Player2 top middle)
-            rows = getattr(self.state, 'rows', 7)
-            cols = getattr(self.state, 'cols', 7)
-            p1_pos = (rows - 1, cols // 2)
-            p2_pos = (0, cols // 2)
-            self.state.map[p1_pos] = {"card": self.state.players[0].gate, "face_up": True}
-            self.state.map[p2_pos] = {"card": self.state.players[1].gate, "face_up": True}
-            # Place heroes at their gate positions
-            self.state.occupants[p1_pos] = [("Player1", self.state.players[0].hero)]
-            self.state.occupants[p2_pos] = [("Player2", self.state.players[1].hero)]
-            # Record gate positions for path checking
-            self.state.gate_positions = {"Player1": p1_pos, "Player2": p2_pos}
+        if not self.state.gate_positions:
+            self.state.place_gates()
         
         # Broadcast gate placement step to both clients
-        send_obj(self.p1_conn, {"phase": "explore", "step": "gate_placement"})
-        send_obj(self.p2_conn, {"phase": "explore", "step": "gate_placement"})
+        self.broadcaster.broadcast({"phase": "explore", "step": "gate_placement"})
         self.logger.debug("Both Gates placed on board")
 
+    @timed_step("explore")
     def _step_draw(self):
         # Each player draws cards from their explore deck up to their Gate's Explore Hand size
         for idx, (player_name, conn) in enumerate((("Player1", self.p1_conn), ("Player2", self.p2_conn))):
@@ -70,7 +82,10 @@ class ExplorePhase:
         
         self.logger.debug("Explore draw step complete")
 
-    # Alternating facedown Ruin placement until both players pass
+    # Alternating facedown Ruin placement until both players pass.
+    # A player may answer the first prompt with a whole plan; its entries are then
+    # played one per round without further prompts and the outcome sent back at the end.
+    @timed_step("explore")
     def _step_placement(self):
         
         # Determine player order: lead player goes first
@@ -79,6 +94,8 @@ class ExplorePhase:
             order.reverse()
         
         pass_flags = [False, False]
+        plans = [None, None]
+        results = [[], []]
         any_placed = True
         
         while any_placed and not (pass_flags[0] and pass_flags[1]):
@@ -86,116 +103,134 @@ class ExplorePhase:
             for player, conn, idx in order:
                 if pass_flags[idx]:
                     continue
-                send_obj(conn, {"phase": "explore", "step": "placement", "player": player})
-                choice = recv_obj(conn)
+                if plans[idx] is None:
+                    # The hand after this turn's draw, which choices and plan indices refer to
+                    send_obj(conn, {"phase": "explore", "step": "placement", "player": player, "plans": True,
+                                    "hand": list(self.state.players[idx].hand)})
+                    choice = yield from ask(player, "placement", self.recorder)
+                    if isinstance(choice, dict) and "plan" in choice:
+                        plans[idx] = self._resolve_placement_plan(idx, choice["plan"])
+
+                # Turn plan: play the next entry that is still legal, passing once it runs out
+                if plans[idx] is not None:
+                    while plans[idx]:
+                        card, pos = plans[idx].popleft()
+                        error = self._place_ruin(player, idx, card, pos)
+                        results[idx].append({"action": "place", "pos": pos, "ok": error is None, "detail": error or card.name})
+                        if error is None:
+                            any_placed = True
+                            break
+                    else:
+                        pass_flags[idx] = True
+                    continue
                 
                 # Player chooses to pass placement
                 if not choice or choice.get("pass"):
                     pass_flags[idx] = True
                     self.logger.debug("%s passed on placing a Ruin", player)
+                    continue
                 
                 # Validate and apply placement choice
-                else:
-                    card_index = choice.get("card_index", None)
-                    pos = choice.get("pos", None)
-                    # Invalid choice format, skip
-                    if card_index is None or pos is None:
-                        self.logger.warning("Invalid placement choice from %s: %s", player, choice)
-                        pass_flags[idx] = True
-                        continue
-                    
-                    # Ensure chosen card is in player's hand
-                    player_state = self.state.players[idx]
-                    if not (0 <= card_index < len(player_state.hand)):
-                        self.logger.warning("%s chose an invalid card index %s", player, card_index)
-                        pass_flags[idx] = True
-                        continue
-                    
-                    ruin_card = player_state.hand.pop(card_index)
-                    
-                    # Validate position is empty and adjacent to at least one face-up tile
-                    if pos in self.state.map:
-                        self.logger.warning("Position %s already occupied, placement by %s rejected", pos, player)
-                        continue
-                    r, c = pos
-                    rows = getattr(self.state, 'rows', 7)
-                    cols = getattr(self.state, 'cols', 7)
-                    
-                    if not (0 <= r < rows and 0 <= c < cols):
-                        self.logger.warning("Position %s out of bounds, placement by %s rejected", pos, player)
-                        continue
-                    
-                    # Check for legal connection
-                    connected = False
-                    for dr in (-1, 0, 1):
-                        for dc in (-1, 0, 1):
-                            if dr == 0 and dc == 0:
-                                continue
-                            neighbor = (r+dr, c+dc)
-                            
-                            if neighbor in self.state.map and self.state.map[neighbor]["face_up"]:
-                                connected = True
-                                break
-                        
-                        if connected:
-                            break
-                    
-                    if not connected:
-                        # No legal connection, treat as pass (could trigger mulligan ideally)
-                        self.logger.debug("%s had no legal connection for %s at %s, skipping", player, ruin_card.name, pos)
-                        pass_flags[idx] = True
-                        continue
-                    
-                    # Place ruin face down
-                    self.state.map[pos] = {"card": ruin_card, "face_up": False}
-                    
-                    # No occupants yet for a ruin environment
+                card_index = choice.get("card_index", None)
+                pos = choice.get("pos", None)
+                # Invalid choice format, skip
+                if card_index is None or pos is None:
+                    self.logger.warning("Invalid placement choice from %s: %s", player, choice)
+                    pass_flags[idx] = True
+                    continue
+                
+                # Ensure chosen card is in player's hand
+                player_state = self.state.players[idx]
+                if not (0 <= card_index < len(player_state.hand)):
+                    self.logger.warning("%s chose an invalid card index %s", player, card_index)
+                    pass_flags[idx] = True
+                    continue
+
+                error = self._place_ruin(player, idx, player_state.hand[card_index], tuple(pos))
+                if error is None:
                     any_placed = True
-                    self.logger.debug("%s placed %s at %s face down", player, ruin_card.name, pos)
+                elif error == "no legal connection":
+                    # No legal connection, treat as pass (could trigger mulligan ideally)
+                    pass_flags[idx] = True
             # End for loop of one round
 
+        # Players who sent a plan get every entry's outcome in a single message
+        for player, conn, idx in order:
+            if plans[idx] is not None:
+                send_obj(conn, {"phase": "explore", "step": "plan_result", "player": player, "results": results[idx]})
+
         # After placement, any cards remaining in hand are returned to bottom of Exp_deck (mulligan step)
         for player_state in self.state.players:
             while player_state.hand:
                 card = player_state.hand.pop(0)
                 player_state.exp_deck.append(card)
 
-    # Flip all facedown Ruins face-up and resolve any connection effects
+    # Turn plan indices refer to the hand as it was when the plan was sent
+    def _resolve_placement_plan(self, idx: int, plan) -> Deque:
+        hand = list(self.state.players[idx].hand)
+        entries = deque()
+        used = set()
+        for entry in plan or ():
+            card_index = entry.get("card_index") if isinstance(entry, dict) else None
+            pos = entry.get("pos") if isinstance(entry, dict) else None
+            if card_index is None or pos is None or not (0 <= card_index < len(hand)) or card_index in used:
+                self.logger.warning("Dropping invalid plan entry: %s", entry)
+                continue
+            used.add(card_index)
+            entries.append((hand[card_index], tuple(pos)))
+        return entries
+
+    # Place a Ruin from hand face down; returns why the placement was rejected, or None
+    def _place_ruin(self, player: str, idx: int, ruin_card, pos) -> Optional[str]:
+        # Validate position is empty and adjacent to at least one face-up tile
+        if pos in self.state.map:
+            self.logger.warning("Position %s already occupied, placement by %s rejected", pos, player)
+            return "occupied"
+        if not self.state.map.in_bounds(pos):
+            self.logger.warning("Position %s out of bounds, placement by %s rejected", pos, player)
+            return "out of bounds"
+        
+        # Check for legal connection
+        if not self.state.map.has_face_up_neighbour(pos):
+            self.logger.debug("%s had no legal connection for %s at %s, skipping", player, ruin_card.name, pos)
+            return "no legal connection"
+
+        hand = self.state.players[idx].hand
+        for i, card in enumerate(hand):
+            if card is ruin_card:
+                hand.pop(i)
+                break
+        else:
+            return "card no longer in hand"
+        
+        # Place ruin face down
+        self.state.map[pos] = {"card": ruin_card, "face_up": False}
+        self.state.pending_reveals.append(pos)
+        
+        # No occupants yet for a ruin environment
+        self.logger.debug("%s placed %s at %s face down", player, ruin_card.name, pos)
+        return None
+
+    # Flip the Ruins placed this turn face-up and resolve any connection effects
+    @timed_step("explore")
     def _step_reveal_and_resolve(self): 
-        new_connections = []
-        for pos, tile in list(self.state.map.items()):
-            if not tile["face_up"]:
-                tile["face_up"] = True
-                new_connections.append((pos, tile["card"]))
+        revealed = self.state.pending_reveals
+        self.state.pending_reveals = []
+        self.revealed = len(revealed)
+        for pos in revealed:
+            self.state.map.set_face_up(pos)
+            self.state.triggers.register_tile(pos, self.state.map[pos]["card"])
 
         # Resolve connection effects triggered by newly revealed connections
-        effects_triggered = []
-        
-        # Check neighbors for required terrain connections
-        for pos, card in new_connections:
-            for dr in (-1, 0, 1):
-                for dc in (-1, 0, 1):
-                    if dr == 0 and dc == 0:
-                        continue
-                    neighbor_pos = (pos[0]+dr, pos[1]+dc)
-                    
-                    if neighbor_pos in self.state.map and self.state.map[neighbor_pos]["face_up"]:
-                        neighbor_card = self.state.map[neighbor_pos]["card"]
-                        if ("Legally Connects" in card.ability or "Connection:" in card.ability):
-                            if neighbor_card.terrain in card.ability or (neighbor_card.sub_terrain and neighbor_card.sub_terrain in card.ability):
-                                effects_triggered.append(f"{card.name} connected to {neighbor_card.terrain}")
-                        
-                        if ("Legally Connects" in neighbor_card.ability or "Connection:" in neighbor_card.ability):
-                            if card.terrain in neighbor_card.ability or (card.sub_terrain and card.sub_terrain in neighbor_card.ability):
-                                effects_triggered.append(f"{neighbor_card.name} connected to {card.terrain}")
+        effects_triggered = resolve_connections(self.state.map, revealed)
         
         # Notify clients of reveal and any triggered effects
         reveal_msg = {"phase": "explore", "step": "reveal", "effects": effects_triggered}
-        send_obj(self.p1_conn, reveal_msg)
-        send_obj(self.p2_conn, reveal_msg)
-        self.logger.debug("Revealed all facedown ruins, connection effects: %s", effects_triggered)
+        self.broadcaster.broadcast(reveal_msg)
+        self.logger.debug("Revealed %d facedown ruins, connection effects: %s", len(revealed), effects_triggered)
 
     # Check for a continuous path between Gates (To move to Adv. Phase)
+    @timed_step("explore")
     def _step_path_check(self):
         path_exists = self.state.check_path_between_gates()
         self.logger.debug("Path exists between gates: %s", path_exists)
@@ -203,51 +238,93 @@ class ExplorePhase:
 
 # Runs one full turn of the Adventure Phase
 class AdventurePhase:
-    def __init__(self, state: GameState, connection):
+    def __init__(self, state: GameState, connection, recorder=None, records=None):
         self.state = state
         self.conn = connection
+        self.recorder = recorder
+        self.records = records
+        # Turn plan sent in reply to the summoning prompt, if any, and the outcome of each entry
+        self.plan = None
+        self.plan_results = []
+        # Accepted actions by kind ("summon", "move", "attack") plus "rejected"
+        self.actions = Counter()
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    # Play the turn on a blocking connection
     def run(self):
+        drive(self.turn(), lambda player: self.conn, self.state.match_id)
+
+    # The turn as a flow (see game.flow), waiting on the active player's choices
+    def turn(self):
         active = self.state.current_player()
         self.logger.info("Adventure Phase: %s turn start", active)
         self._step_echo_gain(active)
         self._step_draw(active)
         self._step_maintenance(active)
-        self._step_summoning(active)
-        self._step_movement(active)
-        self._step_combat(active)
+        yield from self._step_summoning(active)
+        yield from self._step_movement(active)
+        yield from self._step_combat(active)
         self._step_end(active)
+        if self.records is not None:
+            self.records.record_turn(self.state, "adventure", actions=self.actions)
         self.state.advance_turn()
         self.logger.info("Adventure Phase: %s turn end", active)
 
+    # Count an action's outcome and pass it through
+    def _tally(self, action: str, result: Tuple[bool, str]) -> Tuple[bool, str]:
+        self.actions[action if result[0] else "rejected"] += 1
+        return result
+
     # Grant echoes to the active player
+    @timed_step("adventure")
     def _step_echo_gain(self, player: str): 
         send_obj(self.conn, {"phase": "adventure", "step": "echo_gain", "player": player})
         self.state.gain_echoes()
         self.logger.debug("%s gained echoes", player)
 
     # Draw adventure cards for the active player
+    @timed_step("adventure")
     def _step_draw(self, player: str):
         send_obj(self.conn, {"phase": "adventure", "step": "draw", "player": player})
         self.state.draw_adventure_cards()
         self.logger.debug("%s drew cards", player)
 
     # Apply any upkeep costs or effects
+    @timed_step("adventure")
     def _step_maintenance(self, player: str):
         send_obj(self.conn, {"phase": "adventure", "step": "maintenance", "player": player})
         self.state.pay_upkeep()
+        for effect in fire_start_of_turn(self.state, player):
+            self.logger.debug("Start of turn: %s", effect)
         self.logger.debug("%s maintenance complete", player)
 
-    # Moves to the Summon Phase
+    # Moves to the Summon Phase. The reply may instead be a turn plan covering
+    # summons, moves and attacks, in which case the later steps skip their prompts.
+    @timed_step("adventure")
     def _step_summoning(self, player: str):
-        send_obj(self.conn, {"phase": "adventure", "step": "summoning", "player": player})
-        choice = recv_obj(self.conn)
+        player_state = self.state.players[0] if player == "Player1" else self.state.players[1]
+        # The hand and echoes after this turn's draw, which plan indices refer to
+        send_obj(self.conn, {"phase": "adventure", "step": "summoning", "player": player, "plans": True,
+                             "hand": list(player_state.hand), "echoes": player_state.echoes})
+        choice = yield from ask(player, "summoning", self.recorder)
         summoned = []
 
         # Track units summoned this turn
         self.state.just_summoned = []
-        if choice:
+        if isinstance(choice, dict) and "plan" in choice:
+            self.plan = choice["plan"] or {}
+            self.plan_results = []
+            # Plan indices refer to the hand as it was when the plan was sent
+            hand = list(player_state.hand)
+            for idx in dict.fromkeys(self.plan.get("summon", ())):
+                if not (isinstance(idx, int) and 0 <= idx < len(hand)):
+                    self.plan_results.append({"action": "summon", "ok": False, "detail": f"invalid card index {idx}"})
+                    continue
+                ok, detail = self._tally("summon", self._summon(player, player_state, hand[idx]))
+                self.plan_results.append({"action": "summon", "ok": ok, "detail": detail})
+                if ok:
+                    summoned.append(hand[idx].name)
+        elif choice:
             cards_to_play = []
             if isinstance(choice, list):
                 cards_to_play = choice
@@ -259,325 +336,123 @@ class AdventurePhase:
                 cards_to_play = [choice["card_index"]]
             
             for idx in cards_to_play:
-                player_state = self.state.players[0] if player == "Player1" else self.state.players[1]
                 if not (0 <= idx < len(player_state.hand)):
                     continue
                 card = player_state.hand[idx]
-                # Check cost
-                cost = getattr(card, "cost", 0)
-                if player_state.echoes < cost:
-                    continue
-                # Pay cost
-                player_state.echoes -= cost
-                
-                # Remove from hand
-                player_state.hand.pop(idx)
-                
-                # Summon minion to player Gate
-                if isinstance(card, MinionCard):
-                    player_state.staging_area.append(card)
-                    gate_pos = self.state.gate_positions[player]
-                    if gate_pos not in self.state.occupants:
-                        self.state.occupants[gate_pos] = []
-                    self.state.occupants[gate_pos].append((player, card))
-                    self.state.just_summoned.append(card)
-                    summoned.append(card.name)
-
-                # Summon hero if not already active
-                elif isinstance(card, HeroCard):
-                    if not player_state.hero_area:
-                        player_state.hero_area.append(card)
-                        gate_pos = self.state.gate_positions[player]
-                        self.state.occupants[gate_pos].append((player, card))
-                        self.state.just_summoned.append(card)
-                        summoned.append(card.name)
-
-                # Add Relic/Gear to Relic Hold and sacrifice oldest if RH is full
-                elif isinstance(card, RelicCard) or isinstance(card, GearCard):
-                    if len(player_state.relic_area) >= player_state.gate.relic_hold:
-                        if player_state.relic_area:
-                            removed = player_state.relic_area.pop(0)
-                            player_state.adventure_discard.append(removed)
-                            self.logger.debug("%s relic hold full, discarded %s", player, removed.name)
-                    player_state.relic_area.append(card)
-                    summoned.append(card.name)
-
-                # Cast spell/glyph and discard immediately
-                elif isinstance(card, SpellCard) or isinstance(card, GlyphCard):
-                    player_state.adventure_discard.append(card)
+                ok, _ = self._tally("summon", self._summon(player, player_state, card))
+                if ok:
                     summoned.append(card.name)
         self.logger.debug("%s summoned: %s", player, summoned)
 
+    # Pay for and play one card from hand
+    def _summon(self, player: str, player_state, card) -> Tuple[bool, str]:
+        return rules.summon(self.state, player, player_state, card)
+
     # Movement Step
+    @timed_step("adventure")
     def _step_movement(self, player: str):
-        send_obj(self.conn, {"phase": "adventure", "step": "movement", "player": player})
-        choice = recv_obj(self.conn)
+        # Units compare by identity, so track them by id
         self.state.moved_units = set()
+        if self.plan is not None:
+            for move in self.plan.get("moves", ()):
+                ok, detail = self._tally("move", self._move(player, move))
+                self.plan_results.append({"action": "move", "ok": ok, "detail": detail})
+            return
+        send_obj(self.conn, {"phase": "adventure", "step": "movement", "player": player})
+        choice = yield from ask(player, "movement", self.recorder)
         if choice:
             moves = choice.get("moves", None) or choice
             if isinstance(moves, dict):
                 moves = [moves]
             for move in moves:
-                origin = move.get("from") or move.get("origin") or move.get("start")
-                dest = move.get("to") or move.get("dest") or move.get("end")
-                if not origin or not dest:
-                    continue
-                origin = tuple(origin)
-                dest = tuple(dest)
-                units_here = self.state.occupants.get(origin, [])
-                unit = None
-
-                # Identify unit by provided key (name)
-                if "unit" in move:
-                    for (owner, u) in units_here:
-                        if owner == player and (move["unit"] == getattr(u, 'name', None) or move["unit"] == getattr(u, 'heroname', None)):
-                            unit = u
-                            break
-                
-                # Default: take first friendly unit at origin
-                else:
-                    for (owner, u) in units_here:
-                        if owner == player:
-                            unit = u
-                            break
-                if not unit:
-                    continue
-
-                # Determine movement allowance
-                base_move = getattr(unit, "movement", 0)
-                remaining = base_move
-                origin_tile = self.state.map.get(origin, {}).get("card")
-                if origin_tile and origin_tile.terrain == "Wetlands":
-                    spec = getattr(unit, "spec_move", [])
-                    has_swampcraft = any("craft" in sm and "Wetland" in sm for sm in spec)
-                    if not has_swampcraft:
-                        remaining = max(0, remaining - ((remaining + 1) // 2))
-                
-                # Compute movement cost for this move
-                cost = 1
-                dest_tile = self.state.map.get(dest, {}).get("card")
-
-                # Check for Exit penalty
-                if origin_tile and "Requires 2 Movement to exit" in origin_tile.ability:
-                    spec = getattr(unit, "spec_move", [])
-                    if not any("craft" in sm and origin_tile.terrain in sm for sm in spec):
-                        cost = max(cost, 2)
-                
-                # Check for Entry penalty
-                if dest_tile and "Requires 2 Movement to enter" in dest_tile.ability:
-                    spec = getattr(unit, "spec_move", [])
-                    if not any("craft" in sm and dest_tile.terrain in sm for sm in spec):
-                        cost = max(cost, 2)
-                
-                # Road effect
-                if origin_tile and "do not require Movement" in origin_tile.ability:
-                    cost = 0
-                if dest_tile and "do not require Movement" in dest_tile.ability:
-                    cost = 0
-                if remaining < cost:
-                    continue
-
-                if (player, unit) in units_here:
-                    units_here.remove((player, unit))
-                if dest not in self.state.occupants:
-                    self.state.occupants[dest] = []
-                self.state.occupants[dest].append((player, unit))
-                self.state.moved_units.add(unit)
-                self.logger.debug("%s moved %s from %s to %s", player, getattr(unit, 'name', 'unit'), origin, dest)
+                self._tally("move", self._move(player, move))
         else:
             self.logger.debug("%s made no movement", player)
 
+    # Move one unit between Ruins if it has the movement to do so
+    def _move(self, player: str, move) -> Tuple[bool, str]:
+        return rules.move_unit(self.state, player, move)
+
     # Combat Step
+    @timed_step("adventure")
     def _step_combat(self, player: str):
+        self.state.attacked_units = set()
+        if self.plan is not None:
+            for attack in self.plan.get("attacks", ()):
+                ok, detail = self._tally("attack", self._attack(player, attack))
+                self.plan_results.append({"action": "attack", "ok": ok, "detail": detail})
+            # One consolidated reply for the whole plan
+            send_obj(self.conn, {"phase": "adventure", "step": "plan_result", "player": player, "results": self.plan_results})
+            return
         # Prompt player to declare and resolve combat
         send_obj(self.conn, {"phase": "adventure", "step": "combat", "player": player})
-        choice = recv_obj(self.conn)
-        self.state.attacked_units = set()
+        choice = yield from ask(player, "combat", self.recorder)
         if choice:
             attacks = choice.get("attacks", None) or choice
             if isinstance(attacks, dict):
                 attacks = [attacks]
             for attack in attacks:
-                atk_from = tuple(attack.get("from") or attack.get("attacker_pos", []))
-                def_from = tuple(attack.get("to") or attack.get("defender_pos", []))
-                if not atk_from or not def_from:
-                    continue
-
-                # Look for Attacker and Defender objects
-                attacker = None
-                defender = None
-                for owner, unit in self.state.occupants.get(atk_from, []):
-                    if owner == player:
-                        attacker = unit
-                        break
-                for owner, unit in self.state.occupants.get(def_from, []):
-                    if owner != player:
-                        defender = unit
-                        break
-                if not attacker:
-                    continue
-                if not defender:
-                    
-                    # If target is opponent's Gate
-                    opponent = "Player1" if player == "Player2" else "Player2"
-                    if def_from == self.state.gate_positions.get(opponent, None):
-                        # Simulate attacking the Gate
-                        atk_speed = getattr(attacker, "speed", 0)
-                        atk_attack = getattr(attacker, "attack", 0)
-                        gate_card = self.state.board[opponent]["gate"]
-                        gate_def = getattr(gate_card, "gate_defense", 0)
-                        gate_health = getattr(gate_card, "gate_health", 0)
-                        
-                        # Attacker always deals damage first since Gates have no speed or attack
-                        dmg = 1 if atk_attack == gate_def else max(0, atk_attack - gate_def)
-                        if dmg > 0:
-                            gate_health -= dmg
-                        if gate_health <= 0:
-                            outcome = f"{getattr(attacker,'name','Attacker')} destroyed {opponent}'s Gate"
-                            gate_card.gate_health = 0
-                        else:
-                            outcome = f"{opponent}'s Gate took {dmg} damage"
-                            gate_card.gate_health = gate_health
-                        self.state.attacked_units.add(attacker)
-                        self.logger.debug("Combat outcome: %s", outcome)
-                    continue
-                # Check Bloodlust: if attacker was just summoned and doesn't have Bloodlust, skip attack
-                if hasattr(self.state, 'just_summoned') and attacker in self.state.just_summoned:
-                    keywords = getattr(attacker, "keywords", [])
-                    if "Bloodlust" not in keywords:
-                        self.logger.debug("Attacker %s summoned this turn without Bloodlust, cannot attack", getattr(attacker, 'name', 'unit'))
-                        continue
-                
-                # Check Backline: defender cannot be targeted if another enemy occupies same Ruin
-                def_keywords = getattr(defender, "keywords", [])
-                if "Backline" in def_keywords:
-                    # If another opponent's unit is in the same Ruin
-                    same_tile = [u for (own, u) in self.state.occupants.get(def_from, []) if own != player and u is not defender]
-                    if same_tile:
-                        self.logger.debug("Defender %s is Backline and another unit is present, cannot target", getattr(defender, 'name', 'unit'))
-                        continue
-                
-                # Check range: ensure attacker and defender in adjacent or same Ruin
-                ar, ac = atk_from; dr, dc = def_from
-                if max(abs(ar-dr), abs(ac-dc)) > 1:
-                    self.logger.debug("Defender out of range for attacker, skipping combat")
-                    continue
-                
-                # Determine combat order by speed
-                atk_speed = getattr(attacker, "speed", 0)
-                def_speed = getattr(defender, "speed", 0)
-                atk_attack = getattr(attacker, "attack", 0)
-                def_attack = getattr(defender, "attack", 0)
-                atk_def = getattr(attacker, "defense", 0)
-                def_def = getattr(defender, "defense", 0)
-                
-                # Include Fortify buffs if present
-                if hasattr(defender, "temp_defense_buff"):
-                    def_def += defender.temp_defense_buff
-                if hasattr(attacker, "temp_defense_buff"):
-                    atk_def += attacker.temp_defense_buff
-                
-                # Helper for damage calculation
-                def calc_damage(att, deff):
-                    return 1 if att == deff and att != 0 else max(0, att - deff)
-                outcome = ""
-                
-                # Attacker strikes first
-                if atk_speed >= def_speed:
-                    dmg = calc_damage(atk_attack, def_def)
-                    if dmg > 0 and hasattr(defender, "health"):
-                        defender.health -= dmg
-                    
-                    # Remove defender from board
-                    if getattr(defender, "health", 1) <= 0:
-                        outcome = f"{getattr(attacker,'name','Attacker')} killed {getattr(defender,'name','Defender')}"    
-                        self.state.occupants[def_from] = [(own, u) for (own, u) in self.state.occupants.get(def_from, []) if u is not defender]
-                        
-                        # Update state for defender death
-                        idx = 0 if player == "Player1" else 1
-                        opp_idx = 1 - idx
-                        
-                        # Check if defender was hero or minion
-                        if defender in self.state.players[opp_idx].hero_area:
-                            self.state.players[opp_idx].hero_area.clear()
-                        if defender in self.state.players[opp_idx].staging_area:
-                            self.state.players[opp_idx].staging_area.remove(defender)
-                        self.state.players[opp_idx].adventure_discard.append(defender)
-                    
-                    # Defender survives, counterattack
-                    else:
-                        dmg2 = calc_damage(def_attack, atk_def)
-                        if dmg2 > 0 and hasattr(attacker, "health"):
-                            attacker.health -= dmg2
-                        if getattr(attacker, "health", 1) <= 0:
-                            outcome = f"{getattr(defender,'name','Defender')} killed {getattr(attacker,'name','Attacker')}"
-                            
-                            # Remove Attacker from board
-                            self.state.occupants[atk_from] = [(own, u) for (own, u) in self.state.occupants.get(atk_from, []) if u is not attacker]
-                            idx = 0 if player == "Player1" else 1
-                            
-                            # Check if Attacker was hero or minion
-                            if attacker in self.state.players[idx].hero_area:
-                                self.state.players[idx].hero_area.clear()
-                            if attacker in self.state.players[idx].staging_area:
-                                self.state.players[idx].staging_area.remove(attacker)
-                            self.state.players[idx].adventure_discard.append(attacker)
-                        else:
-                            outcome = f"Both {getattr(attacker,'name','')} and {getattr(defender,'name','')} survived the combat"
-                
-                # Defender strikes first
-                else:
-                    dmg = calc_damage(def_attack, atk_def)
-                    if dmg > 0 and hasattr(attacker, "health"):
-                        attacker.health -= dmg
-                    
-                    # Remove attacker
-                    if getattr(attacker, "health", 1) <= 0:
-                        outcome = f"{getattr(defender,'name','Defender')} killed {getattr(attacker,'name','Attacker')}"
-                        self.state.occupants[atk_from] = [(own, u) for (own, u) in self.state.occupants.get(atk_from, []) if u is not attacker]
-                        idx = 0 if player == "Player1" else 1
-                        if attacker in self.state.players[idx].hero_area:
-                            self.state.players[idx].hero_area.clear()
-                        if attacker in self.state.players[idx].staging_area:
-                            self.state.players[idx].staging_area.remove(attacker)
-                        self.state.players[idx].adventure_discard.append(attacker)
-                    
-                    # Attacker survives to hit back
-                    else:
-                        dmg2 = calc_damage(atk_attack, def_def)
-                        if dmg2 > 0 and hasattr(defender, "health"):
-                            defender.health -= dmg2
-                        if getattr(defender, "health", 1) <= 0:
-                            outcome = f"{getattr(attacker,'name','Attacker')} killed {getattr(defender,'name','Defender')}"
-                            self.state.occupants[def_from] = [(own, u) for (own, u) in self.state.occupants.get(def_from, []) if u is not defender]
-                            opp_idx = 0 if player == "Player2" else 1
-                            if defender in self.state.players[opp_idx].hero_area:
-                                self.state.players[opp_idx].hero_area.clear()
-                            if defender in self.state.players[opp_idx].staging_area:
-                                self.state.players[opp_idx].staging_area.remove(defender)
-                            self.state.players[opp_idx].adventure_discard.append(defender)
-                        else:
-                            outcome = f"Both {getattr(attacker,'name','')} and {getattr(defender,'name','')} survived the combat"
-                
-                # Mark Attacker as having attacked (for Fortify check)
-                self.state.attacked_units.add(attacker)
-                self.logger.debug("Combat outcome: %s", outcome)
+                self._tally("attack", self._attack(player, attack))
         else:
             self.logger.debug("%s did not declare any attacks", player)
 
+    # Resolve one declared attack
+    def _attack(self, player: str, attack) -> Tuple[bool, str]:
+        return rules.attack(self.state, player, attack)
+
     # Perform end-of-turn cleanup
+    @timed_step("adventure")
     def _step_end(self, player: str):
         send_obj(self.conn, {"phase": "adventure", "step": "end", "player": player})
+        for effect in fire_occupy(self.state, player):
+            self.logger.debug("Occupy: %s", effect)
         # Apply Fortify: Units with Fortify that did not move or attack gain +1 Defense until end of opponent's turn
         for pos, occ in self.state.occupants.items():
             for (owner, unit) in occ:
                 if owner == player and hasattr(unit, "keywords") and "Fortify" in unit.keywords:
-                    moved = hasattr(self.state, 'moved_units') and unit in getattr(self.state, 'moved_units')
-                    attacked = hasattr(self.state, 'attacked_units') and unit in getattr(self.state, 'attacked_units')
+                    moved = hasattr(self.state, 'moved_units') and id(unit) in getattr(self.state, 'moved_units')
+                    attacked = hasattr(self.state, 'attacked_units') and id(unit) in getattr(self.state, 'attacked_units')
                     if not moved and not attacked:
-                        setattr(unit, "temp_defense_buff", 1)
+                        unit.temp_defense_buff = 1
                         if not hasattr(self.state, 'fortified_units'):
                             self.state.fortified_units = []
                         self.state.fortified_units.append(unit)
         self.state.cleanup_end_of_turn()
-        self.logger.debug("%s end of turn cleanup complete", player)
\ No newline at end of file
+        self.logger.debug("%s end of turn cleanup complete", player)
+
+# The whole game from the state's current turn, as a flow: Explore turns until a path joins the
+# Gates, then Adventure turns until someone wins. The phase follows from the board, so a match
+# restored from a checkpoint carries on where it left off. With a broadcaster, each turn starts
+# by sending every player its own view and spectators the public one, and the winner is
+# announced. after_turn(state) runs once each turn is over. Returns the winner.
+def play_game(state: GameState, connections: Tuple, recorder=None, broadcaster=None, records=None, after_turn=None):
+    exploring = not state.check_path_between_gates()
+    while True:
+        phase = "explore" if exploring else "adventure"
+        if broadcaster is not None:
+            broadcaster.broadcast_views(
+                [{"type": "state_update", "player": label, "state": project_state(state, label)}
+                 for label in PLAYER_LABELS],
+                {"type": "state_update", "state": project_state(state, None)},
+            )
+        if recorder is not None:
+            recorder.begin_turn(state, phase)
+
+        if exploring:
+            yield from ExplorePhase(state, connections, recorder=recorder, broadcaster=broadcaster, records=records).turn()
+            winner = None
+            exploring = not state.check_path_between_gates()
+        else:
+            # Adventure prompts go to the player whose turn it is
+            active = connections[state.active_player]
+            yield from AdventurePhase(state, active, recorder=recorder, records=records).turn()
+            winner = state.adventure_winner()
+        if after_turn is not None:
+            after_turn(state)
+
+        if winner:
+            if broadcaster is not None:
+                broadcaster.broadcast({"type": "game_end", "winner": winner, "phase": phase})
+            if recorder is not None:
+                recorder.end(winner, phase)
+            return winner
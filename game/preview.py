@@ -0,0 +1,98 @@
+# External Imports
+import copy
+from typing import List, Optional, Tuple
+
+# Internal Imports
+from game import rules
+from game.state import GameState
+from game.triggers import TriggerIndex
+
+# A client's working copy of its last GameView, plus the per-turn bookkeeping the rules keep on
+# the server. It starts empty, as the server's does when the summoning prompt is sent.
+class PreviewState:
+    def __init__(self, view, prompt: Optional[dict] = None):
+        view = copy.deepcopy(view)
+        for name in view.__slots__:
+            setattr(self, name, getattr(view, name))
+        self.triggers = TriggerIndex.from_map(self.map)
+        self.exhausted_units = set()
+        self.moved_units = set()
+        self.attacked_units = set()
+        self.just_summoned = []
+        self.turn_effects = []
+
+        # The view is from the start of the turn; the summoning prompt carries the hand and
+        # echoes after this turn's echo gain and draw
+        if prompt and "hand" in prompt:
+            me = self.players[0] if prompt["player"] == "Player1" else self.players[1]
+            me.hand = list(prompt["hand"])
+            me.hand_count = len(me.hand)
+            me.echoes = prompt["echoes"]
+
+    remove_unit = GameState.remove_unit
+
+    def current_player(self) -> str:
+        return f"Player{self.active_player + 1}"
+
+# Plays this client's Adventure turn locally as it is chosen, with the same rules as the server.
+# Entries the rules reject are dropped before sending; the predicted outcome of the rest is
+# compared with the server's plan_result, and the next state update replaces the preview.
+class TurnPreview:
+    def __init__(self, view, player: str, prompt: Optional[dict] = None):
+        self.state = PreviewState(view, prompt)
+        self.player = player
+        self.player_state = self.state.players[0] if player == "Player1" else self.state.players[1]
+        # Outcome of each entry sent, in the order the server resolves them
+        self.predicted: List[dict] = []
+        # Entries dropped because the rules would reject them
+        self.rejected: List[dict] = []
+
+    def _play(self, action: str, entries, apply) -> list:
+        accepted = []
+        for entry in entries:
+            ok, detail = apply(entry)
+            result = {"action": action, "ok": ok, "detail": detail}
+            if ok:
+                accepted.append(entry)
+                self.predicted.append(result)
+            else:
+                self.rejected.append(result)
+        return accepted
+
+    # Summons by hand index; indices refer to the hand as it was before the first summon
+    def summon(self, indices) -> list:
+        hand = list(self.player_state.hand)
+
+        def apply(idx) -> Tuple[bool, str]:
+            if not (isinstance(idx, int) and 0 <= idx < len(hand)):
+                return False, f"invalid card index {idx}"
+            return rules.summon(self.state, self.player, self.player_state, hand[idx])
+        return self._play("summon", dict.fromkeys(indices), apply)
+
+    def moves(self, moves) -> list:
+        return self._play("move", moves, lambda move: rules.move_unit(self.state, self.player, move))
+
+    def attacks(self, attacks) -> list:
+        return self._play("attack", attacks, lambda attack: rules.attack(self.state, self.player, attack))
+
+    # A reply to an Adventure prompt, keeping only the entries the rules accept
+    def check(self, step: str, reply: dict) -> dict:
+        if "plan" in reply:
+            plan = reply["plan"] or {}
+            return {"plan": {
+                "summon": self.summon(plan.get("summon", ())),
+                "moves": self.moves(plan.get("moves", ())),
+                "attacks": self.attacks(plan.get("attacks", ())),
+            }}
+        if step == "summoning" and "card_index" in reply:
+            accepted = self.summon([reply["card_index"]])
+            return {"card_index": accepted[0]} if accepted else {}
+        if step == "movement":
+            return {"moves": self.moves(reply.get("moves", ()))}
+        if step == "combat":
+            return {"attacks": self.attacks(reply.get("attacks", ()))}
+        return reply
+
+    # (predicted, actual) for each sent entry the server resolved differently
+    def reconcile(self, results) -> List[Tuple[dict, dict]]:
+        return [(predicted, actual) for predicted, actual in zip(self.predicted, results) if predicted != actual]
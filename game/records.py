@@ -0,0 +1,228 @@
+# External Imports
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+# Internal Imports
+from config import RECORD_SHARD_ROWS
+
+# Turn-level columns, one .npy file per column per shard
+COLUMNS = (
+    ("match", np.uint64),          # match_key(match_id)
+    ("turn", np.int32),
+    ("phase", np.uint8),           # PHASE_CODES
+    ("active", np.uint8),          # 0 = Player1
+    ("p1_echoes", np.int16),
+    ("p2_echoes", np.int16),
+    ("p1_hand", np.uint8),
+    ("p2_hand", np.uint8),
+    ("p1_gate_health", np.int16),
+    ("p2_gate_health", np.int16),
+    ("p1_units", np.uint8),        # Heroes and Minions on the board
+    ("p2_units", np.uint8),
+    ("placed", np.uint8),          # Ruins revealed this Explore turn
+    ("summons", np.uint8),         # accepted Adventure actions, by step
+    ("moves", np.uint8),
+    ("attacks", np.uint8),
+    ("rejected", np.uint8),        # Adventure actions the engine refused
+)
+COLUMN_NAMES = tuple(name for name, _ in COLUMNS)
+PHASE_CODES = {"explore": 0, "adventure": 1}
+META_FILE = "meta.json"
+# Queued by RecordWriter.flush to commit without waiting for flush_every
+_COMMIT = object()
+
+# Stable 64-bit key for a match ID, the same in every process
+def match_key(match_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(match_id.encode(), digest_size=8).digest(), "little")
+
+# One row describing the state at the end of a turn plus what was done during it
+def turn_row(state, phase: str, actions: Optional[Dict[str, int]] = None, placed: int = 0) -> tuple:
+    actions = actions or {}
+    p1, p2 = state.players
+    units = [0, 0]
+    for occupants in state.occupants.values():
+        for owner, _ in occupants:
+            units[owner != "Player1"] += 1
+    return (
+        match_key(state.match_id), state.turn, PHASE_CODES[phase], state.active_player,
+        p1.echoes, p2.echoes, len(p1.hand), len(p2.hand),
+        p1.gate.gate_health, p2.gate.gate_health, units[0], units[1], placed,
+        actions.get("summon", 0), actions.get("move", 0), actions.get("attack", 0), actions.get("rejected", 0),
+    )
+
+# Appends turn rows to fixed-size memory-mapped shards on a background thread. A shard is a
+# directory of column files plus meta.json; the row count in meta.json is only advanced after
+# the columns are flushed, so readers never see half-written rows.
+class RecordWriter:
+    def __init__(self, directory, shard_rows: int = RECORD_SHARD_ROWS, flush_every: float = 1.0):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shard_rows = shard_rows
+        self.flush_every = flush_every
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._queue: "queue.Queue" = queue.Queue()
+        existing = sorted(self.directory.glob("shard-*"))
+        self._next_shard = int(existing[-1].name.split("-")[1]) + 1 if existing else 0
+        self._shard: Optional[Path] = None
+        self._columns: List[np.memmap] = []
+        self._rows = 0
+        self._committed = 0
+        self._last_commit = 0.0
+        self._writer = threading.Thread(target=self._write_loop, name="record-writer", daemon=True)
+        self._writer.start()
+
+    # Build the row on the caller's thread (cheap), write it on the writer's
+    def record_turn(self, state, phase: str, actions: Optional[Dict[str, int]] = None, placed: int = 0):
+        self._queue.put(turn_row(state, phase, actions, placed))
+
+    def record_rows(self, rows: Sequence[tuple]):
+        self._queue.put(list(rows))
+
+    # Rows are copied into the shard in blocks of whatever has queued up, and committed
+    # (columns flushed, meta.json advanced) at most every flush_every seconds while rows keep
+    # coming, once they stop, and on close. Under a steady trickle of turns the queue empties
+    # after every row, so committing whenever it did cost a metadata rewrite per turn.
+    def _write_loop(self):
+        while True:
+            try:
+                items = [self._queue.get(timeout=self.flush_every)]
+            except queue.Empty:
+                self._commit()
+                continue
+            while items[-1] is not None and len(items) < self.shard_rows:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = items[-1] is None
+            commit = False
+            rows: List[tuple] = []
+            for item in items:
+                if isinstance(item, list):
+                    rows.extend(item)
+                elif item is _COMMIT:
+                    commit = True
+                elif item is not None:
+                    rows.append(item)
+            try:
+                if rows:
+                    self._write_block(rows)
+                if stop:
+                    self._seal()
+                elif commit or (self._queue.empty() and perf_counter() - self._last_commit >= self.flush_every):
+                    self._commit()
+            except OSError:
+                self.logger.exception("Failed to write %d turn records", len(rows))
+            for _ in items:
+                self._queue.task_done()
+            if stop:
+                break
+
+    def _open_shard(self):
+        self._shard = self.directory / f"shard-{self._next_shard:06d}"
+        self._next_shard += 1
+        self._shard.mkdir()
+        self._columns = [
+            np.lib.format.open_memmap(self._shard / f"{name}.npy", mode="w+", dtype=dtype, shape=(self.shard_rows,))
+            for name, dtype in COLUMNS
+        ]
+        self._rows = 0
+        self._committed = 0
+        self._write_meta(sealed=False)
+
+    def _write_block(self, rows: List[tuple]):
+        start = 0
+        while start < len(rows):
+            if self._shard is None or self._rows == self.shard_rows:
+                self._seal()
+                self._open_shard()
+            take = min(len(rows) - start, self.shard_rows - self._rows)
+            block = list(zip(*rows[start:start + take]))
+            for column, values in zip(self._columns, block):
+                column[self._rows:self._rows + take] = values
+            self._rows += take
+            start += take
+
+    def _commit(self):
+        if self._shard is None or self._committed == self._rows:
+            return
+        for column in self._columns:
+            column.flush()
+        self._write_meta(sealed=False)
+        self._committed = self._rows
+        self._last_commit = perf_counter()
+
+    # Finish the current shard; a sealed shard is never written again
+    def _seal(self):
+        if self._shard is None:
+            return
+        for column in self._columns:
+            column.flush()
+        self._write_meta(sealed=True)
+        self._columns = []
+        self._shard = None
+
+    def _write_meta(self, sealed: bool):
+        meta = {"rows": self._rows, "shard_rows": self.shard_rows, "columns": COLUMN_NAMES, "sealed": sealed}
+        tmp = self._shard / (META_FILE + ".tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self._shard / META_FILE)
+
+    # Block until every queued row is on disk
+    def flush(self):
+        self._queue.put(_COMMIT)
+        self._queue.join()
+
+    def close(self, timeout: Optional[float] = None):
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+# Reads every shard under a directory (worker subdirectories included) as memory-mapped arrays
+class RecordReader:
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    # (shard path, committed rows) in name order
+    def shards(self) -> List[tuple]:
+        found = []
+        for meta_path in sorted(self.directory.rglob(META_FILE)):
+            rows = json.loads(meta_path.read_text())["rows"]
+            if rows:
+                found.append((meta_path.parent, rows))
+        return found
+
+    def __len__(self) -> int:
+        return sum(rows for _, rows in self.shards())
+
+    # Per shard, a dict of read-only memmapped columns trimmed to the committed rows
+    def scan(self, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+        columns = columns or COLUMN_NAMES
+        for shard, rows in self.shards():
+            yield {name: np.load(shard / f"{name}.npy", mmap_mode="r")[:rows] for name in columns}
+
+    # One column across every shard
+    def column(self, name: str) -> np.ndarray:
+        parts = [block[name] for block in self.scan((name,))]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dict(COLUMNS)[name])
+
+    # Mean of `value` for each distinct `key`, computed shard by shard
+    def mean_by(self, key: str, value: str) -> Dict[int, float]:
+        totals: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        for block in self.scan((key, value)):
+            keys, inverse = np.unique(block[key], return_inverse=True)
+            sums = np.bincount(inverse, weights=block[value])
+            hits = np.bincount(inverse)
+            for k, s, c in zip(keys.tolist(), sums.tolist(), hits.tolist()):
+                totals[k] = totals.get(k, 0.0) + s
+                counts[k] = counts.get(k, 0) + c
+        return {k: totals[k] / counts[k] for k in sorted(totals)}
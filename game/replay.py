@@ -0,0 +1,286 @@
+# External Imports
+import logging
+import pickle
+import random
+import struct
+from collections import deque
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Internal Imports
+from game.init import (
+    build_game_state, deck_choice_from_decklist, deck_choice_from_names, decklist_from_choice, prepare_match,
+)
+from game.phases import ExplorePhase, AdventurePhase
+from network.protocol import frame_message
+from resources.loader import current_cards
+
+# File layout: magic, then records of [type:u8][length:u32][payload]
+REPLAY_MAGIC = b"RORREPLAY\x01"
+RECORD_HEADER = struct.Struct("<BI")
+
+REC_HEADER = 1
+REC_TURN = 2
+REC_CHOICE = 3
+REC_CHECKPOINT = 4
+REC_END = 5
+
+# Fixed-size prefixes for the frequent record types
+TURN_STRUCT = struct.Struct("<IBB")        # turn, phase code, active player
+CHOICE_STRUCT = struct.Struct("<BB")       # player index, step code
+CHECKPOINT_STRUCT = struct.Struct("<I")    # turn
+
+PHASE_CODES = {"explore": 0, "adventure": 1}
+PHASE_NAMES = {v: k for k, v in PHASE_CODES.items()}
+STEP_CODES = {"placement": 0, "summoning": 1, "movement": 2, "combat": 3}
+STEP_NAMES = {v: k for k, v in STEP_CODES.items()}
+PLAYERS = ("Player1", "Player2")
+
+class ReplayError(Exception):
+    pass
+
+# Append-only writer for one match's replay file
+class ReplayWriter:
+    def __init__(self, path, match_id: str, seed: int, choices: Tuple[dict, dict],
+                 rng: Optional[random.Random] = None, checkpoint_every: int = 10,
+                 board_size: Optional[Tuple[int, int]] = None, card_version: int = 0, card_digest: str = ""):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.rng = rng
+        self.checkpoint_every = checkpoint_every
+        self._file = open(self.path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(REPLAY_MAGIC)
+        header = {
+            "match_id": match_id,
+            "seed": seed,
+            # Full decklists, so chosen decks are dealt again exactly as they were
+            "decks": [decklist_from_choice(c) for c in choices],
+            "checkpoint_every": checkpoint_every,
+            "board_size": board_size,
+            # The card data the decks were dealt from; rebuilding them from other data would diverge
+            "card_version": card_version,
+            "card_digest": card_digest,
+        }
+        self._write(REC_HEADER, pickle.dumps(header, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def _write(self, rec_type: int, payload: bytes):
+        self._file.write(RECORD_HEADER.pack(rec_type, len(payload)) + payload)
+
+    # Mark the start of a turn, writing a checkpoint every `checkpoint_every` turns
+    def begin_turn(self, state, phase: str):
+        if self.checkpoint_every and (state.turn - 1) % self.checkpoint_every == 0:
+            self.checkpoint(state)
+        self._write(REC_TURN, TURN_STRUCT.pack(state.turn, PHASE_CODES[phase], state.active_player))
+
+    def checkpoint(self, state):
+        rng_state = self.rng.getstate() if self.rng is not None else None
+        blob = pickle.dumps((state, rng_state), protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(REC_CHECKPOINT, CHECKPOINT_STRUCT.pack(state.turn) + blob)
+        self._file.flush()
+
+    def record_choice(self, player: str, step: str, choice):
+        blob = pickle.dumps(choice, protocol=pickle.HIGHEST_PROTOCOL)
+        self._write(REC_CHOICE, CHOICE_STRUCT.pack(PLAYERS.index(player), STEP_CODES[step]) + blob)
+
+    def end(self, winner: str, phase: str):
+        self._write(REC_END, pickle.dumps({"winner": winner, "phase": phase}, protocol=pickle.HIGHEST_PROTOCOL))
+        self.close()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.flush()
+            self._file.close()
+
+# Stands in for a client socket, answering each recv with the next recorded choice
+class ScriptedConnection:
+    def __init__(self, choices):
+        self._choices = deque(choices)
+        self._buffer = b""
+
+    def sendall(self, data: bytes):
+        pass
+
+    def recv(self, n: int) -> bytes:
+        if not self._buffer:
+            if not self._choices:
+                raise ReplayError("Replay ran out of recorded choices")
+            self._buffer = frame_message(self._choices.popleft())
+        chunk, self._buffer = self._buffer[:n], self._buffer[n:]
+        return chunk
+
+    def exhausted(self) -> bool:
+        return not self._choices and not self._buffer
+
+# Re-executes a recorded match headlessly, with seeking via checkpoints
+class Replayer:
+    def __init__(self, path):
+        self.path = Path(path)
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.header: Dict = {}
+        self.result: Optional[Dict] = None
+        self.checkpoints: List[Tuple[int, int]] = []
+        self.turns: List[Tuple[int, int]] = []
+        # The match RNG as of the state last returned by seek() or states()
+        self.rng: Optional[random.Random] = None
+        self._index()
+
+    # Scan record headers once, skipping payloads, to find turns and checkpoints
+    def _index(self):
+        with open(self.path, "rb") as f:
+            if f.read(len(REPLAY_MAGIC)) != REPLAY_MAGIC:
+                raise ReplayError(f"Not a replay file: {self.path}")
+            while True:
+                offset = f.tell()
+                head = f.read(RECORD_HEADER.size)
+                if len(head) < RECORD_HEADER.size:
+                    break
+                rec_type, length = RECORD_HEADER.unpack(head)
+                if rec_type in (REC_HEADER, REC_END):
+                    payload = pickle.loads(f.read(length))
+                    if rec_type == REC_HEADER:
+                        self.header = payload
+                    else:
+                        self.result = payload
+                    continue
+                if rec_type == REC_TURN:
+                    turn = TURN_STRUCT.unpack(f.read(TURN_STRUCT.size))[0]
+                    self.turns.append((turn, offset))
+                    f.seek(length - TURN_STRUCT.size, 1)
+                elif rec_type == REC_CHECKPOINT:
+                    turn = CHECKPOINT_STRUCT.unpack(f.read(CHECKPOINT_STRUCT.size))[0]
+                    self.checkpoints.append((turn, offset))
+                    f.seek(length - CHECKPOINT_STRUCT.size, 1)
+                else:
+                    f.seek(length, 1)
+
+    def _records(self, f):
+        while True:
+            head = f.read(RECORD_HEADER.size)
+            if len(head) < RECORD_HEADER.size:
+                return
+            rec_type, length = RECORD_HEADER.unpack(head)
+            yield rec_type, f.read(length)
+
+    # Rebuild the opening state from the recorded seed and deck choices. Only possible with the
+    # card data the match was dealt from; replays recorded before digests were kept are trusted.
+    def initial_state(self):
+        recorded = self.header.get("card_digest")
+        current = current_cards()
+        if recorded and recorded != current.digest:
+            raise ReplayError(f"Replay was dealt from card data version {self.header.get('card_version')} "
+                              f"({recorded}), which differs from the current card files ({current.digest})")
+        rng = random.Random(self.header["seed"])
+        # Older replays kept only (hero, gate) names
+        choices = [deck_choice_from_decklist(deck) if isinstance(deck, dict) else deck_choice_from_names(*deck)
+                   for deck in self.header["decks"]]
+        board_size = self.header.get("board_size")
+        state, _ = build_game_state(choices[0], choices[1], rng=rng, board_size=tuple(board_size) if board_size else None,
+                                    cards=current)
+        prepare_match(state)
+        self.rng = rng
+        return state
+
+    # Load the latest checkpoint at or before `turn`, falling back to the seed
+    def _load_checkpoint(self, turn: int):
+        best = None
+        for cp_turn, offset in self.checkpoints:
+            if cp_turn <= turn:
+                best = offset
+        if best is None:
+            return self.initial_state(), None
+        with open(self.path, "rb") as f:
+            f.seek(best)
+            rec_type, payload = next(self._records(f))
+            state, rng_state = pickle.loads(payload[CHECKPOINT_STRUCT.size:])
+        # Carry on drawing exactly as the live match did from this point
+        self.rng = random.Random()
+        if rng_state is not None:
+            self.rng.setstate(rng_state)
+        return state, best
+
+    # Return the state at the start of `turn`, or the final state when turn is None
+    def seek(self, turn: Optional[int] = None):
+        target = turn if turn is not None else float("inf")
+        if turn is None:
+            state, offset = self.initial_state(), None
+        else:
+            state, offset = self._load_checkpoint(turn)
+        with open(self.path, "rb") as f:
+            f.seek(offset if offset is not None else len(REPLAY_MAGIC))
+            self._play(f, state, target)
+        return state
+
+    def run(self):
+        return self.seek(None)
+
+    # Yield the state at the start of each turn from `start` on, in one pass over the file.
+    # The same state is advanced in place, so copy or serialise it before the next step.
+    def states(self, start: int = 0):
+        state, offset = self._load_checkpoint(start)
+        with open(self.path, "rb") as f:
+            f.seek(offset if offset is not None else len(REPLAY_MAGIC))
+            if state.turn >= start:
+                yield state
+            for _ in self._steps(f, state, float("inf")):
+                if state.turn >= start:
+                    yield state
+
+    # Apply every recorded turn from the current file position up to `target`
+    def _play(self, f, state, target):
+        for _ in self._steps(f, state, target):
+            pass
+
+    # _play, pausing after each applied turn
+    def _steps(self, f, state, target):
+        pending = None
+        pending_turn = 0
+        choices: List[Tuple[str, object]] = []
+        for rec_type, payload in self._records(f):
+            if rec_type == REC_CHOICE:
+                player_idx, _step = CHOICE_STRUCT.unpack_from(payload)
+                choices.append((PLAYERS[player_idx], pickle.loads(payload[CHOICE_STRUCT.size:])))
+                continue
+            # A checkpoint for a turn still pending means the server crashed mid-turn and restarted it
+            if rec_type == REC_CHECKPOINT and pending is not None:
+                if CHECKPOINT_STRUCT.unpack_from(payload)[0] == pending_turn:
+                    pending, choices = None, []
+            if pending is not None:
+                self._apply_turn(state, pending, choices)
+                pending, choices = None, []
+                yield
+            if rec_type == REC_TURN:
+                turn, phase_code, _active = TURN_STRUCT.unpack(payload)
+                if turn >= target:
+                    return
+                if turn < state.turn:
+                    continue
+                pending, pending_turn = PHASE_NAMES[phase_code], turn
+            elif rec_type == REC_END:
+                return
+        if pending is not None:
+            self._apply_turn(state, pending, choices)
+            yield
+
+    def _apply_turn(self, state, phase: str, choices):
+        if phase == "explore":
+            conns = {p: ScriptedConnection([c for who, c in choices if who == p]) for p in PLAYERS}
+            ExplorePhase(state, (conns["Player1"], conns["Player2"])).run()
+        else:
+            conns = {"active": ScriptedConnection([c for _, c in choices])}
+            AdventurePhase(state, conns["active"]).run()
+        if not all(conn.exhausted() for conn in conns.values()):
+            raise ReplayError(f"Replay diverged on turn {state.turn - 1}: unused recorded choices")
+        self.logger.debug("Replayed %s turn, now at turn %d", phase, state.turn)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Replay a recorded Ruins of Ragnir match")
+    parser.add_argument("path")
+    parser.add_argument("--turn", type=int, default=None, help="Stop at the start of this turn")
+    args = parser.parse_args()
+
+    replayer = Replayer(args.path)
+    final = replayer.seek(args.turn)
+    print(f"Match {replayer.header.get('match_id')}: replayed to turn {final.turn}, result {replayer.result}")
@@ -0,0 +1,227 @@
+# External Imports
+import logging
+from typing import Tuple
+
+# Internal Imports
+from game.triggers import ON_ENTER, ON_EXIT, movement_cost, fire
+from models import MinionCard, HeroCard, RelicCard, GearCard, SpellCard, GlyphCard, UnitInstance
+
+# The rules of each Adventure action, returning (ok, detail). They only use what a state and its
+# players expose, so the server's GameState and a client's PreviewState run the same code.
+
+logger = logging.getLogger("Rules")
+
+def opponent_of(player: str) -> str:
+    return "Player1" if player == "Player2" else "Player2"
+
+# One strike between units; equal Attack and Defense still deal 1
+def calc_damage(att, deff) -> int:
+    return 1 if att == deff and att != 0 else max(0, att - deff)
+
+# A strike on a Gate; Gates have no speed or attack, so they never strike back
+def gate_damage(att, gate_def) -> int:
+    return 1 if att == gate_def else max(0, att - gate_def)
+
+# Damage (to attacker, to defender) in a fight. The faster unit strikes first, the attacker on
+# ties, and the other only strikes back if it survives.
+def combat_damage(attacker, defender) -> Tuple[int, int]:
+    atk_def = getattr(attacker, "defense", 0) + attacker.temp_defense_buff
+    def_def = getattr(defender, "defense", 0) + defender.temp_defense_buff
+    if getattr(attacker, "speed", 0) >= getattr(defender, "speed", 0):
+        first, second, second_def, first_def = attacker, defender, def_def, atk_def
+    else:
+        first, second, second_def, first_def = defender, attacker, atk_def, def_def
+
+    hit = calc_damage(getattr(first, "attack", 0), second_def)
+    counter = 0
+    if getattr(second, "health", 1) - (hit if hasattr(second, "health") else 0) > 0:
+        counter = calc_damage(getattr(second, "attack", 0), first_def)
+    return (counter, hit) if first is attacker else (hit, counter)
+
+# Pay for and play one card from hand
+def summon(state, player: str, player_state, card) -> Tuple[bool, str]:
+    # Check cost
+    cost = getattr(card, "cost", 0)
+    if player_state.echoes < cost:
+        return False, f"not enough echoes for {card.name}"
+    if isinstance(card, HeroCard) and player_state.hero_area:
+        return False, f"{card.name}: a hero is already in play"
+
+    # Pay cost
+    player_state.echoes -= cost
+
+    # Remove from hand
+    for i, held in enumerate(player_state.hand):
+        if held is card:
+            player_state.hand.pop(i)
+            break
+
+    # Summon minion or hero to player Gate
+    if isinstance(card, (MinionCard, HeroCard)):
+        unit = UnitInstance.from_card(card)
+        area = player_state.staging_area if isinstance(card, MinionCard) else player_state.hero_area
+        area.append(unit)
+        gate_pos = state.gate_positions[player]
+        state.occupants.setdefault(gate_pos, []).append((player, unit))
+        state.just_summoned.append(unit)
+
+    # Add Relic/Gear to Relic Hold and sacrifice oldest if RH is full
+    elif isinstance(card, RelicCard) or isinstance(card, GearCard):
+        if len(player_state.relic_area) >= player_state.gate.relic_hold:
+            if player_state.relic_area:
+                removed = player_state.relic_area.pop(0)
+                player_state.adventure_discard.append(removed)
+                logger.debug("%s relic hold full, discarded %s", player, removed.name)
+        player_state.relic_area.append(card)
+
+    # Cast spell/glyph and discard immediately
+    elif isinstance(card, SpellCard) or isinstance(card, GlyphCard):
+        player_state.adventure_discard.append(card)
+    return True, card.name
+
+# Movement a unit has to leave `origin`; Wetlands halve it without Swampcraft
+def movement_allowance(state, unit, origin) -> int:
+    remaining = getattr(unit, "movement", 0)
+    origin_tile = state.map.get(origin, {}).get("card")
+    if origin_tile and origin_tile.terrain == "Wetlands":
+        spec = getattr(unit, "spec_move", [])
+        has_swampcraft = any("craft" in sm and "Wetland" in sm for sm in spec)
+        if not has_swampcraft:
+            remaining = max(0, remaining - ((remaining + 1) // 2))
+    return remaining
+
+# Move one unit between Ruins if it has the movement to do so
+def move_unit(state, player: str, move) -> Tuple[bool, str]:
+    if not isinstance(move, dict):
+        return False, "malformed move"
+    origin = move.get("from") or move.get("origin") or move.get("start")
+    dest = move.get("to") or move.get("dest") or move.get("end")
+    if not origin or not dest:
+        return False, "missing origin or destination"
+    origin = tuple(origin)
+    dest = tuple(dest)
+    units_here = state.occupants.get(origin, [])
+    unit = None
+
+    # Identify unit by provided key (name)
+    if "unit" in move:
+        for (owner, u) in units_here:
+            if owner == player and (move["unit"] == getattr(u, 'name', None) or move["unit"] == getattr(u, 'heroname', None)):
+                unit = u
+                break
+
+    # Default: take first friendly unit at origin
+    else:
+        for (owner, u) in units_here:
+            if owner == player:
+                unit = u
+                break
+    if not unit:
+        return False, f"no friendly unit at {origin}"
+
+    # Tile rules subscribed to leaving the origin and entering the destination set the cost
+    remaining = movement_allowance(state, unit, origin)
+    name = getattr(unit, 'name', 'unit')
+    if id(unit) in state.exhausted_units:
+        return False, f"{name} has no Movement left this turn"
+    cost = movement_cost(state, player, unit, origin, dest)
+    if remaining < cost:
+        return False, f"{name} lacks the movement to reach {dest}"
+
+    # Exit effects happen on the way out, so a unit can die before it arrives
+    effects = fire(state, ON_EXIT, origin, player, unit)
+    state.moved_units.add(id(unit))
+    if getattr(unit, "health", 1) <= 0:
+        return True, "; ".join(effects)
+
+    if (player, unit) in units_here:
+        units_here.remove((player, unit))
+    if dest not in state.occupants:
+        state.occupants[dest] = []
+    state.occupants[dest].append((player, unit))
+    logger.debug("%s moved %s from %s to %s", player, name, origin, dest)
+    effects += fire(state, ON_ENTER, dest, player, unit)
+    return True, "; ".join([f"{name} moved to {dest}"] + effects)
+
+# Resolve one declared attack
+def attack(state, player: str, attack) -> Tuple[bool, str]:
+    if not isinstance(attack, dict):
+        return False, "malformed attack"
+    atk_from = tuple(attack.get("from") or attack.get("attacker_pos", []))
+    def_from = tuple(attack.get("to") or attack.get("defender_pos", []))
+    if not atk_from or not def_from:
+        return False, "missing attacker or defender position"
+
+    # Look for Attacker and Defender objects
+    attacker = None
+    defender = None
+    for owner, unit in state.occupants.get(atk_from, []):
+        if owner == player:
+            attacker = unit
+            break
+    for owner, unit in state.occupants.get(def_from, []):
+        if owner != player:
+            defender = unit
+            break
+    if not attacker:
+        return False, f"no friendly unit at {atk_from}"
+    opponent = opponent_of(player)
+    if not defender:
+
+        # If target is opponent's Gate
+        if def_from != state.gate_positions.get(opponent, None):
+            return False, f"no enemy at {def_from}"
+
+        # Attacker always deals damage first since Gates have no speed or attack
+        gate_card = state.board[opponent]["gate"]
+        dmg = gate_damage(getattr(attacker, "attack", 0), getattr(gate_card, "gate_defense", 0))
+        gate_health = getattr(gate_card, "gate_health", 0) - dmg
+        if gate_health <= 0:
+            outcome = f"{getattr(attacker,'name','Attacker')} destroyed {opponent}'s Gate"
+            gate_card.gate_health = 0
+        else:
+            outcome = f"{opponent}'s Gate took {dmg} damage"
+            gate_card.gate_health = gate_health
+        state.attacked_units.add(id(attacker))
+        logger.debug("Combat outcome: %s", outcome)
+        return True, outcome
+
+    # Check Bloodlust: if attacker was just summoned and doesn't have Bloodlust, skip attack
+    if hasattr(state, 'just_summoned') and attacker in state.just_summoned:
+        keywords = getattr(attacker, "keywords", [])
+        if "Bloodlust" not in keywords:
+            logger.debug("Attacker %s summoned this turn without Bloodlust, cannot attack", getattr(attacker, 'name', 'unit'))
+            return False, f"{getattr(attacker, 'name', 'unit')} was summoned this turn"
+
+    # Check Backline: defender cannot be targeted if another enemy occupies same Ruin
+    if "Backline" in getattr(defender, "keywords", []):
+        same_tile = [u for (own, u) in state.occupants.get(def_from, []) if own != player and u is not defender]
+        if same_tile:
+            logger.debug("Defender %s is Backline and another unit is present, cannot target", getattr(defender, 'name', 'unit'))
+            return False, f"{getattr(defender, 'name', 'unit')} is protected by Backline"
+
+    # Check range: ensure attacker and defender in adjacent or same Ruin
+    ar, ac = atk_from; dr, dc = def_from
+    if max(abs(ar-dr), abs(ac-dc)) > 1:
+        logger.debug("Defender out of range for attacker, skipping combat")
+        return False, "defender out of range"
+
+    to_attacker, to_defender = combat_damage(attacker, defender)
+    for unit, dmg in ((attacker, to_attacker), (defender, to_defender)):
+        if dmg > 0 and hasattr(unit, "health"):
+            unit.health -= dmg
+
+    # The loser leaves the board; only the unit struck first can die before striking back
+    if getattr(defender, "health", 1) <= 0:
+        outcome = f"{getattr(attacker,'name','Attacker')} killed {getattr(defender,'name','Defender')}"
+        state.remove_unit(opponent, defender, def_from)
+    elif getattr(attacker, "health", 1) <= 0:
+        outcome = f"{getattr(defender,'name','Defender')} killed {getattr(attacker,'name','Attacker')}"
+        state.remove_unit(player, attacker, atk_from)
+    else:
+        outcome = f"Both {getattr(attacker,'name','')} and {getattr(defender,'name','')} survived the combat"
+
+    # Mark Attacker as having attacked (for Fortify check)
+    state.attacked_units.add(id(attacker))
+    logger.debug("Combat outcome: %s", outcome)
+    return True, outcome
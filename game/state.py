@@ -1,9 +1,12 @@
 # External Imports
-from typing import List, Deque, Tuple
+from typing import List, Deque, Tuple, Optional, Sequence
 from collections import deque
 import random
 
 # Internal Imports 
+from config import DECK_SIZE
+from game.board import make_board
+from game.triggers import TriggerIndex, revert_turn_effects
 from resources import (
     RuinCard,
     HeroCard,
@@ -13,46 +16,70 @@ from resources import (
     SpellCard,
     RelicCard,
     GlyphCard,
+    UnitInstance,
+    GateInstance,
 )
 
-# Tracks an individual player's state
+# Adventure cards a hero may use: any card whose elements are all among the hero's
+def adventure_eligible(card, hero: HeroCard) -> bool:
+    return not hasattr(card, 'elements') or set(card.elements).issubset(hero.elements)
+
+# Tracks an individual player's state. Decks are drawn from the card pools unless explicit
+# decklists (one entry per copy) are given.
 class PlayerState:
     def __init__(
         self,
         hero: HeroCard,
         gate: GateCard,
-        ruins: List[RuinCard],
-        minions: List[MinionCard],
-        gears: List[GearCard],
-        spells: List[SpellCard],
-        relics: List[RelicCard],
-        glyphs: List[GlyphCard],
+        ruins: Sequence[RuinCard],
+        minions: Sequence[MinionCard],
+        gears: Sequence[GearCard],
+        spells: Sequence[SpellCard],
+        relics: Sequence[RelicCard],
+        glyphs: Sequence[GlyphCard],
+        rng: Optional[random.Random] = None,
+        exp_cards: Optional[Sequence[RuinCard]] = None,
+        adventure_cards: Optional[Sequence] = None,
     ):
-        self.hero = hero
-        self.gate = gate
+        # The hero and gate in play carry their own mutable stats; the prototypes stay shared
+        self.hero = UnitInstance.from_card(hero)
+        self.gate = GateInstance.from_card(gate)
+
+        # Per-match RNG so deck order can be reproduced from a seed
+        rng = rng or random
         
         # Build out and shuffle explore deck
-        self.exp_deck: Deque[RuinCard] = deque(random.sample(ruins, k=40))
+        if exp_cards is None:
+            self.exp_deck: Deque[RuinCard] = deque(rng.sample(ruins, k=DECK_SIZE))
+        else:
+            self.exp_deck = deque(rng.sample(exp_cards, k=len(exp_cards)))
         self.exp_discard: Deque[RuinCard] = deque()
         
         # Build and shuffle adventure deck
-        adv_pool = minions + gears + spells + relics + glyphs
-        eligible = [c for c in adv_pool if not hasattr(c, 'elements') or set(c.elements).issubset(hero.elements)]
-        self.adventure_deck: Deque = deque(random.sample(eligible, k=40))
+        if adventure_cards is None:
+            adv_pool = minions + gears + spells + relics + glyphs
+            eligible = [c for c in adv_pool if adventure_eligible(c, hero)]
+            self.adventure_deck: Deque = deque(rng.sample(eligible, k=DECK_SIZE))
+        else:
+            self.adventure_deck = deque(rng.sample(adventure_cards, k=len(adventure_cards)))
         self.adventure_discard: Deque = deque()
         self.hand: List = []
         self.echoes = gate.starting_echoes
         self.turn_echo_count = 0
         self.staging_area: List = []
         self.relic_area: List = []
-        self.hero_area: List = [hero]
+        self.hero_area: List = [self.hero]
 
 # Tracks overall game state
 class GameState:
-    def __init__(self, player1: PlayerState, player2: PlayerState):
+    def __init__(self, player1: PlayerState, player2: PlayerState, board_size: Optional[Tuple[int, int]] = None):
         self.players: Tuple[PlayerState, PlayerState] = (player1, player2)
         self.turn = 1
         self.active_player = 0
+        self.match_id = ""
+        # Card data version the match was dealt from, and the digest of its files (resources.registry)
+        self.card_version = 0
+        self.card_digest = ""
         
         # Map players to their hero and gate
         self.board = {
@@ -60,15 +87,44 @@ class GameState:
             "Player2": {"hero": player2.hero, "gate": player2.gate},
         }
         
-        # Initialize board grid and occupant tracking
-        self.rows = 7
-        self.cols = 7
-        self.map = {}
+        # Initialize board grid and occupant tracking; only placed tiles take up memory
+        self.map = make_board(board_size)
+        self.rows = self.map.rows
+        self.cols = self.map.cols
         self.occupants = {}
         self.gate_positions = {}
+
+        # Face-down tiles placed since the last reveal, in placement order
+        self.pending_reveals: List[Tuple[int, int]] = []
+
+        # Face-up tiles whose rules subscribe to enter/exit/occupy/start-of-turn events
+        self.triggers = TriggerIndex()
         
         # Track temporary buffs/effects
         self.fortified_units: List = []
+        self.turn_effects: List = []
+        self.exhausted_units = set()
+
+    # Checkpoints saved before the trigger index existed rebuild it from the face-up tiles
+    def __setstate__(self, saved):
+        saved.setdefault("card_version", 0)
+        saved.setdefault("card_digest", "")
+        self.__dict__.update(saved)
+        if "triggers" not in saved:
+            self.triggers = TriggerIndex.from_map(self.map)
+            self.turn_effects = []
+            self.exhausted_units = set()
+
+    # Put each Gate, with its hero, in the middle of its home row (Player1 at the bottom)
+    def place_gates(self):
+        p1_pos = (self.rows - 1, self.cols // 2)
+        p2_pos = (0, self.cols // 2)
+        self.map[p1_pos] = {"card": self.players[0].gate, "face_up": True}
+        self.map[p2_pos] = {"card": self.players[1].gate, "face_up": True}
+        self.occupants[p1_pos] = [("Player1", self.players[0].hero)]
+        self.occupants[p2_pos] = [("Player2", self.players[1].hero)]
+        # Record gate positions for path checking
+        self.gate_positions = {"Player1": p1_pos, "Player2": p2_pos}
 
     # Each player draws up to their gate's exp_hand
     def deal_starting_hands(self):
@@ -120,7 +176,7 @@ class GameState:
                         player.hero_area.remove(unit)
                     if unit in player.staging_area:
                         player.staging_area.remove(unit)
-                    player.adventure_discard.append(unit)
+                    player.adventure_discard.append(unit.prototype)
                     continue
 
             # Health upkeep/penalty
@@ -136,7 +192,7 @@ class GameState:
                             player.hero_area.remove(unit)
                         if unit in player.staging_area:
                             player.staging_area.remove(unit)
-                        player.adventure_discard.append(unit)
+                        player.adventure_discard.append(unit.prototype)
                         continue
         
         # Iterate Relics/Gears in relic_area for Upkeep costs
@@ -164,7 +220,7 @@ class GameState:
                         hero.health -= dmg
                         if hero.health <= 0:
                             player.hero_area.clear()
-                            player.adventure_discard.append(hero)
+                            player.adventure_discard.append(hero.prototype)
                             continue
 
     def cleanup_end_of_turn(self):
@@ -181,10 +237,22 @@ class GameState:
             if (card in opp_player.staging_area) or (opp_player.hero_area and card is opp_player.hero_area[0]):
                 
                 # Defense buff removal
-                if hasattr(card, "temp_defense_buff"):
-                    delattr(card, "temp_defense_buff")
+                card.temp_defense_buff = 0
         self.fortified_units = []
 
+        # Undo tile effects that last until end of turn
+        revert_turn_effects(self)
+
+    # Take a unit that died on the board at `pos` out of play
+    def remove_unit(self, owner: str, unit, pos):
+        self.occupants[pos] = [(o, u) for (o, u) in self.occupants.get(pos, []) if u is not unit]
+        player = self.players[0] if owner == "Player1" else self.players[1]
+        if unit in player.hero_area:
+            player.hero_area.remove(unit)
+        if unit in player.staging_area:
+            player.staging_area.remove(unit)
+        player.adventure_discard.append(unit.prototype)
+
     # Determine if a continuous path of face-up Ruins connects Player1's Gate to Player2's Gate
     def check_path_between_gates(self) -> bool:
         if not self.gate_positions:
@@ -193,23 +261,7 @@ class GameState:
         goal = self.gate_positions.get("Player2")
         if not start or not goal:
             return False
-        from collections import deque
-        visited = {start}
-        queue = deque([start])
-        directions = [(-1, -1), (-1, 0), (-1, 1),
-                      (0, -1),           (0, 1),
-                      (1, -1),  (1, 0),  (1, 1)]
-        while queue:
-            r, c = queue.popleft()
-            if (r, c) == goal:
-                return True
-            for dr, dc in directions:
-                nr, nc = r + dr, c + dc
-                neighbor = (nr, nc)
-                if neighbor in self.map and self.map[neighbor]["face_up"] and neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        return False
+        return self.map.face_up_path(start, goal)
 
     def current_player(self) -> str:
         return f"Player{self.active_player + 1}"
@@ -221,26 +273,29 @@ class GameState:
 
     # Check win conditions at end of Adventure turn
     def check_adventure_win(self) -> bool:
+        return self.adventure_winner() is not None
+
+    # The player who has won the Adventure Phase, if anyone has
+    def adventure_winner(self) -> Optional[str]:
         # Gate destruction
-        p1_gate = self.board["Player1"]["gate"]
-        p2_gate = self.board["Player2"]["gate"]
-        if getattr(p1_gate, "gate_health", 1) <= 0 or getattr(p2_gate, "gate_health", 1) <= 0:
-            return True
+        for player_label, opp_label in [("Player1", "Player2"), ("Player2", "Player1")]:
+            if getattr(self.board[opp_label]["gate"], "gate_health", 1) <= 0:
+                return player_label
 
         # Hero occupying opponent's Gate
         for player_label, opp_label in [("Player1", "Player2"), ("Player2", "Player1")]:
             hero = self.board[player_label]["hero"]
             opp_gate_pos = self.gate_positions.get(opp_label, None)
             if opp_gate_pos and hero in [u for (own, u) in self.occupants.get(opp_gate_pos, []) if own == player_label]:
-                return True
+                return player_label
 
         # 50 Echoes condition
         for idx, label in enumerate(["Player1", "Player2"]):
             if self.players[idx].echoes >= 50:
-                return True
+                return label
 
-        # Deck exhaustion
+        # Deck exhaustion: the player who ran out loses
         for idx, label in enumerate(["Player1", "Player2"]):
             if len(self.players[idx].adventure_deck) == 0:
-                return True
-        return False
\ No newline at end of file
+                return "Player2" if label == "Player1" else "Player1"
+        return None
\ No newline at end of file
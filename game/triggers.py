@@ -0,0 +1,296 @@
+# External Imports
+import logging
+import re
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Events a placed tile can subscribe to
+ON_ENTER = "on_enter"
+ON_EXIT = "on_exit"
+ON_OCCUPY = "on_occupy"              # each occupant of the active player, at end of turn
+START_OF_TURN = "start_of_turn"
+EVENTS = (ON_ENTER, ON_EXIT, ON_OCCUPY, START_OF_TURN)
+
+logger = logging.getLogger("Triggers")
+
+# What a trigger sees: the unit (if any) acting on the tile at `pos`. Cost triggers adjust `cost`.
+class TriggerContext:
+    __slots__ = ("state", "player", "unit", "pos", "cost", "free")
+
+    def __init__(self, state, player: str, unit, pos):
+        self.state = state
+        self.player = player
+        self.unit = unit
+        self.pos = pos
+        self.cost = 1
+        self.free = False
+
+# Trigger bodies take (the tile's card, context); effects return a description of what happened
+def _require_movement(amount: int, card, ctx: TriggerContext):
+    # Units with the matching terraincraft ignore the penalty
+    if not any("craft" in sm and card.terrain in sm for sm in getattr(ctx.unit, "spec_move", [])):
+        ctx.cost = max(ctx.cost, amount)
+
+def _free_movement(card, ctx: TriggerContext):
+    ctx.free = True
+
+def _damage(amount: int, card, ctx: TriggerContext) -> Optional[str]:
+    unit = ctx.unit
+    if not hasattr(unit, "health"):
+        return None
+    unit.health -= amount
+    if unit.health <= 0:
+        ctx.state.remove_unit(ctx.player, unit, ctx.pos)
+        return f"{unit.name} died in {card.name}"
+    return f"{unit.name} took {amount} damage in {card.name}"
+
+def _modify_until_end_of_turn(attr: str, delta: int, card, ctx: TriggerContext) -> Optional[str]:
+    unit = ctx.unit
+    if not hasattr(unit, attr):
+        return None
+    setattr(unit, attr, getattr(unit, attr) + delta)
+    ctx.state.turn_effects.append((unit, attr, delta))
+    return f"{unit.name} {delta:+d} {attr.title()} from {card.name}"
+
+def _keyword_until_end_of_turn(keyword: str, gain: bool, card, ctx: TriggerContext) -> Optional[str]:
+    keywords = getattr(ctx.unit, "keywords", None)
+    if keywords is None or (keyword in keywords) == gain:
+        return None
+    if gain:
+        keywords.append(keyword)
+    else:
+        keywords.remove(keyword)
+    ctx.state.turn_effects.append((ctx.unit, keyword, gain))
+    return f"{ctx.unit.name} {'gained' if gain else 'lost'} {keyword} from {card.name}"
+
+def _exhaust(card, ctx: TriggerContext) -> str:
+    ctx.state.exhausted_units.add(id(ctx.unit))
+    return f"{ctx.unit.name} lost all remaining Movement in {card.name}"
+
+def _damage_if_defense(comparison: str, threshold: int, amount: int, card, ctx: TriggerContext) -> Optional[str]:
+    defense = getattr(ctx.unit, "defense", 0)
+    if (defense < threshold) if comparison == "less" else (defense > threshold):
+        return _damage(amount, card, ctx)
+    return None
+
+def _heal_if_not_attacked(amount: int, card, ctx: TriggerContext) -> Optional[str]:
+    unit = ctx.unit
+    if id(unit) in getattr(ctx.state, "attacked_units", ()) or not hasattr(unit, "health"):
+        return None
+    printed = unit.prototype.health
+    if unit.health >= printed:
+        return None
+    unit.health = min(printed, unit.health + amount)
+    return f"{unit.name} regained {amount} Health in {card.name}"
+
+# Start of turn: a lone occupant regains all Health
+def _restore_lone_occupant(card, ctx: TriggerContext) -> Optional[str]:
+    occupants = ctx.state.occupants.get(ctx.pos, [])
+    if len(occupants) != 1:
+        return None
+    unit = occupants[0][1]
+    if not hasattr(unit, "health"):
+        return None
+    unit.health = max(unit.health, unit.prototype.health)
+    return f"{unit.name} regained all Health in {card.name}"
+
+# Sentence pattern -> trigger factory, per section of the card. Anything unmatched stays text only.
+_COST_PATTERNS = [
+    (re.compile(r"Requires (\d+) Movement to (enter|exit)", re.I),
+     lambda m: ({"enter": ON_ENTER, "exit": ON_EXIT}[m.group(2).lower()], partial(_require_movement, int(m.group(1))))),
+]
+
+_EFFECT_PATTERNS = {
+    "entry": [
+        (re.compile(r"^Take (\d+) damage", re.I), lambda m: partial(_damage, int(m.group(1)))),
+        (re.compile(r"^(?:Gain )?([+-]\d+) (Attack|Defense|Speed|Movement) until end of turn$", re.I),
+         lambda m: partial(_modify_until_end_of_turn, m.group(2).lower(), int(m.group(1)))),
+        (re.compile(r"^(Gain|Loss|Lose) (Stealth|Fortify|Flanking|Blitz) until end of turn$", re.I),
+         lambda m: partial(_keyword_until_end_of_turn, m.group(2).title(), m.group(1).lower() == "gain")),
+        (re.compile(r"^Lose all remaining Movement$", re.I), lambda m: _exhaust),
+    ],
+    "occupy": [
+        (re.compile(r"^If Defense is (less|greater) than (\d+), at (?:the )?end of turn take (\d+) damage$", re.I),
+         lambda m: partial(_damage_if_defense, m.group(1).lower(), int(m.group(2)), int(m.group(3)))),
+        (re.compile(r"^At end of turn regain (\d+) Health if they did not Attack$", re.I),
+         lambda m: partial(_heal_if_not_attacked, int(m.group(1)))),
+    ],
+    "passive": [
+        (re.compile(r"^At the beginning of each turn, if only one Hero or Minion occupies this Ruin, they regain all Health$", re.I),
+         lambda m: _restore_lone_occupant),
+    ],
+}
+_EFFECT_PATTERNS["exit"] = _EFFECT_PATTERNS["entry"]
+
+_SECTION_EVENT = {"entry": ON_ENTER, "exit": ON_EXIT, "occupy": ON_OCCUPY, "passive": START_OF_TURN}
+
+# "Entry Penalty:", "Exit Bonus:" etc. opening a sentence; qualified forms ("Merfolk Occupy Bonus:") are not matched
+_SECTION_HEADER = re.compile(r"(?:^|(?<=[.\n]))\s*(Entry|Exit|Occupy) (?:Bonus|Penalty):", re.I)
+_SENTENCE_END = re.compile(r"(?<=[.])\s+|\n")
+
+def _sections(ability: str) -> Dict[str, str]:
+    sections = {"passive": "", "entry": "", "exit": "", "occupy": ""}
+    headers = list(_SECTION_HEADER.finditer(ability))
+    sections["passive"] = ability[:headers[0].start()] if headers else ability
+    for i, header in enumerate(headers):
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(ability)
+        sections[header.group(1).lower()] += " " + ability[header.end():end]
+    return sections
+
+def _sentences(text: str) -> List[str]:
+    return [s.strip().rstrip(".").strip() for s in _SENTENCE_END.split(text) if s and s.strip(" .")]
+
+# A Ruin's triggers grouped by event. Calling it runs the effects for one event.
+class CompiledRules:
+    __slots__ = ("source", "costs", "effects")
+
+    def __init__(self, source: Tuple[str, ...], costs: Dict[str, Tuple[Callable, ...]],
+                 effects: Dict[str, Tuple[Callable, ...]]):
+        self.source = source
+        self.costs = costs
+        self.effects = effects
+
+    @property
+    def events(self):
+        return self.costs.keys() | self.effects.keys()
+
+    def apply_costs(self, event: str, card, ctx: TriggerContext):
+        for trigger in self.costs.get(event, ()):
+            trigger(card, ctx)
+
+    def __call__(self, event: str, card, ctx: TriggerContext) -> List[str]:
+        results = []
+        for trigger in self.effects.get(event, ()):
+            result = trigger(card, ctx)
+            if result:
+                results.append(result)
+        return results
+
+    def __bool__(self):
+        return bool(self.costs or self.effects)
+
+    # Pickle as the source text (which the card already carries) and recompile on load
+    def __reduce__(self):
+        return (compile_rules, self.source)
+
+    def __repr__(self):
+        return f"CompiledRules({sorted(self.events)})"
+
+# Cached by text, so every copy of a Ruin shares one compiled object
+@lru_cache(maxsize=None)
+def compile_rules(ability: str, passive: str = "", entry: str = "", exit: str = "", occupy: str = "",
+                  rules_text: str = "") -> CompiledRules:
+    sections = _sections(ability or "")
+    # Structured fields, when the card data fills them in, add to what the ability text says
+    for name, extra in (("passive", passive), ("entry", entry), ("exit", exit), ("occupy", occupy),
+                        ("passive", rules_text)):
+        if extra:
+            sections[name] += " " + extra
+
+    costs: Dict[str, list] = {}
+    effects: Dict[str, list] = {}
+    for name, text in sections.items():
+        for sentence in _sentences(text):
+            matched = False
+            for pattern, build in _COST_PATTERNS:
+                m = pattern.search(sentence)
+                if m:
+                    event, trigger = build(m)
+                    costs.setdefault(event, []).append(trigger)
+                    matched = True
+            if "do not require Movement to enter or exit" in sentence:
+                costs.setdefault(ON_ENTER, []).append(_free_movement)
+                costs.setdefault(ON_EXIT, []).append(_free_movement)
+                matched = True
+            for pattern, build in _EFFECT_PATTERNS[name]:
+                m = pattern.search(sentence)
+                if m:
+                    effects.setdefault(_SECTION_EVENT[name], []).append(build(m))
+                    matched = True
+            if not matched:
+                logger.debug("No trigger for %s clause: %r", name, sentence)
+
+    return CompiledRules(
+        (ability, passive, entry, exit, occupy, rules_text),
+        {event: tuple(triggers) for event, triggers in costs.items()},
+        {event: tuple(triggers) for event, triggers in effects.items()},
+    )
+
+def compile_ruin_rules(card) -> CompiledRules:
+    return compile_rules(card.ability or "", card.passive, card.entry, card.exit, card.occupy, card.rules_text or "")
+
+# Face-up tiles subscribed to each event, so moves and turn boundaries only visit the tiles that care
+class TriggerIndex:
+    def __init__(self):
+        self._subscribers: Dict[str, Dict[Tuple[int, int], object]] = {event: {} for event in EVENTS}
+
+    @classmethod
+    def from_map(cls, tile_map) -> "TriggerIndex":
+        index = cls()
+        for pos, tile in tile_map.items():
+            if tile["face_up"]:
+                index.register_tile(pos, tile["card"])
+        return index
+
+    def register_tile(self, pos, card):
+        rules = getattr(card, "rules", None)
+        if not isinstance(rules, CompiledRules):
+            return
+        for event in rules.events:
+            self._subscribers[event][pos] = card
+
+    def unregister_tile(self, pos):
+        for subscribers in self._subscribers.values():
+            subscribers.pop(pos, None)
+
+    def subscriber(self, event: str, pos):
+        return self._subscribers[event].get(pos)
+
+    def subscribers(self, event: str):
+        return list(self._subscribers[event].items())
+
+# Movement needed for `unit` to leave `origin` and enter `dest`
+def movement_cost(state, player: str, unit, origin, dest) -> int:
+    ctx = TriggerContext(state, player, unit, origin)
+    for event, pos in ((ON_EXIT, origin), (ON_ENTER, dest)):
+        card = state.triggers.subscriber(event, pos)
+        if card is not None:
+            ctx.pos = pos
+            card.rules.apply_costs(event, card, ctx)
+    return 0 if ctx.free else ctx.cost
+
+# Run the effects of the tile at `pos` for one unit
+def fire(state, event: str, pos, player: str, unit) -> List[str]:
+    card = state.triggers.subscriber(event, pos)
+    if card is None:
+        return []
+    return card.rules(event, card, TriggerContext(state, player, unit, pos))
+
+# Occupy triggers for each of `player`'s units standing on a subscribed tile
+def fire_occupy(state, player: str) -> List[str]:
+    results = []
+    for pos, card in state.triggers.subscribers(ON_OCCUPY):
+        for owner, unit in list(state.occupants.get(pos, [])):
+            if owner == player:
+                results += card.rules(ON_OCCUPY, card, TriggerContext(state, owner, unit, pos))
+    return results
+
+def fire_start_of_turn(state, player: str) -> List[str]:
+    results = []
+    for pos, card in state.triggers.subscribers(START_OF_TURN):
+        results += card.rules(START_OF_TURN, card, TriggerContext(state, player, None, pos))
+    return results
+
+# Undo stat changes and keywords granted "until end of turn", newest first
+def revert_turn_effects(state):
+    for unit, attr, value in reversed(state.turn_effects):
+        if isinstance(value, bool):
+            keywords = getattr(unit, "keywords", [])
+            if value and attr in keywords:
+                keywords.remove(attr)
+            elif not value and attr not in keywords:
+                keywords.append(attr)
+        else:
+            setattr(unit, attr, getattr(unit, attr) - value)
+    state.turn_effects = []
+    state.exhausted_units = set()
@@ -0,0 +1,75 @@
+# External Imports
+from typing import Optional
+
+# Internal Imports
+from game.state import GameState, PlayerState
+
+PLAYER_LABELS = ("Player1", "Player2")
+
+# Stand-in for any face-down tile; reveals nothing about the card underneath
+class HiddenTile:
+    card_type = "Hidden"
+    name = "Face-down Ruin"
+    terrain = ""
+    sub_terrain = ""
+    ability = ""
+    connections = ()
+
+    def __reduce__(self):
+        return (HiddenTile, ())
+
+HIDDEN_TILE = HiddenTile()
+
+# What one player may see of a PlayerState: public zones plus, for the owner, the hand
+class PlayerView:
+    __slots__ = (
+        "hero", "gate", "hand", "hand_count", "exp_deck_count", "adventure_deck_count",
+        "exp_discard", "adventure_discard", "echoes", "turn_echo_count",
+        "staging_area", "relic_area", "hero_area",
+    )
+
+    def __init__(self, player: PlayerState, is_owner: bool):
+        self.hero = player.hero
+        self.gate = player.gate
+        self.hand = list(player.hand) if is_owner else []
+        self.hand_count = len(player.hand)
+        self.exp_deck_count = len(player.exp_deck)
+        self.adventure_deck_count = len(player.adventure_deck)
+        self.exp_discard = list(player.exp_discard)
+        self.adventure_discard = list(player.adventure_discard)
+        self.echoes = player.echoes
+        self.turn_echo_count = player.turn_echo_count
+        self.staging_area = list(player.staging_area)
+        self.relic_area = list(player.relic_area)
+        self.hero_area = list(player.hero_area)
+
+# Read-only projection of a GameState for one viewer (None = spectator, both hands hidden)
+class GameView:
+    __slots__ = (
+        "viewer", "players", "turn", "active_player", "match_id", "board",
+        "rows", "cols", "map", "occupants", "gate_positions",
+    )
+
+    def __init__(self, state: GameState, viewer: Optional[str]):
+        self.viewer = viewer
+        self.players = tuple(
+            PlayerView(player, viewer == label) for label, player in zip(PLAYER_LABELS, state.players)
+        )
+        self.turn = state.turn
+        self.active_player = state.active_player
+        self.match_id = state.match_id
+        self.board = state.board
+        self.rows = state.rows
+        self.cols = state.cols
+        # Only tiles awaiting their reveal are face down
+        self.map = state.map.copy()
+        for pos in state.pending_reveals:
+            self.map[pos] = {"card": HIDDEN_TILE, "face_up": False}
+        self.occupants = state.occupants
+        self.gate_positions = state.gate_positions
+
+    def current_player(self) -> str:
+        return f"Player{self.active_player + 1}"
+
+def project_state(state: GameState, viewer: Optional[str]) -> GameView:
+    return GameView(state, viewer)
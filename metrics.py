@@ -0,0 +1,283 @@
+# External Imports
+import functools
+import inspect
+import os
+import tempfile
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+# Default latency buckets in seconds (100µs up to 30s turn timeout)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+# Monotonic counter keyed by label values
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, *label_values):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values) -> float:
+        return self._values.get(label_values, 0)
+
+    def forget(self, label_name: str, label_value: str):
+        idx = self.labels.index(label_name)
+        with self._lock:
+            for key in [k for k in self._values if k[idx] == label_value]:
+                del self._values[key]
+
+    # Add the series labelled label_name=label_value to the matching ones labelled label_name=into
+    def fold(self, label_name: str, label_value: str, into: str):
+        idx = self.labels.index(label_name)
+        with self._lock:
+            for key in [k for k in self._values if k[idx] == label_value]:
+                target = key[:idx] + (into,) + key[idx + 1:]
+                self._values[target] = self._values.get(target, 0) + self._values.pop(key)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for key, val in items:
+            lines.append(f"{self.name}{_format_labels(self.labels, key)} {val}")
+        return lines
+
+# Fixed-bucket histogram; observe() is a bisect plus three additions
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values):
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                # Per-bucket counts (plus +Inf), running sum, total count
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][idx] += 1
+            series[1] += value
+            series[2] += 1
+
+    # Time a block of code: `with hist.time("explore", "draw"): ...`
+    def time(self, *label_values):
+        return _Timer(self, label_values)
+
+    def count(self, *label_values) -> int:
+        series = self._series.get(label_values)
+        return series[2] if series else 0
+
+    def forget(self, label_name: str, label_value: str):
+        idx = self.labels.index(label_name)
+        with self._lock:
+            for key in [k for k in self._series if k[idx] == label_value]:
+                del self._series[key]
+
+    def fold(self, label_name: str, label_value: str, into: str):
+        idx = self.labels.index(label_name)
+        with self._lock:
+            for key in [k for k in self._series if k[idx] == label_value]:
+                counts, total, n = self._series.pop(key)
+                target = key[:idx] + (into,) + key[idx + 1:]
+                series = self._series.get(target)
+                if series is None:
+                    self._series[target] = [counts, total, n]
+                    continue
+                series[0] = [a + b for a, b in zip(series[0], counts)]
+                series[1] += total
+                series[2] += n
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(k, (list(s[0]), s[1], s[2])) for k, s in self._series.items()]
+        for key, (counts, total, n) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), counts):
+                cumulative += c
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                labels = _format_labels(self.labels + ("le",), key + (le,))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {n}")
+        return lines
+
+class _Timer:
+    __slots__ = ("hist", "label_values", "start")
+
+    def __init__(self, hist: Histogram, label_values: Tuple):
+        self.hist = hist
+        self.label_values = label_values
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(perf_counter() - self.start, *self.label_values)
+        return False
+
+def _format_labels(names: Tuple, values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{str(v)}"' for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+# Match label that finished matches' series are folded into
+FINISHED_MATCHES = "finished"
+
+# Holds every metric so they can be exported together
+class Registry:
+    def __init__(self):
+        self._metrics: List = []
+
+    def counter(self, name: str, help_text: str, labels: Iterable[str] = ()) -> Counter:
+        metric = Counter(name, help_text, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help_text: str, labels: Iterable[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, help_text, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    # Fold a finished match's series into match="finished": per-match series stay bounded by the
+    # matches in progress, while totals keep counting what even the shortest match did between
+    # two scrapes
+    def finish_match(self, match_id: str):
+        for metric in self._metrics:
+            if "match" in metric.labels:
+                metric.fold("match", match_id, FINISHED_MATCHES)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+# Metrics shared by the game and network layers
+STEP_SECONDS = REGISTRY.histogram(
+    "ror_phase_step_seconds", "Wall time spent in each phase step", ("match", "phase", "step"))
+CLIENT_WAIT_SECONDS = REGISTRY.histogram(
+    "ror_client_wait_seconds", "Time spent blocked waiting for a client choice", ("match", "step"))
+SERIALIZE_SECONDS = REGISTRY.histogram(
+    "ror_serialize_seconds", "Time spent serializing outgoing messages", ("kind",))
+BYTES_SENT = REGISTRY.counter("ror_bytes_sent_total", "Bytes written to client sockets", ("kind",))
+BYTES_RECEIVED = REGISTRY.counter("ror_bytes_received_total", "Bytes read from client sockets")
+MESSAGES_SENT = REGISTRY.counter("ror_messages_sent_total", "Messages written to client sockets", ("kind",))
+COMPRESS_SECONDS = REGISTRY.histogram(
+    "ror_compress_seconds", "Time spent compressing outgoing frames", ("kind",))
+COMPRESS_IN_BYTES = REGISTRY.counter(
+    "ror_compress_input_bytes_total", "Message bytes handed to the compressor", ("kind",))
+COMPRESS_OUT_BYTES = REGISTRY.counter(
+    "ror_compress_output_bytes_total", "Compressed bytes produced", ("kind",))
+
+# Decorator timing a phase `_step_*` method into STEP_SECONDS. Steps that wait for a player
+# are generators (see game.flow); only the time spent running them counts, not the wait.
+def timed_step(phase: str):
+    def decorate(func):
+        step = func.__name__.replace("_step_", "", 1)
+
+        @functools.wraps(func)
+        def wrapper(self, *args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(self, *args, **kwargs)
+            finally:
+                match_id = getattr(self.state, "match_id", None) or ""
+                STEP_SECONDS.observe(perf_counter() - start, match_id, phase, step)
+
+        @functools.wraps(func)
+        def generator_wrapper(self, *args, **kwargs):
+            steps = func(self, *args, **kwargs)
+            elapsed = 0.0
+            reply = None
+            try:
+                while True:
+                    start = perf_counter()
+                    try:
+                        request = steps.send(reply)
+                    except StopIteration as stop:
+                        return stop.value
+                    finally:
+                        elapsed += perf_counter() - start
+                    reply = yield request
+            finally:
+                steps.close()
+                match_id = getattr(self.state, "match_id", None) or ""
+                STEP_SECONDS.observe(elapsed, match_id, phase, step)
+        return generator_wrapper if inspect.isgeneratorfunction(func) else wrapper
+    return decorate
+
+# Short label describing a protocol message, e.g. "state_update" or "explore:placement"
+def message_kind(obj) -> str:
+    if isinstance(obj, dict):
+        if "type" in obj:
+            return str(obj["type"])
+        if "phase" in obj:
+            return f"{obj['phase']}:{obj.get('step', '')}"
+        if "deck_choice" in obj:
+            return "deck_choice"
+        if "heroes" in obj:
+            return "deck_options"
+    return "other"
+
+# Write the current metrics atomically so scrapers never see a partial file
+def write_metrics_file(path, registry: Registry = REGISTRY):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".metrics-")
+    with os.fdopen(fd, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp, path)
+
+# Serve /metrics in Prometheus text format from a daemon thread. `routes` adds admin endpoints:
+# path -> handler taking the query parameters and returning the response text.
+def start_metrics_server(host: str, port: int, registry: Registry = REGISTRY,
+                         routes: Optional[Dict[str, Callable[[Dict[str, str]], str]]] = None) -> ThreadingHTTPServer:
+    routes = routes or {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlsplit(self.path)
+            path = url.path.rstrip("/")
+            if path in routes:
+                try:
+                    text = routes[path](dict(parse_qsl(url.query)))
+                except KeyError as missing:
+                    self.send_error(400, f"missing parameter {missing}")
+                    return
+                self._reply(text.encode("utf-8"), "text/plain")
+                return
+            if path not in ("", "/metrics"):
+                self.send_error(404)
+                return
+            self._reply(registry.render().encode("utf-8"), "text/plain; version=0.0.4")
+
+        def _reply(self, body: bytes, content_type: str):
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, name="metrics-http", daemon=True).start()
+    return httpd
@@ -1,15 +1,16 @@
 # External Imports
 from dataclasses import dataclass, field
-from typing import List, Optional, Callable, Any
+from typing import List, Optional, Callable, Any, Tuple, Union
 
-# Core Data Classes
-@dataclass
+# Core Data Classes. Cards are frozen prototypes shared by every player and match; state that
+# changes in play lives on the UnitInstance/GateInstance wrapping a prototype.
+@dataclass(frozen=True, slots=True)
 class Card:
     name: str
     rules_text: str
     rules: Optional[Callable[..., Any]] = None
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class GateCard(Card):
     terrain: str
     sub_terrain: str = ""
@@ -20,10 +21,10 @@ class GateCard(Card):
     gate_health: int
     ability: str
     rules: str = ""
-    connections: List[int] = field(default_factory=list)
+    connections: Tuple[int, ...] = ()
     card_type: str = field(init=False, default="Gate")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class RuinCard(Card):
     limit: int
     terrain: str
@@ -34,10 +35,10 @@ class RuinCard(Card):
     entry: str = ""
     occupy: str = ""
     exit: str = ""
-    connections: List[int] = field(default_factory=list)
+    connections: Tuple[int, ...] = ()
     card_type: str = field(init=False, default="Ruin")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class HeroCard(Card):
     heroname: str
     summon_condition: str
@@ -50,14 +51,14 @@ class HeroCard(Card):
     leadership: int
     race: str
     class_type: str
-    elements: List[str] = field(default_factory=list)
-    spec_move: List[str] = field(default_factory=list)
-    keywords: List[str] = field(default_factory=list)
+    elements: Tuple[str, ...] = ()
+    spec_move: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
     ability: str
     rules: str = ""
     card_type: str = field(init=False, default="Hero")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class MinionCard(Card):
     cost: int
     health: int
@@ -65,19 +66,19 @@ class MinionCard(Card):
     defense: int
     speed: int
     movement: int
-    race: List[str] = field(default_factory=list)
-    class_type: List[str] = field(default_factory=list)
-    spec_move: List[str] = field(default_factory=list)
-    keywords: List[str] = field(default_factory=list)
+    race: Tuple[str, ...] = ()
+    class_type: Tuple[str, ...] = ()
+    spec_move: Tuple[str, ...] = ()
+    keywords: Tuple[str, ...] = ()
     ability: str = ""
     rules: str = ""
     deck_type: str = "Adv"
     card_type: str = field(init=False, default="Minion")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class RelicCard(Card):
     cost: int
-    elements: List[str] = field(default_factory=list)
+    elements: Tuple[str, ...] = ()
     relic_type: str
     charges: int
     charging_condition: str
@@ -86,40 +87,91 @@ class RelicCard(Card):
     deck_type: str = "Adv"
     card_type: str = field(init=False, default="Relic")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class GearCard(Card):
     cost: int
     gear_type: str
     gear_subtype: str
     weight: int
-    elements: List[str] = field(default_factory=list)
+    elements: Tuple[str, ...] = ()
     restrictions: str = ""
     ability: str = ""
     rules: str = ""
     deck_type: str = "Adv"
     card_type: str = field(init=False, default="Gear")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class SpellCard(Card):
     cost: int
     spell_type: str
     school: str
     casting_criteria: str
-    elements: List[str] = field(default_factory=list)
+    elements: Tuple[str, ...] = ()
     ability: str = ""
     rules: str = ""
     deck_type: str = "Adv"
     card_type: str = field(init=False, default="Spell")
 
-@dataclass(kw_only=True)
+@dataclass(frozen=True, slots=True, kw_only=True)
 class GlyphCard(Card):
     cost: int
     glyph_type: str
     school: str
     size: int
     target_criteria: str
-    elements: List[str] = field(default_factory=list)
+    elements: Tuple[str, ...] = ()
     ability: str = ""
     rules: str = ""
     deck_type: str = "Adv"
-    card_type: str = field(init=False, default="Glyph")
\ No newline at end of file
+    card_type: str = field(init=False, default="Glyph")
+
+# In-play Hero or Minion: its own copy of the stats combat and Ruin rules change, reading
+# everything else (name, ability, spec_move...) through to the prototype
+@dataclass(slots=True, eq=False)
+class UnitInstance:
+    prototype: Union[HeroCard, MinionCard]
+    health: int
+    attack: int
+    defense: int
+    speed: int
+    movement: int
+    keywords: List[str]
+    temp_defense_buff: int = 0
+
+    @classmethod
+    def from_card(cls, card: Union[HeroCard, MinionCard]) -> "UnitInstance":
+        return cls(card, card.health, card.attack, card.defense, card.speed, card.movement, list(card.keywords))
+
+    # Read on every move and attack, so they skip the __getattr__ fallback
+    @property
+    def name(self) -> str:
+        return self.prototype.name
+
+    @property
+    def ability(self) -> str:
+        return self.prototype.ability
+
+    @property
+    def spec_move(self) -> Tuple[str, ...]:
+        return self.prototype.spec_move
+
+    # Only reached for names that are not slots; pickle and copy probe dunders before `prototype` is set
+    def __getattr__(self, name):
+        if name == "prototype" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.prototype, name)
+
+# A Gate on the board, taking damage separately from its printed Gate Health
+@dataclass(slots=True, eq=False)
+class GateInstance:
+    prototype: GateCard
+    gate_health: int
+
+    @classmethod
+    def from_card(cls, card: GateCard) -> "GateInstance":
+        return cls(card, card.gate_health)
+
+    def __getattr__(self, name):
+        if name == "prototype" or name.startswith("__"):
+            raise AttributeError(name)
+        return getattr(self.prototype, name)
@@ -0,0 +1,237 @@
+# External Imports
+import logging
+import selectors
+import socket
+import threading
+from collections import deque
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional
+
+# Internal Imports
+from metrics import BYTES_SENT, MESSAGES_SENT, message_kind
+from network.protocol import encode_frame, send_frame, send_obj
+
+# Message types that carry a complete picture of the game; slow viewers resync from these
+KEYFRAME_TYPES = {"state_update", "game_end"}
+
+# One encoded message, shared read-only by every recipient
+class Frame(NamedTuple):
+    data: bytes
+    kind: str
+    keyframe: bool
+
+def make_frame(obj) -> Frame:
+    kind = message_kind(obj)
+    keyframe = isinstance(obj, dict) and obj.get("type") in KEYFRAME_TYPES
+    return Frame(encode_frame(obj, kind), kind, keyframe)
+
+# Outgoing queue for one spectator socket
+class SpectatorFeed:
+    def __init__(self, conn: socket.socket, max_frames: int):
+        self.conn = conn
+        self.max_frames = max_frames
+        self.frames: Deque[Frame] = deque()
+        self.current: Optional[memoryview] = None
+        self.current_kind = ""
+        self.dropped = 0
+
+    # Queue a frame; when the viewer falls behind, discard backlog and restart from a keyframe
+    def push(self, frame: Frame, last_keyframe: Optional[Frame]):
+        if len(self.frames) >= self.max_frames:
+            self.dropped += len(self.frames)
+            self.frames.clear()
+            if not frame.keyframe and last_keyframe is not None:
+                self.frames.append(last_keyframe)
+        self.frames.append(frame)
+
+    def has_data(self) -> bool:
+        return self.current is not None or bool(self.frames)
+
+    # Write as much as the socket accepts without blocking; False when the viewer has gone
+    def flush(self) -> bool:
+        while True:
+            if self.current is None:
+                if not self.frames:
+                    return True
+                frame = self.frames.popleft()
+                self.current = memoryview(frame.data)
+                self.current_kind = frame.kind
+            try:
+                sent = self.conn.send(self.current)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+            self.current = self.current[sent:]
+            BYTES_SENT.inc(sent, self.current_kind)
+            if not self.current:
+                self.current = None
+                MESSAGES_SENT.inc(1, self.current_kind)
+
+# Encodes each message once and fans it out to the players and any spectators
+class Broadcaster:
+    def __init__(self, players: Iterable, max_spectator_frames: int = 32):
+        self.players: List = list(players)
+        self.max_spectator_frames = max_spectator_frames
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._spectators: List[SpectatorFeed] = []
+        self._last_keyframe: Optional[Frame] = None
+        self._pending_keyframe = None
+        self._lock = threading.Lock()
+        self._selector: Optional[selectors.BaseSelector] = None
+        self._wake_r = self._wake_w = None
+        self._writer: Optional[threading.Thread] = None
+        self._closed = False
+
+    # Players receive the frame synchronously; spectators get it from the writer thread
+    def broadcast(self, obj) -> Frame:
+        frame = make_frame(obj)
+        for conn in self.players:
+            send_frame(conn, frame.data, frame.kind)
+        self.publish(frame)
+        return frame
+
+    # Send each player its own message and spectators a shared public one
+    def broadcast_views(self, player_msgs: Iterable, spectator_msg):
+        for conn, msg in zip(self.players, player_msgs):
+            send_obj(conn, msg)
+        # Skip encoding the spectator view until someone is watching
+        with self._lock:
+            if not self._spectators:
+                self._pending_keyframe = spectator_msg
+                return
+        self.publish(make_frame(spectator_msg))
+
+    def publish(self, frame: Frame):
+        with self._lock:
+            if frame.keyframe:
+                self._last_keyframe = frame
+                self._pending_keyframe = None
+            if not self._spectators:
+                return
+            for feed in self._spectators:
+                feed.push(frame, self._last_keyframe)
+        self._wake()
+
+    # Attach a spectator; it starts from the most recent keyframe. False once the match is over.
+    def add_spectator(self, conn: socket.socket) -> bool:
+        feed = SpectatorFeed(conn, self.max_spectator_frames)
+        with self._lock:
+            if self._closed:
+                return False
+            conn.setblocking(False)
+            if self._pending_keyframe is not None:
+                self._last_keyframe = make_frame(self._pending_keyframe)
+                self._pending_keyframe = None
+            if self._last_keyframe is not None:
+                feed.push(self._last_keyframe, None)
+            self._spectators.append(feed)
+            self._ensure_writer()
+        self._wake()
+        return True
+
+    def spectator_count(self) -> int:
+        return len(self._spectators)
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._writer = threading.Thread(target=self._write_loop, name="spectator-writer", daemon=True)
+        self._writer.start()
+
+    def _wake(self):
+        if self._wake_w is not None:
+            try:
+                self._wake_w.send(b"\0")
+            except (BlockingIOError, OSError):
+                pass
+
+    # Single thread serving every spectator with non-blocking writes
+    def _write_loop(self):
+        registered = {}
+        while not self._closed:
+            with self._lock:
+                feeds = list(self._spectators)
+            for feed in feeds:
+                want = feed.has_data()
+                key = registered.get(feed)
+                if want and key is None:
+                    registered[feed] = self._selector.register(feed.conn, selectors.EVENT_WRITE, feed)
+                elif not want and key is not None:
+                    self._selector.unregister(feed.conn)
+                    del registered[feed]
+            for key, _ in self._selector.select(timeout=1.0):
+                if key.fileobj is self._wake_r:
+                    try:
+                        while self._wake_r.recv(4096):
+                            pass
+                    except BlockingIOError:
+                        pass
+                    continue
+                feed = key.data
+                with self._lock:
+                    ok = feed.flush()
+                if not ok:
+                    self._drop(feed, registered)
+
+    def _drop(self, feed: SpectatorFeed, registered):
+        if feed in registered:
+            self._selector.unregister(feed.conn)
+            del registered[feed]
+        with self._lock:
+            if feed in self._spectators:
+                self._spectators.remove(feed)
+        feed.conn.close()
+        self.logger.debug("Spectator disconnected (%d frames dropped while slow)", feed.dropped)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        self._wake()
+        if self._writer is not None:
+            self._writer.join(timeout=2.0)
+            self._selector.close()
+            self._wake_r.close()
+            self._wake_w.close()
+        with self._lock:
+            for feed in self._spectators:
+                feed.conn.close()
+            self._spectators.clear()
+
+# Broadcasters of the matches in progress by match ID, oldest first. Match flows add and remove
+# theirs while spectator threads look them up, so every access goes through the lock.
+class LiveMatches:
+    def __init__(self):
+        self._broadcasters: Dict[str, Broadcaster] = {}
+        self._lock = threading.Lock()
+
+    def add(self, match_id: str, broadcaster: Broadcaster):
+        with self._lock:
+            self._broadcasters[match_id] = broadcaster
+
+    def remove(self, match_id: str):
+        with self._lock:
+            self._broadcasters.pop(match_id, None)
+
+    def get(self, match_id: str) -> Optional[Broadcaster]:
+        with self._lock:
+            return self._broadcasters.get(match_id)
+
+    # The most recently started match, if any
+    def latest(self) -> Optional[Broadcaster]:
+        with self._lock:
+            return next(reversed(self._broadcasters.values()), None)
+
+    # What a spectator chooses from: each match's ID and how many are watching it
+    def listing(self) -> List[dict]:
+        with self._lock:
+            live = list(self._broadcasters.items())
+        return [{"match_id": match_id, "spectators": b.spectator_count()} for match_id, b in live]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._broadcasters)
@@ -1,5 +1,8 @@
 # External Imports
+import json
 import socket
+from pathlib import Path
+from typing import Optional
 
 # Internal Imports
 from network.protocol import send_obj, recv_obj
@@ -15,4 +18,36 @@ def safe_send(conn, obj):
     send_obj(conn, obj)
 
 def safe_recv(conn):
-    return recv_obj(conn)
\ No newline at end of file
+    return recv_obj(conn)
+
+# The seat this client holds in a match, as the server announced it ({"type": "seat", ...})
+def save_session(path: Path, seat: dict):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({key: seat[key] for key in ("match_id", "player", "token")}))
+
+def load_session(path: Path) -> Optional[dict]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+
+# Tokens the matchmaking server issued for this client's names, by name
+def load_tokens(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+def save_token(path: Path, player_id: str, token: str):
+    tokens = load_tokens(path)
+    tokens[player_id] = token
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(tokens))
+
+# Offer to rejoin the match in `session` in reply to the server's deck offer. Returns the
+# server's answer: {"type": "resume", ...} once both players are back in the match,
+# {"type": "resume_refused", ...}, after which the server expects a deck choice instead, or
+# {"type": "redirect", "port": ...} naming the server worker to rejoin on.
+def rejoin(conn, session: dict) -> dict:
+    send_obj(conn, {'resume': session['match_id'], 'player': session['player'], 'token': session['token']})
+    return recv_obj(conn)
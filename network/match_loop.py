@@ -0,0 +1,315 @@
+# External Imports
+import logging
+import selectors
+import socket
+import threading
+import zlib
+from collections import deque
+from time import monotonic, perf_counter
+from typing import Callable, Deque, Dict, Optional
+
+# Internal Imports
+from config import PLAYER_SEND_BUFFER, PLAYER_DRAIN_SECONDS
+from game.flow import AwaitInput
+from metrics import BYTES_RECEIVED, CLIENT_WAIT_SECONDS
+from network.protocol import CONTROL_FRAME, check_frame_length, decode_frame, set_outbox, stream_for
+from profiling import profiled_call
+
+# Longest the loop waits for a socket before passing again, so its progress shows while idle
+IDLE_POLL_SECONDS = 0.25
+
+# Errors that end one match (a player gone or sending garbage) without affecting the others
+MATCH_ERRORS = (OSError, EOFError, ValueError, zlib.error)
+
+# One player's non-blocking socket: bytes read so far and the complete replies decoded from
+# them, and frames written to it that the socket hasn't taken yet. Replies sent before they
+# are asked for wait here until the flow gets to them.
+class PlayerChannel:
+    def __init__(self, match: "LiveMatch", player: str, conn: socket.socket):
+        self.match = match
+        self.player = player
+        self.conn = conn
+        self.buffer = bytearray()
+        self.replies: Deque = deque()
+        self.outbound = bytearray()
+        # Whether the loop is watching the socket for room to write
+        self.writing = False
+
+    # Read whatever has arrived; False once the player has disconnected
+    def read(self) -> bool:
+        try:
+            data = self.conn.recv(65536)
+        except BlockingIOError:
+            return True
+        if not data:
+            return False
+        self.buffer += data
+        while len(self.buffer) >= 4:
+            header = int.from_bytes(self.buffer[:4], 'big')
+            end = 4 + check_frame_length(header)
+            if len(self.buffer) < end:
+                break
+            raw = bytes(self.buffer[4:end])
+            del self.buffer[:end]
+            BYTES_RECEIVED.inc(end)
+            reply = decode_frame(header, raw, stream_for(self.conn))
+            if reply is not CONTROL_FRAME:
+                self.replies.append(reply)
+        return True
+
+    # Every frame sent to the player comes here (network.protocol.send_frame). It goes straight
+    # to the socket while the player keeps up and is queued for the loop to finish otherwise; a
+    # player who lets too much pile up has stopped reading, which ends their match.
+    def write(self, data: bytes):
+        if not self.outbound:
+            try:
+                sent = self.conn.send(data)
+            except BlockingIOError:
+                sent = 0
+            if sent == len(data):
+                return
+            data = memoryview(data)[sent:]
+        self.outbound += data
+        if len(self.outbound) > PLAYER_SEND_BUFFER:
+            raise ConnectionError(f"{self.player} stopped reading with {len(self.outbound)} bytes unsent")
+
+    # Send what the socket will take; True once nothing is left
+    def flush(self) -> bool:
+        try:
+            sent = self.conn.send(self.outbound)
+        except BlockingIOError:
+            return False
+        del self.outbound[:sent]
+        return not self.outbound
+
+# A match on the loop: its flow, what the flow is waiting for and since when
+class LiveMatch:
+    def __init__(self, match_id: str, flow, connections: Dict[str, socket.socket], on_done: Optional[Callable]):
+        self.match_id = match_id
+        self.flow = flow
+        self.on_done = on_done
+        self.channels = {player: PlayerChannel(self, player, conn) for player, conn in connections.items()}
+        self.waiting: Optional[AwaitInput] = None
+        self.wait_started = 0.0
+        # Once the flow has ended: its result, and until when its last frames may take to go out
+        self.result = None
+        self.drain_deadline = 0.0
+
+def _send(flow, reply):
+    return flow.send(reply)
+
+# Plays any number of matches on one thread. Each match is a flow (see game.flow); the loop
+# watches every player's socket, and when the player a flow is waiting for has a complete reply
+# it resumes that flow until it waits again. Player sockets are non-blocking: frames the socket
+# can't take at once wait in the player's channel until it is writable, so a player who stops
+# reading holds up only their own match.
+class MatchLoop:
+    def __init__(self):
+        self.selector = selectors.DefaultSelector()
+        self.matches: Dict[int, LiveMatch] = {}
+        # Finished matches whose last frames are still going out
+        self.draining: Dict[int, LiveMatch] = {}
+        self._incoming: Deque[LiveMatch] = deque()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ)
+        self._thread: Optional[threading.Thread] = None
+        # Set whenever no match is running or waiting to join; changed under _idle_lock so a
+        # match being added can't be missed by a match finishing at the same time
+        self._idle = threading.Event()
+        self._idle.set()
+        self._idle_lock = threading.Lock()
+        # Passes through the loop so far, for the worker heartbeat (network.supervisor.watch_progress)
+        self.passes = 0
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    # Hand a match to the loop; safe from any thread. connections maps each player label to
+    # its socket, and on_done(result, error) runs on the loop thread when the flow ends.
+    def add(self, match_id: str, flow, connections: Dict[str, socket.socket], on_done: Optional[Callable] = None):
+        with self._idle_lock:
+            self._incoming.append(LiveMatch(match_id, flow, connections, on_done))
+            self._idle.clear()
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+
+    def start(self) -> threading.Thread:
+        self._thread = threading.Thread(target=self.run, name="match-loop", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def run(self):
+        while True:
+            self.passes += 1
+            for key, events in self.selector.select(IDLE_POLL_SECONDS):
+                if key.fileobj is self._wake_r:
+                    self._drain_wake()
+                    while self._incoming:
+                        self._begin(self._incoming.popleft())
+                    continue
+                channel = key.data
+                if events & selectors.EVENT_WRITE:
+                    self._on_writable(channel)
+                if events & selectors.EVENT_READ and id(channel.match) in self.matches:
+                    self._on_readable(channel)
+            if self.draining:
+                self._expire_drains()
+
+    def _drain_wake(self):
+        try:
+            while self._wake_r.recv(4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _begin(self, match: LiveMatch):
+        self.matches[id(match)] = match
+        for channel in match.channels.values():
+            channel.conn.setblocking(False)
+            set_outbox(channel.conn, channel)
+            self.selector.register(channel.conn, selectors.EVENT_READ, channel)
+        self.logger.debug("Match %s joined the loop (%d running)", match.match_id, len(self.matches))
+        self._advance(match, None)
+        self._deliver(match)
+
+    def _on_readable(self, channel: PlayerChannel):
+        match = channel.match
+        try:
+            connected = channel.read()
+        except MATCH_ERRORS as exc:
+            self._finish(match, None, exc)
+            return
+        if not connected:
+            self._finish(match, None, ConnectionError(f"{channel.player} disconnected"))
+            return
+        self._deliver(match)
+
+    def _on_writable(self, channel: PlayerChannel):
+        match = channel.match
+        if id(match) not in self.matches and id(match) not in self.draining:
+            return
+        try:
+            flushed = channel.flush()
+        except OSError as exc:
+            if id(match) in self.matches:
+                self._finish(match, None, exc)
+            else:
+                self.logger.debug("Last frames of match %s to %s were lost: %s", match.match_id, channel.player, exc)
+                self._release(self.draining.pop(id(match)), match.result, None)
+            return
+        if not flushed:
+            return
+        if id(match) in self.matches:
+            self._watch_writes(channel, False)
+            return
+        # A finished match hands its sockets back once every player has had its last frames
+        self.selector.unregister(channel.conn)
+        channel.writing = False
+        if not any(other.outbound for other in match.channels.values()):
+            self._release(self.draining.pop(id(match)), match.result, None)
+
+    def _watch_writes(self, channel: PlayerChannel, writing: bool):
+        if channel.writing != writing:
+            events = selectors.EVENT_READ | selectors.EVENT_WRITE if writing else selectors.EVENT_READ
+            self.selector.modify(channel.conn, events, channel)
+            channel.writing = writing
+
+    # Resume the flow for as long as the player it waits for has a reply queued
+    def _deliver(self, match: LiveMatch):
+        while match.waiting is not None:
+            channel = match.channels[match.waiting.player]
+            if not channel.replies:
+                break
+            CLIENT_WAIT_SECONDS.observe(perf_counter() - match.wait_started, match.match_id, match.waiting.step)
+            self._advance(match, channel.replies.popleft())
+        # Wait for room in the sockets of players whose frames didn't all go out
+        if id(match) in self.matches:
+            for channel in match.channels.values():
+                if channel.outbound:
+                    self._watch_writes(channel, True)
+
+    def _advance(self, match: LiveMatch, reply):
+        try:
+            request = profiled_call(match.match_id, _send, match.flow, reply)
+        except StopIteration as stop:
+            self._finish(match, stop.value, None)
+            return
+        except MATCH_ERRORS as exc:
+            self._finish(match, None, exc)
+            return
+        except Exception as exc:
+            # A bug in one match must not stop the others on this loop
+            self.logger.exception("Match %s failed", match.match_id)
+            self._finish(match, None, exc)
+            return
+        match.waiting = request
+        match.wait_started = perf_counter()
+
+    # Stop reading the match's sockets; an unfinished flow is closed so its cleanup runs. A match
+    # that ended normally first gets its last frames (the game_end) out to every player.
+    def _finish(self, match: LiveMatch, result, error: Optional[BaseException]):
+        if self.matches.pop(id(match), None) is None:
+            return
+        match.waiting = None
+        if error is not None:
+            try:
+                match.flow.close()
+            except Exception:
+                self.logger.exception("Cleaning up match %s failed", match.match_id)
+        pending = [channel for channel in match.channels.values() if channel.outbound]
+        if error is None and pending:
+            match.result = result
+            match.drain_deadline = monotonic() + PLAYER_DRAIN_SECONDS
+            self.draining[id(match)] = match
+            for channel in match.channels.values():
+                if channel.outbound:
+                    self.selector.modify(channel.conn, selectors.EVENT_WRITE, channel)
+                    channel.writing = True
+                else:
+                    self._unregister(channel)
+            return
+        self._release(match, result, error)
+
+    # Give up on the last frames of players who haven't taken them in time
+    def _expire_drains(self):
+        now = monotonic()
+        for key, match in list(self.draining.items()):
+            if match.drain_deadline <= now:
+                del self.draining[key]
+                self.logger.debug("Match %s ended with frames still unsent", match.match_id)
+                self._release(match, match.result, None)
+
+    def _unregister(self, channel: PlayerChannel):
+        try:
+            self.selector.unregister(channel.conn)
+        except (KeyError, ValueError):
+            pass
+        channel.writing = False
+
+    # Hand the match's sockets back (blocking again, frames sent directly) and report the end
+    def _release(self, match: LiveMatch, result, error: Optional[BaseException]):
+        for channel in match.channels.values():
+            self._unregister(channel)
+            set_outbox(channel.conn, None)
+            channel.outbound.clear()
+            try:
+                channel.conn.setblocking(True)
+            except OSError:
+                pass
+        if match.on_done is not None:
+            try:
+                match.on_done(result, error)
+            except Exception:
+                self.logger.exception("Completion callback for match %s failed", match.match_id)
+        with self._idle_lock:
+            if not self.matches and not self.draining and not self._incoming:
+                self._idle.set()
+
+    def match_count(self) -> int:
+        return len(self.matches)
+
+    # Block until every match handed to the loop has ended; False on timeout
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        return self._idle.wait(timeout)
@@ -0,0 +1,312 @@
+# External Imports
+import itertools
+import json
+import logging
+import selectors
+import socket
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+# Internal Imports
+from network.sessions import new_token, token_digest, token_matches
+
+DEFAULT_RATING = 1500.0
+ELO_K = 32.0
+
+_ticket_ids = itertools.count()
+
+# A player waiting for an opponent. Unrated tickets are guests, whose results aren't recorded.
+class Ticket:
+    __slots__ = ("player_id", "conn", "rating", "deck_key", "deck_choice", "enqueued_at", "seq", "active", "rated")
+
+    def __init__(self, player_id: str, conn, rating: float, deck_choice: dict, enqueued_at: float,
+                 rated: bool = True):
+        self.player_id = player_id
+        self.conn = conn
+        self.rating = rating
+        self.deck_choice = deck_choice
+        self.deck_key = deck_key(deck_choice)
+        self.enqueued_at = enqueued_at
+        self.seq = next(_ticket_ids)
+        self.active = True
+        self.rated = rated
+
+def deck_key(deck_choice: dict) -> Tuple[str, str]:
+    hero, gate = deck_choice["hero"], deck_choice["gate"]
+    return (getattr(hero, "name", str(hero)), getattr(gate, "name", str(gate)))
+
+# Waiting players indexed by rating bucket, then by deck, FIFO within each
+class MatchmakingQueue:
+    def __init__(self, bucket_width: int = 50, base_window: float = 100.0,
+                 widen_per_second: float = 25.0, max_window: float = 800.0):
+        self.bucket_width = bucket_width
+        self.base_window = base_window
+        self.widen_per_second = widen_per_second
+        self.max_window = max_window
+        self._buckets: Dict[int, Dict[Tuple[str, str], Deque[Ticket]]] = {}
+        self._bucket_sizes: Dict[int, int] = {}
+        self._bucket_keys: List[int] = []
+        self._by_age: Deque[Ticket] = deque()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _bucket_of(self, rating: float) -> int:
+        return int(rating // self.bucket_width)
+
+    def window(self, ticket: Ticket, now: float) -> float:
+        waited = max(0.0, now - ticket.enqueued_at)
+        return min(self.max_window, self.base_window + self.widen_per_second * waited)
+
+    # Queue a ticket, or return the opponent it was paired with straight away
+    def enqueue(self, ticket: Ticket, now: Optional[float] = None) -> Optional[Tuple[Ticket, Ticket]]:
+        now = time.monotonic() if now is None else now
+        opponent = self._find_opponent(ticket, self.window(ticket, now))
+        if opponent is not None:
+            self._remove(opponent)
+            return opponent, ticket
+        self._insert(ticket)
+        return None
+
+    def cancel(self, ticket: Ticket):
+        if ticket.active:
+            self._remove(ticket)
+
+    # Retry the longest-waiting tickets with their widened windows
+    def tick(self, now: Optional[float] = None, budget: int = 256) -> List[Tuple[Ticket, Ticket]]:
+        now = time.monotonic() if now is None else now
+        pairs = []
+        for _ in range(min(budget, len(self._by_age))):
+            ticket = self._by_age.popleft()
+            if not ticket.active:
+                continue
+            self._by_age.append(ticket)
+            # A ticket never matches itself, so it can stay in place while searching
+            opponent = self._find_opponent(ticket, self.window(ticket, now))
+            if opponent is None:
+                continue
+            self._remove(ticket)
+            self._remove(opponent)
+            pairs.append((opponent, ticket) if opponent.seq < ticket.seq else (ticket, opponent))
+        self._compact()
+        return pairs
+
+    def _insert(self, ticket: Ticket):
+        bucket = self._bucket_of(ticket.rating)
+        decks = self._buckets.get(bucket)
+        if decks is None:
+            decks = self._buckets[bucket] = {}
+            self._bucket_sizes[bucket] = 0
+            insort(self._bucket_keys, bucket)
+        decks.setdefault(ticket.deck_key, deque()).append(ticket)
+        self._bucket_sizes[bucket] += 1
+        ticket.active = True
+        self._size += 1
+        self._by_age.append(ticket)
+
+    def _remove(self, ticket: Ticket):
+        bucket = self._bucket_of(ticket.rating)
+        queue = self._buckets[bucket][ticket.deck_key]
+        if queue and queue[0] is ticket:
+            queue.popleft()
+        else:
+            queue.remove(ticket)
+        ticket.active = False
+        self._size -= 1
+        self._bucket_sizes[bucket] -= 1
+        if not queue:
+            del self._buckets[bucket][ticket.deck_key]
+        if not self._bucket_sizes[bucket]:
+            del self._buckets[bucket]
+            del self._bucket_sizes[bucket]
+            del self._bucket_keys[bisect_left(self._bucket_keys, bucket)]
+
+    # Drop cancelled tickets from the age queue once they make up most of it
+    def _compact(self):
+        if len(self._by_age) > 2 * self._size + 64:
+            self._by_age = deque(t for t in self._by_age if t.active)
+
+    # Closest-rated waiting ticket other than this one, searching outward from the ticket's bucket
+    def _find_opponent(self, ticket: Ticket, window: float) -> Optional[Ticket]:
+        keys = self._bucket_keys
+        if not keys:
+            return None
+        lo = bisect_left(keys, self._bucket_of(ticket.rating - window))
+        hi = bisect_left(keys, self._bucket_of(ticket.rating + window) + 1)
+        if lo >= hi:
+            return None
+        centre = min(max(bisect_left(keys, self._bucket_of(ticket.rating)), lo), hi - 1)
+        best = None
+        for offset in range(hi - lo):
+            for idx in ((centre - offset, centre + offset) if offset else (centre,)):
+                if not lo <= idx < hi:
+                    continue
+                for queue in self._buckets[keys[idx]].values():
+                    candidate = _first_other(queue, ticket)
+                    if candidate is None:
+                        continue
+                    gap = abs(candidate.rating - ticket.rating)
+                    if gap <= window and (best is None or gap < abs(best.rating - ticket.rating)):
+                        best = candidate
+            # Stop at the nearest ring of buckets that holds a candidate
+            if best is not None:
+                return best
+        return best
+
+# The longest-waiting ticket of a deck queue that isn't `ticket`, which may be queued there itself
+def _first_other(queue: Deque[Ticket], ticket: Ticket) -> Optional[Ticket]:
+    for candidate in itertools.islice(queue, 2):
+        if candidate is not ticket:
+            return candidate
+    return None
+
+# Elo ratings, and the digest of the token issued with each name (see network.sessions), so
+# only whoever registered a name plays rated games under it. Persisted as JSON.
+class RatingTable:
+    def __init__(self, path=None):
+        self.path = Path(path) if path else None
+        self._ratings: Dict[str, float] = {}
+        self._tokens: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        if self.path and self.path.exists():
+            saved = json.loads(self.path.read_text())
+            # Files written before names had tokens hold just the ratings
+            if set(saved) == {"ratings", "tokens"}:
+                self._ratings, self._tokens = saved["ratings"], saved["tokens"]
+            else:
+                self._ratings = saved
+
+    def get(self, player_id: str) -> float:
+        return self._ratings.get(player_id, DEFAULT_RATING)
+
+    # Whether `token` is the one issued for player_id
+    def verify(self, player_id: str, token) -> bool:
+        return token_matches(self._tokens.get(player_id, ""), token)
+
+    # Issue the token for a name nobody has registered yet; None when the name is taken
+    def register(self, player_id: str) -> Optional[str]:
+        with self._lock:
+            if player_id in self._tokens:
+                return None
+            token = new_token()
+            self._tokens[player_id] = token_digest(token)
+            self._save()
+        return token
+
+    # Apply a game_end result; returns the new (winner, loser) ratings
+    def record_result(self, winner_id: str, loser_id: str) -> Tuple[float, float]:
+        with self._lock:
+            rw, rl = self.get(winner_id), self.get(loser_id)
+            expected = 1.0 / (1.0 + 10 ** ((rl - rw) / 400.0))
+            delta = ELO_K * (1.0 - expected)
+            self._ratings[winner_id] = rw + delta
+            self._ratings[loser_id] = rl - delta
+            self._save()
+            return self._ratings[winner_id], self._ratings[loser_id]
+
+    # Write the table out; called with the lock held
+    def _save(self):
+        if self.path:
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps({"ratings": self._ratings, "tokens": self._tokens}))
+            tmp.replace(self.path)
+
+# Thread-safe front end: queue players, widen windows in the background, hand pairs to a runner.
+# The background thread also watches queued players' sockets and withdraws anyone who leaves.
+class MatchmakingService:
+    def __init__(self, ratings: RatingTable, on_match: Callable[[Ticket, Ticket], None],
+                 queue: Optional[MatchmakingQueue] = None, tick_interval: float = 0.5):
+        self.ratings = ratings
+        self.on_match = on_match
+        self.queue = queue or MatchmakingQueue()
+        self.tick_interval = tick_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._selector = selectors.DefaultSelector()
+        self._thread = threading.Thread(target=self._tick_loop, name="matchmaker", daemon=True)
+        self._thread.start()
+
+    def submit(self, player_id: str, conn, deck_choice: dict, rated: bool = True) -> Ticket:
+        rating = self.ratings.get(player_id) if rated else DEFAULT_RATING
+        ticket = Ticket(player_id, conn, rating, deck_choice, time.monotonic(), rated)
+        with self._lock:
+            pair = self.queue.enqueue(ticket)
+            waiting = len(self.queue)
+            if pair:
+                self._unwatch(pair[0])
+            else:
+                self._watch(ticket)
+        if pair:
+            self._dispatch(pair)
+        else:
+            self.logger.debug("%s queued at %.0f (%d waiting)", player_id, ticket.rating, waiting)
+        return ticket
+
+    def cancel(self, ticket: Ticket):
+        with self._lock:
+            self.queue.cancel(ticket)
+            self._unwatch(ticket)
+
+    # Called with the lock held
+    def _watch(self, ticket: Ticket):
+        if ticket.conn is not None:
+            self._selector.register(ticket.conn, selectors.EVENT_READ, ticket)
+
+    def _unwatch(self, ticket: Ticket):
+        try:
+            self._selector.unregister(ticket.conn)
+        except (KeyError, ValueError):
+            pass
+
+    def _tick_loop(self):
+        next_tick = time.monotonic() + self.tick_interval
+        while not self._stop.is_set():
+            for key, _ in self._selector.select(max(0.0, next_tick - time.monotonic())):
+                self._check_queued(key.data)
+            if time.monotonic() < next_tick:
+                continue
+            next_tick = time.monotonic() + self.tick_interval
+            with self._lock:
+                pairs = self.queue.tick()
+                for first, second in pairs:
+                    self._unwatch(first)
+                    self._unwatch(second)
+            for pair in pairs:
+                self._dispatch(pair)
+
+    # A queued player has nothing to send until their match starts, so a readable socket means
+    # they have gone or broken the protocol; either way they leave the queue. Watching a socket
+    # that still holds unread data would wake the loop on every pass.
+    def _check_queued(self, ticket: Ticket):
+        try:
+            gone = not ticket.conn.recv(1, socket.MSG_PEEK)
+        except OSError:
+            gone = True
+        with self._lock:
+            # Paired since the socket became readable: it belongs to the match now
+            if not ticket.active:
+                return
+            self._unwatch(ticket)
+            self.queue.cancel(ticket)
+        ticket.conn.close()
+        if gone:
+            self.logger.debug("%s left the queue", ticket.player_id)
+        else:
+            self.logger.warning("%s sent data while queued and was dropped", ticket.player_id)
+
+    def _dispatch(self, pair: Tuple[Ticket, Ticket]):
+        first, second = pair
+        self.logger.info("Paired %s (%.0f) with %s (%.0f)",
+                         first.player_id, first.rating, second.player_id, second.rating)
+        self.on_match(first, second)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self._selector.close()
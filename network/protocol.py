@@ -1,8 +1,34 @@
 # External Imports
+import hashlib
 import pickle
+import threading
+import weakref
+import zlib
+from time import perf_counter
+from typing import Optional
+
+# Internal Imports
+from config import COMPRESSION_ENABLED, COMPRESS_MIN_BYTES, COMPRESS_LEVEL, COMPRESS_MAX_RATIO, MAX_MESSAGE_BYTES
+from metrics import (
+    BYTES_SENT, BYTES_RECEIVED, MESSAGES_SENT, SERIALIZE_SECONDS, COMPRESS_SECONDS,
+    COMPRESS_IN_BYTES, COMPRESS_OUT_BYTES, message_kind,
+)
 
 MESSAGE_PREFIX = b"ROR"
 
+# The top two bits of the 4-byte length header flag compressed payloads
+FLAG_COMPRESSED = 0x80000000
+FLAG_STREAM = 0x40000000          # compressed with the connection's streaming context
+LENGTH_MASK = 0x3FFFFFFF
+
+# FLAG_STREAM without FLAG_COMPRESSED marks a control frame, which negotiates the preset
+# dictionary (see CompressionStream) and is never handed to the caller. decode_frame returns
+# this in its place.
+CONTROL_FRAME = object()
+
+# How often a message kind that compresses badly is retried, in case its contents changed
+REPROBE_EVERY = 32
+
 # Convert a Python object to bytes and prepend the protocol prefix.
 def serialize_message(obj) -> bytes:
     data = pickle.dumps(obj)
@@ -14,14 +40,205 @@ def deserialize_message(raw: bytes):
         raise ValueError('Invalid message prefix')
     return pickle.loads(raw[len(MESSAGE_PREFIX):])
 
+# Serialize an object into a complete frame: 4-byte length header plus message.
+def frame_message(obj) -> bytes:
+    msg = serialize_message(obj)
+    return len(msg).to_bytes(4, 'big') + msg
+
+# The preset dictionary streams may switch to, given by the server or client at startup (see
+# resources.loader.compression_dictionary). Both ends must have identical bytes, which different
+# card files or Python versions break, so a connection only uses it once the peer has named the
+# same dictionary_digest(). Without one, streams never switch.
+_preset_dictionary: Optional[bytes] = None
+_preset_digest: Optional[str] = None
+
+def set_preset_dictionary(zdict: Optional[bytes]):
+    global _preset_dictionary, _preset_digest
+    _preset_dictionary = zdict or None
+    _preset_digest = hashlib.blake2b(zdict, digest_size=16).hexdigest() if zdict else None
+
+def preset_dictionary() -> Optional[bytes]:
+    return _preset_dictionary
+
+def dictionary_digest() -> Optional[str]:
+    return _preset_digest
+
+def _control_frame(control: str) -> bytes:
+    msg = serialize_message({"control": control, "dictionary": dictionary_digest()})
+    return (len(msg) | FLAG_STREAM).to_bytes(4, 'big') + msg
+
+# Per-connection zlib contexts; the history carries over between frames on the same socket.
+# Each side's first frame is preceded by a "hello" control frame naming its dictionary digest.
+# Streams start without the preset dictionary; a side that has seen the peer name the same one
+# restarts its compressor with it, sending a "switch" control frame first so the peer restarts
+# its decompressor at the same point. Peers with different dictionaries carry on without.
+class CompressionStream:
+    def __init__(self):
+        self.compressor = zlib.compressobj(COMPRESS_LEVEL)
+        self.decompressor = zlib.decompressobj()
+        self.send_lock = threading.Lock()
+        self.greeted = False
+        self.peer_matches = False
+        self.using_dictionary = False
+
+    # Control frames to send ahead of the next frame; call with send_lock held
+    def negotiate(self) -> bytes:
+        frames = b""
+        if not self.greeted:
+            self.greeted = True
+            frames += _control_frame("hello")
+        if self.peer_matches and not self.using_dictionary:
+            self.using_dictionary = True
+            self.compressor = zlib.compressobj(COMPRESS_LEVEL, zdict=preset_dictionary())
+            frames += _control_frame("switch")
+        return frames
+
+    def on_control(self, control):
+        if not isinstance(control, dict):
+            raise ValueError("Invalid control frame")
+        if control.get("control") == "hello":
+            self.peer_matches = dictionary_digest() is not None and control.get("dictionary") == dictionary_digest()
+        elif control.get("control") == "switch":
+            if dictionary_digest() is None or control.get("dictionary") != dictionary_digest():
+                raise ValueError("Peer switched to a preset dictionary this side doesn't have")
+            self.decompressor = zlib.decompressobj(zdict=preset_dictionary())
+
+_streams = weakref.WeakKeyDictionary()
+_streams_lock = threading.Lock()
+
+def stream_for(conn) -> CompressionStream:
+    with _streams_lock:
+        stream = _streams.get(conn)
+        if stream is None:
+            stream = _streams[conn] = CompressionStream()
+        return stream
+
+# Running compressed/raw ratio per message kind, and how many frames were sent raw since the
+# last try. Updated by every thread that sends.
+_ratios = {}
+_skipped = {}
+_ratios_lock = threading.Lock()
+
+def _worth_compressing(kind: str) -> bool:
+    with _ratios_lock:
+        if _ratios.get(kind, 0.0) <= COMPRESS_MAX_RATIO:
+            return True
+        _skipped[kind] = _skipped.get(kind, 0) + 1
+        if _skipped[kind] >= REPROBE_EVERY:
+            _skipped[kind] = 0
+            return True
+        return False
+
+# Compress a serialized message, one-shot or on a connection's stream; returns (payload, header
+# flags). One-shot frames go to recipients that never negotiated, so they use no dictionary.
+def compress_payload(msg: bytes, kind: str = "other", stream: CompressionStream = None):
+    start = perf_counter()
+    if stream is None:
+        compressor = zlib.compressobj(COMPRESS_LEVEL)
+        body = compressor.compress(msg) + compressor.flush()
+        flags = FLAG_COMPRESSED
+    else:
+        body = stream.compressor.compress(msg) + stream.compressor.flush(zlib.Z_SYNC_FLUSH)
+        flags = FLAG_COMPRESSED | FLAG_STREAM
+    COMPRESS_SECONDS.observe(perf_counter() - start, kind)
+    COMPRESS_IN_BYTES.inc(len(msg), kind)
+    COMPRESS_OUT_BYTES.inc(len(body), kind)
+    ratio = len(body) / len(msg)
+    with _ratios_lock:
+        _ratios[kind] = ratio if kind not in _ratios else 0.8 * _ratios[kind] + 0.2 * ratio
+    return body, flags
+
+# Serialize an object once into a frame, timing the work per message kind. Large frames are
+# compressed: on the given stream when there is one recipient, one-shot when the frame is shared.
+# Frames for a stream come with any control frames it has to send first, and must be sent in
+# the order they were encoded.
+def encode_frame(obj, kind: str = None, stream: CompressionStream = None) -> bytes:
+    kind = kind or message_kind(obj)
+    control = stream.negotiate() if stream is not None else b""
+    start = perf_counter()
+    msg = serialize_message(obj)
+    SERIALIZE_SECONDS.observe(perf_counter() - start, kind)
+    if COMPRESSION_ENABLED and len(msg) >= COMPRESS_MIN_BYTES and _worth_compressing(kind):
+        body, flags = compress_payload(msg, kind, stream)
+        return control + (len(body) | flags).to_bytes(4, 'big') + body
+    return control + len(msg).to_bytes(4, 'big') + msg
+
+# Sockets whose frames go to an outbound buffer rather than straight to the socket, so a
+# reader that stops reading can't block the sender (see network.match_loop.PlayerChannel)
+_outboxes = weakref.WeakKeyDictionary()
+
+# Route conn's frames to outbox.write(frame) from now on; None sends them directly again
+def set_outbox(conn, outbox):
+    if outbox is None:
+        _outboxes.pop(conn, None)
+    else:
+        _outboxes[conn] = outbox
+
+# Send an already-encoded frame; lets one encoding be shared by many recipients.
+def send_frame(conn, frame: bytes, kind: str = "other"):
+    outbox = _outboxes.get(conn)
+    if outbox is not None:
+        outbox.write(frame)
+    else:
+        conn.sendall(frame)
+    BYTES_SENT.inc(len(frame), kind)
+    MESSAGES_SENT.inc(1, kind)
+
 # Serialize an object and send it with a 4-byte length header.
 def send_obj(conn, obj):
-    msg = serialize_message(obj)
-    conn.sendall(len(msg).to_bytes(4, 'big') + msg)
+    kind = message_kind(obj)
+    stream = stream_for(conn)
+    # Stream frames must reach the socket in the order they were compressed
+    with stream.send_lock:
+        send_frame(conn, encode_frame(obj, kind, stream), kind)
+
+# Keep reading until exactly n bytes arrive; large frames span several recv calls.
+def recv_exact(conn, n: int) -> bytes:
+    chunks = []
+    remaining = n
+    while remaining:
+        chunk = conn.recv(remaining)
+        if not chunk:
+            raise ConnectionError('Connection closed mid-message')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
 
-# Read the length header, receive the exact payload, then deserialize it.
+# Read the length header, receive the exact payload, then deserialize it (skipping control frames).
 def recv_obj(conn):
-    length_data = conn.recv(4)
-    length = int.from_bytes(length_data, 'big')
-    raw = conn.recv(length)
-    return deserialize_message(raw)
\ No newline at end of file
+    while True:
+        length_data = recv_exact(conn, 4)
+        header = int.from_bytes(length_data, 'big')
+        raw = recv_exact(conn, check_frame_length(header))
+        BYTES_RECEIVED.inc(len(length_data) + len(raw))
+        obj = decode_frame(header, raw, stream_for(conn))
+        if obj is not CONTROL_FRAME:
+            return obj
+
+# Payload length from a frame header, refusing frames larger than MAX_MESSAGE_BYTES before
+# any of the payload is read
+def check_frame_length(header: int) -> int:
+    length = header & LENGTH_MASK
+    if length > MAX_MESSAGE_BYTES:
+        raise ValueError(f"Frame of {length} bytes is over the {MAX_MESSAGE_BYTES} byte limit")
+    return length
+
+# Decompress at most MAX_MESSAGE_BYTES; input left over means the frame inflates past the limit
+def _inflate(decompressor, raw: bytes) -> bytes:
+    data = decompressor.decompress(raw, MAX_MESSAGE_BYTES)
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Compressed frame inflates past the {MAX_MESSAGE_BYTES} byte limit")
+    return data
+
+# Decompress a frame's payload as its header flags say, then deserialize it; CONTROL_FRAME for
+# a control frame, which is applied to the stream. Shared with readers that don't own a
+# socket, such as the asyncio load-test bots.
+def decode_frame(header: int, raw: bytes, stream: CompressionStream):
+    if header & FLAG_STREAM and not header & FLAG_COMPRESSED:
+        stream.on_control(deserialize_message(raw))
+        return CONTROL_FRAME
+    if header & FLAG_STREAM:
+        raw = _inflate(stream.decompressor, raw)
+    elif header & FLAG_COMPRESSED:
+        raw = _inflate(zlib.decompressobj(), raw)
+    return deserialize_message(raw)
@@ -1,17 +1,91 @@
 # External Imports
+import logging
+import selectors
 import socket
-from typing import Tuple
+import threading
+from typing import Callable
+
+# Internal Imports
+from network.protocol import send_obj, recv_obj
 
 # Function to bring the server side up in server.py
-def start_server(host: str, port: int) -> socket.socket:
+def start_server(host: str, port: int, backlog: int = 2, reuse_port: bool = False) -> socket.socket:
     srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
     srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    # Lets several worker processes bind the same port; the kernel spreads connections across them
+    if reuse_port:
+        srv.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
     srv.bind((host, port))
-    srv.listen(2)
+    srv.listen(backlog)
     return srv
 
-# Function that allows clients to connect to the server
-def accept_clients(srv: socket.socket) -> Tuple[socket.socket, socket.socket]:
-    conn1, _ = srv.accept()
-    conn2, _ = srv.accept()
-    return conn1, conn2
\ No newline at end of file
+# Accept one player connection. A turn is several small frames written back to back, which
+# Nagle's algorithm would hold until the client's delayed ACK (~40ms per turn).
+def accept_player(srv: socket.socket):
+    conn, addr = srv.accept()
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return conn, addr
+
+# Longest an accept loop waits for a connection before passing again
+ACCEPT_POLL_SECONDS = 0.25
+
+# Accepts connections on a background thread, handing each to on_accept(conn, addr) on a thread
+# of its own. The listener is polled, so `passes` keeps counting while nobody connects (see
+# network.supervisor.watch_progress).
+class Acceptor:
+    def __init__(self, srv: socket.socket, on_accept: Callable, name: str = "accept"):
+        self.srv = srv
+        self.on_accept = on_accept
+        self.passes = 0
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def start(self) -> "Acceptor":
+        self.thread.start()
+        return self
+
+    def _run(self):
+        self.srv.setblocking(False)
+        with selectors.DefaultSelector() as selector:
+            selector.register(self.srv, selectors.EVENT_READ)
+            while True:
+                self.passes += 1
+                try:
+                    if not selector.select(ACCEPT_POLL_SECONDS):
+                        continue
+                    conn, addr = accept_player(self.srv)
+                except BlockingIOError:
+                    # Another worker sharing the listener took the connection
+                    continue
+                except (OSError, ValueError):
+                    break
+                conn.setblocking(True)
+                threading.Thread(target=self.on_accept, args=(conn, addr), daemon=True).start()
+
+# Accept spectator connections forever. Each is sent the matches in progress, oldest first, as
+# {"type": "matches", "matches": [{"match_id": ..., "spectators": n}, ...]}, and answers with
+# {"watch": match_id}, or {"watch": None} for the latest, before it is attached to that match.
+def serve_spectators(srv: socket.socket, matches, choice_timeout: float = 10.0) -> threading.Thread:
+    logger = logging.getLogger("Spectators")
+
+    def greet(conn, addr):
+        try:
+            conn.settimeout(choice_timeout)
+            send_obj(conn, {"type": "matches", "matches": matches.listing()})
+            reply = recv_obj(conn)
+            conn.settimeout(None)
+        except (OSError, EOFError, ValueError):
+            conn.close()
+            return
+        match_id = reply.get("watch") if isinstance(reply, dict) else None
+        broadcaster = matches.get(match_id) if match_id else matches.latest()
+        if broadcaster is None or not broadcaster.add_spectator(conn):
+            try:
+                send_obj(conn, {"type": "watch_refused", "match_id": match_id, "reason": "no such match in progress"})
+            except OSError:
+                pass
+            conn.close()
+            return
+        logger.info("Spectator %s joined match %s (%d watching)", addr, match_id or "latest",
+                    broadcaster.spectator_count())
+
+    return Acceptor(srv, greet, "spectator-accept").start().thread
@@ -0,0 +1,82 @@
+# External Imports
+import hashlib
+import hmac
+import logging
+import secrets
+import threading
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+# Internal Imports
+from game.views import PLAYER_LABELS
+
+# A fresh secret to hand to a client
+def new_token() -> str:
+    return secrets.token_urlsafe(24)
+
+# What the server keeps of a token: enough to check one, not to present it
+def token_digest(token: str) -> str:
+    return hashlib.blake2b(token.encode(), digest_size=32).hexdigest()
+
+def token_matches(digest: str, token) -> bool:
+    return bool(digest) and isinstance(token, str) and hmac.compare_digest(digest, token_digest(token))
+
+# Matches interrupted by a restart, waiting for their players to come back. Each player proves
+# their seat with the token the server gave them when the match started, and is held until
+# the other seat is claimed too; on_ready(saved, conn1, conn2) then gets the pair in seat order.
+# Under several workers, locate(match_id) names the port of the worker a match this table isn't
+# waiting for belongs to (None when it is nobody else's), so its players can be sent there.
+class ReconnectTable:
+    def __init__(self, on_ready: Callable, locate: Optional[Callable] = None):
+        self.on_ready = on_ready
+        self.locate = locate
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._pending: Dict[str, Tuple[object, Dict[str, object]]] = {}
+        self._lock = threading.Lock()
+
+    # Wait for the players of these saved matches (game.persistence.SavedMatch)
+    def expect(self, saved_matches: Iterable):
+        with self._lock:
+            for saved in saved_matches:
+                self._pending[saved.match_id] = (saved, {})
+
+    def waiting(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # Port of the worker to send a player rejoining this match to, or None to claim it here
+    def redirect(self, match_id) -> Optional[int]:
+        if self.locate is None:
+            return None
+        with self._lock:
+            if match_id in self._pending:
+                return None
+        return self.locate(match_id)
+
+    # Seat a player from their {"resume": match_id, "player": label, "token": token} request.
+    # Returns why the claim was refused, or None when the connection now belongs to the match.
+    def claim(self, conn, request: dict) -> Optional[str]:
+        match_id, player = request.get("resume"), request.get("player")
+        ready = replaced = None
+        with self._lock:
+            entry = self._pending.get(match_id)
+            if entry is None:
+                return "no interrupted match with that ID"
+            saved, seats = entry
+            if player not in PLAYER_LABELS:
+                return "unknown seat"
+            if not saved.seats or not token_matches(saved.seats[PLAYER_LABELS.index(player)], request.get("token")):
+                return "wrong token for that seat"
+            # A player who reconnects again while waiting replaces their earlier connection
+            replaced = seats.get(player)
+            seats[player] = conn
+            if len(seats) == len(PLAYER_LABELS):
+                del self._pending[match_id]
+                ready = saved, seats
+        if replaced is not None:
+            replaced.close()
+        if ready is None:
+            self.logger.info("%s is back for match %s, waiting for their opponent", player, match_id)
+            return None
+        saved, seats = ready
+        self.on_ready(saved, *(seats[label] for label in PLAYER_LABELS))
+        return None
@@ -0,0 +1,147 @@
+# External Imports
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+# Internal Imports
+from network.server_core import start_server
+
+HAS_REUSEPORT = hasattr(socket, "SO_REUSEPORT")
+
+# Pass counters of a worker's long-running loops, by name. The heartbeat only beats while every
+# one of them has moved on since the last beat, so a worker whose match loop or accept loop hangs
+# is restarted even though its heartbeat thread still runs. Each loop must pass at least once a
+# second, idle or not.
+_progress: Dict[str, Callable[[], int]] = {}
+
+def watch_progress(name: str, passes: Callable[[], int]):
+    _progress[name] = passes
+
+# Whether every watched loop has passed since `last`, which is updated to the current counts
+def _progressing(last: Dict[str, int]) -> bool:
+    current = {name: passes() for name, passes in list(_progress.items())}
+    moving = all(count != last.get(name) for name, count in current.items())
+    last.clear()
+    last.update(current)
+    return moving
+
+# Runs inside each worker: report liveness, bind (or inherit) the listener, then serve matches
+def _worker_entry(target: Callable, worker_id: int, heartbeat, host: str, port: int,
+                  backlog: int, listener: Optional[socket.socket]):
+    # The supervisor owns shutdown; workers exit when it terminates them
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Forked workers inherit the supervisor's SIGTERM handler, which would swallow terminate()
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+
+    parent = os.getppid()
+
+    # Heartbeat for the supervisor while the worker's loops make progress; also exit if the
+    # supervisor itself has gone away
+    def beat():
+        last = {}
+        while os.getppid() == parent:
+            if _progressing(last):
+                heartbeat.value = time.time()
+            time.sleep(1.0)
+        os._exit(1)
+
+    threading.Thread(target=beat, name="heartbeat", daemon=True).start()
+    sock = listener or start_server(host, port, backlog=backlog, reuse_port=True)
+    target(sock, worker_id)
+
+# Pre-forks worker processes that share one listen port, restarting any that die or stall
+class Supervisor:
+    def __init__(self, target: Callable, workers: int, host: str, port: int, backlog: int = 128,
+                 heartbeat_timeout: float = 10.0, check_interval: float = 1.0):
+        self.target = target
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.backlog = backlog
+        self.heartbeat_timeout = heartbeat_timeout
+        self.check_interval = check_interval
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self._procs: Dict[int, multiprocessing.Process] = {}
+        self._beats: Dict[int, object] = {}
+        self._restarts: Dict[int, int] = {}
+        self._started: Dict[int, float] = {}
+        self._next_start: Dict[int, float] = {}
+        # Plain flag: setting an Event from a signal handler can deadlock against Event.wait
+        self._stopping = False
+        # Without SO_REUSEPORT every worker accepts from one listener created here. It is
+        # non-blocking, so a worker that loses the race for a connection doesn't wait in accept().
+        self._listener = None if HAS_REUSEPORT else start_server(host, port, backlog=backlog)
+        if self._listener is not None:
+            self._listener.setblocking(False)
+
+    def _spawn(self, worker_id: int):
+        heartbeat = multiprocessing.Value("d", time.time(), lock=False)
+        proc = multiprocessing.Process(
+            target=_worker_entry,
+            args=(self.target, worker_id, heartbeat, self.host, self.port, self.backlog, self._listener),
+            name=f"ror-worker-{worker_id}",
+            daemon=False,
+        )
+        proc.start()
+        self._procs[worker_id] = proc
+        self._beats[worker_id] = heartbeat
+        self._started[worker_id] = time.time()
+        self.logger.info("Worker %d started (pid %d)", worker_id, proc.pid)
+
+    # Dead or silent workers are replaced, backing off if one keeps failing
+    def _check(self):
+        now = time.time()
+        for worker_id, proc in list(self._procs.items()):
+            stale = now - self._beats[worker_id].value > self.heartbeat_timeout
+            if proc.is_alive() and not stale:
+                continue
+            if proc.is_alive():
+                self.logger.warning("Worker %d missed heartbeats, terminating", worker_id)
+                proc.terminate()
+                proc.join(5.0)
+            else:
+                self.logger.warning("Worker %d exited with code %s", worker_id, proc.exitcode)
+            del self._procs[worker_id]
+            # A worker that ran for a while before failing starts its backoff afresh
+            recent = now - self._started[worker_id] < 60.0
+            failures = self._restarts.get(worker_id, 0) + 1 if recent else 1
+            self._restarts[worker_id] = failures
+            self._next_start[worker_id] = now + min(30.0, 2.0 ** (failures - 1) - 1)
+        for worker_id, when in list(self._next_start.items()):
+            if when <= now:
+                del self._next_start[worker_id]
+                self._spawn(worker_id)
+
+    def run(self):
+        mode = "SO_REUSEPORT" if HAS_REUSEPORT else "shared listener"
+        self.logger.info("Supervising %d workers on %s:%d (%s)", self.workers, self.host, self.port, mode)
+        signal.signal(signal.SIGTERM, self._request_stop)
+        for worker_id in range(self.workers):
+            self._spawn(worker_id)
+        try:
+            while not self._stopping:
+                time.sleep(self.check_interval)
+                if not self._stopping:
+                    self._check()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def _request_stop(self, *_):
+        self._stopping = True
+
+    def stop(self):
+        self._stopping = True
+        for proc in self._procs.values():
+            proc.terminate()
+        for proc in self._procs.values():
+            proc.join(5.0)
+        self._procs.clear()
+        if self._listener is not None:
+            self._listener.close()
@@ -0,0 +1,225 @@
+# External Imports
+import cProfile
+import logging
+import os
+import signal
+import sys
+import tempfile
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable
+
+# Internal Imports
+from config import PROFILE_DIR, PROFILE_ENV, PROFILE_MODE, PROFILE_SAMPLE_INTERVAL, PROFILE_REQUEST_FILE
+
+# Profile every match instead of named ones
+ALL_MATCHES = "*"
+
+# "function (file:line)" for one frame of a collapsed stack
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+
+# Samples a thread's stack every `interval` seconds into `stacks` (collapsed stack -> count) while
+# resumed. One sampler lives as long as its match is profiled: the match resumes it on whichever
+# thread runs the match and pauses it when the match waits, so other matches on the same thread
+# aren't counted. Only stacks running through a `root_code` frame called from `stop_frame` are
+# kept, starting at that frame, so neither the server's own loops nor the profiler show up.
+# A sampling thread needs the GIL, so while the profiled thread is busy in Python samples come
+# about once per sys.getswitchinterval() (5ms by default) whatever `interval` is.
+class StackSampler:
+    def __init__(self, stacks: Counter, interval: float = PROFILE_SAMPLE_INTERVAL):
+        self.stacks = stacks
+        self.interval = interval
+        # (thread_id, stop_frame, root_code) while resumed, replaced as a whole so it reads consistently
+        self._target = None
+        self._resumed = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def resume(self, thread_id: int, stop_frame, root_code):
+        self._target = (thread_id, stop_frame, root_code)
+        self._resumed.set()
+
+    def pause(self):
+        self._target = None
+        self._resumed.clear()
+
+    def stop(self):
+        self._stop.set()
+        self._resumed.set()
+        self._thread.join()
+
+    def _run(self):
+        labels: Dict[object, str] = {}
+        while True:
+            self._resumed.wait()
+            if self._stop.wait(self.interval):
+                return
+            target = self._target
+            if target is None:
+                continue
+            thread_id, stop_frame, root_code = target
+            frame = sys._current_frames().get(thread_id)
+            names = []
+            while frame is not None and frame.f_back is not stop_frame:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                names.append(label)
+                frame = frame.f_back
+            if frame is not None and frame.f_code is root_code:
+                names.append(_frame_label(root_code))
+                self.stacks[";".join(reversed(names))] += 1
+
+# Which matches to profile, and their profiles so far. Matches can be switched on while the
+# server runs; a profiled match's output file in PROFILE_DIR is written when profiling it is
+# switched off or the match ends (finish()), never while it plays:
+# <match>.folded (collapsed stacks, for flamegraph.pl/speedscope/inferno) in "sample" mode,
+# <match>.prof (pstats) in "cprofile" mode.
+class MatchProfiler:
+    def __init__(self, directory=PROFILE_DIR, mode: str = PROFILE_MODE, interval: float = PROFILE_SAMPLE_INTERVAL):
+        if mode not in ("sample", "cprofile"):
+            raise ValueError(f"Unknown profile mode {mode!r}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.interval = interval
+        # Replaced, never mutated, so phases can read it without a lock
+        self.matches = frozenset()
+        self._samplers: Dict[str, StackSampler] = {}
+        self._profiles: Dict[str, cProfile.Profile] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def enable(self, match_id: str):
+        with self._lock:
+            self.matches = self.matches | {match_id}
+        self.logger.info("Profiling enabled for match %s", match_id)
+
+    # Stop profiling a match, writing what was collected
+    def disable(self, match_id: str):
+        with self._lock:
+            self.matches = self.matches - {match_id}
+        self.finish(match_id)
+        self.logger.info("Profiling disabled for match %s", match_id)
+
+    def set_matches(self, match_ids: Iterable[str]):
+        self.matches = frozenset(match_id for match_id in match_ids if match_id)
+        if self.matches:
+            self.logger.info("Profiling matches: %s", ", ".join(sorted(self.matches)))
+
+    def is_profiled(self, match_id: str) -> bool:
+        matches = self.matches
+        return match_id in matches or ALL_MATCHES in matches
+
+    # Match IDs from the environment, comma separated ("*" for all)
+    def load_env(self, environ=os.environ):
+        value = environ.get(PROFILE_ENV, "")
+        if value:
+            self.set_matches(part.strip() for part in value.split(","))
+
+    # Match IDs from a file, one per line, replacing the current set
+    def load_request_file(self, path=PROFILE_REQUEST_FILE):
+        try:
+            lines = Path(path).read_text().split()
+        except OSError:
+            lines = []
+        self.set_matches(lines)
+
+    # `kill -USR1 <pid>` re-reads the request file. Main thread only; a no-op where SIGUSR1 doesn't exist.
+    def install_signal_handler(self, path=PROFILE_REQUEST_FILE):
+        if not hasattr(signal, "SIGUSR1"):
+            return
+        # No locks in the handler: it interrupts the main thread, which may already hold one
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self.load_request_file(path))
+
+    # Profile the block for `match_id`, accumulating into that match's profile. Sampling keeps
+    # stacks of `root_code` called from `stop_frame` (see StackSampler).
+    @contextmanager
+    def profile(self, match_id: str, stop_frame=None, root_code=None):
+        if self.mode == "cprofile":
+            with self._lock:
+                profile = self._profiles.setdefault(match_id, cProfile.Profile())
+            try:
+                profile.enable()
+            except ValueError:
+                # Only one cProfile can run at a time on some Pythons; skip rather than fail the turn
+                self.logger.warning("Another profiler is active, not profiling this turn of %s", match_id)
+                yield
+                return
+            try:
+                yield
+            finally:
+                profile.disable()
+            return
+
+        with self._lock:
+            sampler = self._samplers.get(match_id)
+            if sampler is None:
+                sampler = self._samplers[match_id] = StackSampler(Counter(), self.interval)
+                sampler.start()
+        sampler.resume(threading.get_ident(), stop_frame, root_code)
+        try:
+            yield
+        finally:
+            sampler.pause()
+
+    # A profile that can't be written is logged, never allowed to fail the match
+    def _write(self, match_id: str, sampler=None, profile=None):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            if profile is not None:
+                profile.dump_stats(self.directory / f"{match_id}.prof")
+            stacks = sampler.stacks if sampler is not None else None
+            if not stacks:
+                return
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".profile-")
+            with os.fdopen(fd, "w") as f:
+                for stack, count in list(stacks.items()):
+                    f.write(f"{stack} {count}\n")
+            os.replace(tmp, self.directory / f"{match_id}.folded")
+        except OSError:
+            self.logger.exception("Could not write the profile of match %s", match_id)
+
+    # Write a match's profile and drop it, once the match has ended or is no longer profiled
+    def finish(self, match_id: str):
+        with self._lock:
+            sampler = self._samplers.pop(match_id, None)
+            profile = self._profiles.pop(match_id, None)
+            if match_id in self.matches:
+                self.matches = self.matches - {match_id}
+        if sampler is not None:
+            sampler.stop()
+        if sampler is not None or profile is not None:
+            self._write(match_id, sampler, profile)
+
+    # Admin endpoints for metrics.start_metrics_server: /profile/start?match=ID, /profile/stop?match=ID
+    def admin_routes(self):
+        def start(params):
+            self.enable(params["match"])
+            return f"profiling {params['match']}\n"
+
+        def stop(params):
+            self.disable(params["match"])
+            return f"stopped profiling {params['match']}, output in {self.directory}\n"
+
+        def status(params):
+            return "".join(f"{match_id}\n" for match_id in sorted(self.matches))
+
+        return {"/profile/start": start, "/profile/stop": stop, "/profile": status}
+
+PROFILER = MatchProfiler()
+
+# Call func(*args), profiling the call when `match_id` is switched on. For every other match
+# the cost is one empty-set check.
+def profiled_call(match_id, func, *args):
+    matches = PROFILER.matches
+    if not matches or not PROFILER.is_profiled(match_id):
+        return func(*args)
+    with PROFILER.profile(match_id, sys._getframe(), func.__code__):
+        return func(*args)
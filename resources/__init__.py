@@ -8,6 +8,8 @@ from models import (
     SpellCard,
     RelicCard,
     GlyphCard,
+    UnitInstance,
+    GateInstance,
 )
 
 from .loader import (
@@ -20,4 +22,8 @@ from .loader import (
     load_relics,
     load_glyphs,
     load_all_cards,
+    load_decks,
+    card_pool,
+    current_cards,
+    CARDS,
 )
\ No newline at end of file
@@ -0,0 +1,276 @@
+# External Imports
+import atexit
+import hashlib
+import logging
+import os
+from functools import cached_property
+from multiprocessing import parent_process, resource_tracker, shared_memory
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Internal Imports
+from config import CARD_TABLE_ENV
+from game.board import terrain_codes
+from game.triggers import EVENTS, ON_ENTER, ON_EXIT, CompiledRules, TriggerContext
+from resources.loader import CARDS, current_cards
+from resources.registry import CardSet
+
+logger = logging.getLogger("CardTable")
+
+# Pool keys in the order of the `kind` column
+CARD_KINDS = tuple(CARDS.sources)
+
+# Kinds of card that are placed on the board as tiles
+TILE_KINDS = ("ruins", "gates")
+
+# Printed numbers copied straight from the cards; 0 where a card type has no such field
+STAT_FIELDS = (
+    "cost", "health", "attack", "defense", "speed", "movement", "leadership", "adv_hand",
+    "limit", "occupancy", "exp_hand", "starting_echoes", "gate_defense", "gate_health",
+)
+
+# One row per card in pool order (every set in CARD_KINDS order, each in file order)
+CARD_DTYPE = np.dtype(
+    [("id", np.int16),          # index into CardTable.names, the sorted distinct card names
+     ("kind", np.uint8)]        # CARD_KINDS
+    + [(name, np.int16) for name in STAT_FIELDS]
+    + [("terrain", np.uint8),     # game.board terrain code, 0 for cards that are not tiles
+       ("elements", np.uint64),   # bit i set for CardTable.elements[i]
+       ("keywords", np.uint64),   # bit i set for CardTable.keywords[i]
+       # Of a Ruin's abilities only these are kept; the effects run from the compiled rules
+       ("events", np.uint8),      # bit i set when the compiled rules subscribe to game.triggers.EVENTS[i]
+       ("enter_cost", np.int8),   # Movement a unit without terraincraft needs to enter / leave the
+       ("exit_cost", np.int8)]    # tile, 0 when free and for cards that are not tiles
+)
+
+# Fixed header at the start of a shared table: counts of each string list and the data digest
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"), ("layout", np.uint32), ("rows", np.uint32), ("width", np.uint32),
+    ("names", np.uint32), ("elements", np.uint32), ("keywords", np.uint32), ("terrains", np.uint32),
+    ("digest", "S16"),
+])
+MAGIC = b"RORC"
+# Bump whenever CARD_DTYPE or the layout below changes
+LAYOUT = 1
+
+# Blocks this process shared, which its resource tracker must keep tracking
+_shared_here = set()
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+# Identifies the card files a table was built from, so a process only attaches to a table of the
+# data it loaded itself
+def card_digest(cards: CardSet) -> bytes:
+    return hashlib.blake2b(repr(sorted(cards.stamps.items())).encode(), digest_size=16).digest()
+
+def _bits(values: Iterable[str], vocabulary: Dict[str, int]) -> int:
+    mask = 0
+    for value in values or ():
+        mask |= 1 << vocabulary[value]
+    return mask
+
+# Movement a unit without terraincraft needs for `event` on this tile (see game.triggers.movement_cost)
+def _base_cost(card, rules, event: str) -> int:
+    ctx = TriggerContext(None, "", None, None)
+    rules.apply_costs(event, card, ctx)
+    return 0 if ctx.free else ctx.cost
+
+# The numeric side of one card data version as fixed-layout arrays: a CARD_DTYPE record per
+# card, plus the string lists its ids and bitmasks index. Built from a CardSet, or attached
+# zero-copy to one another process published in shared memory.
+class CardTable:
+    STRING_LISTS = ("names", "elements", "keywords", "terrains")
+
+    def __init__(self, cards: np.ndarray, digest: bytes, shm: Optional[shared_memory.SharedMemory] = None):
+        self.cards = cards
+        self.digest = digest
+        self.shm = shm
+        # An attached table's string lists as stored (a bytes array and the length of each list),
+        # decoded on first use so workers that only read the numbers never build them
+        self._strings: Optional[Tuple[np.ndarray, Tuple[int, ...]]] = None
+        self._owner_pid: Optional[int] = None
+
+    @classmethod
+    def from_lists(cls, cards: np.ndarray, lists: Sequence[Sequence[str]], digest: bytes,
+                   shm: Optional[shared_memory.SharedMemory] = None) -> "CardTable":
+        table = cls(cards, digest, shm)
+        for field, values in zip(cls.STRING_LISTS, lists):
+            setattr(table, field, tuple(values))
+        return table
+
+    def _decode(self, field: str) -> Tuple[str, ...]:
+        raw, counts = self._strings
+        index = self.STRING_LISTS.index(field)
+        start = sum(counts[:index])
+        return tuple(s.decode() for s in raw[start:start + counts[index]])
+
+    # Sorted distinct card names; a card's `id` indexes this
+    @cached_property
+    def names(self) -> Tuple[str, ...]:
+        return self._decode("names")
+
+    @cached_property
+    def elements(self) -> Tuple[str, ...]:
+        return self._decode("elements")
+
+    @cached_property
+    def keywords(self) -> Tuple[str, ...]:
+        return self._decode("keywords")
+
+    # Terrains by name, sorted as game.board numbers them
+    @cached_property
+    def terrains(self) -> Tuple[str, ...]:
+        return self._decode("terrains")
+
+    # Card name -> id
+    @cached_property
+    def ids(self) -> Dict[str, int]:
+        return {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def build(cls, cards: Optional[CardSet] = None) -> "CardTable":
+        cards = cards or current_cards()
+        pool = cards.pool
+        names = sorted({card.name for kind in CARD_KINDS for card in pool[kind]})
+        elements = sorted({e for kind in CARD_KINDS for card in pool[kind] for e in getattr(card, "elements", ())})
+        keywords = sorted({k for kind in CARD_KINDS for card in pool[kind] for k in getattr(card, "keywords", ())})
+        terrains = sorted({card.terrain for kind in TILE_KINDS for card in pool[kind]})
+        for label, vocabulary in (("elements", elements), ("keywords", keywords)):
+            if len(vocabulary) > 64:
+                raise ValueError(f"{len(vocabulary)} distinct {label} don't fit a 64-bit mask")
+        ids = {name: i for i, name in enumerate(names)}
+        element_bits = {name: i for i, name in enumerate(elements)}
+        keyword_bits = {name: i for i, name in enumerate(keywords)}
+        codes = terrain_codes()
+
+        rows = []
+        for kind_index, kind in enumerate(CARD_KINDS):
+            tile = kind in TILE_KINDS
+            for card in pool[kind]:
+                rules = card.rules if isinstance(card.rules, CompiledRules) else None
+                events = rules.events if rules is not None else ()
+                rows.append((ids[card.name], kind_index)
+                            + tuple(int(getattr(card, name, 0) or 0) for name in STAT_FIELDS)
+                            + (codes.get(card.terrain, 0) if tile else 0,
+                               _bits(getattr(card, "elements", ()), element_bits),
+                               _bits(getattr(card, "keywords", ()), keyword_bits),
+                               sum(1 << i for i, event in enumerate(EVENTS) if event in events),
+                               (_base_cost(card, rules, ON_ENTER) if rules is not None else 1) if tile else 0,
+                               (_base_cost(card, rules, ON_EXIT) if rules is not None else 1) if tile else 0))
+        return cls.from_lists(np.array(rows, dtype=CARD_DTYPE), (names, elements, keywords, terrains), card_digest(cards))
+
+    # Copy the table into a new shared memory block and return the copy, which owns the block
+    # and removes it when closed by this process or when it exits
+    def share(self) -> "CardTable":
+        strings = self.names + self.elements + self.keywords + self.terrains
+        encoded = [s.encode() for s in strings]
+        width = max(1, max((len(s) for s in encoded), default=1))
+        rows_at = _align(HEADER_DTYPE.itemsize)
+        strings_at = _align(rows_at + self.cards.nbytes)
+        size = strings_at + width * len(encoded)
+        shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        header[()] = (MAGIC, LAYOUT, len(self.cards), width, len(self.names), len(self.elements),
+                      len(self.keywords), len(self.terrains), self.digest)
+        cards = np.ndarray(self.cards.shape, CARD_DTYPE, buffer=shm.buf, offset=rows_at)
+        cards[:] = self.cards
+        np.ndarray((len(encoded),), f"S{width}", buffer=shm.buf, offset=strings_at)[:] = encoded
+        shared = CardTable.from_lists(cards, (self.names, self.elements, self.keywords, self.terrains), self.digest, shm)
+        shared._owner_pid = os.getpid()
+        _shared_here.add(shm.name)
+        atexit.register(shared.close)
+        return shared
+
+    # A table backed by the shared memory block `name`, without copying its rows
+    @classmethod
+    def attach(cls, name: str) -> "CardTable":
+        shm = shared_memory.SharedMemory(name=name)
+        # The publishing process and its children share one resource tracker. Any other process
+        # would have its own tracker remove the block when it exits, so it stops tracking it.
+        if parent_process() is None and shm.name not in _shared_here:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        if header["magic"] != MAGIC or int(header["layout"]) != LAYOUT:
+            shm.close()
+            raise ValueError(f"Shared memory {name} does not hold a layout {LAYOUT} card table")
+        rows, width = int(header["rows"]), int(header["width"])
+        rows_at = _align(HEADER_DTYPE.itemsize)
+        strings_at = _align(rows_at + rows * CARD_DTYPE.itemsize)
+        counts = tuple(int(header[field]) for field in cls.STRING_LISTS)
+        cards = np.ndarray((rows,), CARD_DTYPE, buffer=shm.buf, offset=rows_at)
+        cards.flags.writeable = False
+        table = cls(cards, bytes(header["digest"]), shm)
+        table._strings = (np.ndarray((sum(counts),), f"S{width}", buffer=shm.buf, offset=strings_at), counts)
+        return table
+
+    @property
+    def name(self) -> Optional[str]:
+        return self.shm.name if self.shm is not None else None
+
+    # Rows of one kind of card, e.g. "ruins"
+    def kind(self, kind: str) -> np.ndarray:
+        return self.cards[self.cards["kind"] == CARD_KINDS.index(kind)]
+
+    def element_mask(self, elements: Iterable[str]) -> int:
+        return _bits(elements, {name: i for i, name in enumerate(self.elements)})
+
+    def keyword_mask(self, keywords: Iterable[str]) -> int:
+        return _bits(keywords, {name: i for i, name in enumerate(self.keywords)})
+
+    # Unmap the shared block; the process that shared it also removes it
+    def close(self):
+        if self.shm is None:
+            return
+        shm, self.shm = self.shm, None
+        self.cards = self.cards.copy()
+        if self._strings is not None:
+            self._strings = (self._strings[0].copy(), self._strings[1])
+        try:
+            shm.close()
+        except BufferError:
+            # Views of the rows are still in use; the mapping goes when the process does
+            pass
+        if self._owner_pid == os.getpid():
+            shm.unlink()
+
+# The table for the current card data. A process started with $ROR_CARD_TABLE attaches to the
+# table published there when it was built from the same card files, and builds its own otherwise
+# (including after a reload). Kept until the card data changes.
+_current: Tuple[Optional[CardSet], Optional[CardTable]] = (None, None)
+
+def card_table() -> CardTable:
+    global _current
+    cards = current_cards()
+    cached_cards, table = _current
+    if cached_cards is cards:
+        return table
+    table = None
+    name = os.environ.get(CARD_TABLE_ENV)
+    if name and cached_cards is None:
+        try:
+            table = CardTable.attach(name)
+        except (OSError, ValueError):
+            logger.warning("Could not attach to card table %s, building one", name, exc_info=True)
+        else:
+            if table.digest != card_digest(cards):
+                logger.info("Card table %s is of other card files, building one", name)
+                table.close()
+                table = None
+    if table is None:
+        table = CardTable.build(cards)
+    _current = (cards, table)
+    return table
+
+# Build the table for the current card data in shared memory and name it in $ROR_CARD_TABLE,
+# so worker processes started from here attach to it instead of building their own
+def publish_card_table() -> CardTable:
+    global _current
+    cards = current_cards()
+    table = CardTable.build(cards).share()
+    os.environ[CARD_TABLE_ENV] = table.name
+    _current = (cards, table)
+    logger.info("Published %d cards in shared memory %s (%d bytes)", len(table.cards), table.name, table.shm.size)
+    return table
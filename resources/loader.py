@@ -1,10 +1,15 @@
 # External Imports
+import io
 import json
+import pickle
+from dataclasses import replace
 from pathlib import Path
-from typing import Any, Dict, List, Type, TypeVar
+from typing import Any, Dict, List, Mapping, Tuple, Type, TypeVar
 
 # Internal Imports
 from config import DATA_DIR
+from game.triggers import compile_ruin_rules
+from resources.registry import CardRegistry, CardSet
 
 # Pull classes from models.py
 from models import (
@@ -44,6 +49,10 @@ def _load_cards(filename: str, model: Type[T], key: str = "cards") -> List[T]:
         data.pop("card_type", None)
         # Insert into kwargs for dataclass
         data["rules_text"] = rules_text
+        # Prototypes are frozen, so their collections are tuples
+        for name, value in data.items():
+            if isinstance(value, list):
+                data[name] = tuple(value)
         instances.append(model(**data))
 
     return instances
@@ -56,7 +65,9 @@ def load_heroes() -> List[HeroCard]:
     return _load_cards("HeroCards.json", HeroCard)
 
 def load_ruins() -> List[RuinCard]:
-    return _load_cards("RuinCards.json", RuinCard)
+    ruins = _load_cards("RuinCards.json", RuinCard)
+    # Compile each Ruin's entry/exit/occupy/passive text into trigger callables once, here
+    return [replace(ruin, rules=compile_ruin_rules(ruin)) for ruin in ruins]
 
 def load_minions() -> List[MinionCard]:
     return _load_cards("MinionCards.json", MinionCard)
@@ -81,4 +92,50 @@ def load_all_cards() -> Dict[str, List[Any]]:
         "ruins": load_ruins(),
         "gates": load_gates(),
         "heroes": load_heroes(),
-    }
\ No newline at end of file
+    }
+
+# Named decklists ({"name", "hero_name", "gate_name", "exp_deck", "adventure_deck"}, each deck a
+# list of {"name", "count"}) exactly as stored; see game.init.deck_choice_from_decklist
+def load_decks() -> List[Dict[str, Any]]:
+    return _load_json("decks.json")["decks"]
+
+# One loaded copy of every card set for the whole process, versioned so the server can pick up
+# edited card files while it runs (CARDS.watch). Prototypes are frozen, so every match deals
+# from the same objects instead of loading its own.
+CARDS = CardRegistry(DATA_DIR, {
+    "ruins": ("RuinCards.json", load_ruins),
+    "minions": ("MinionCards.json", load_minions),
+    "gears": ("GearCards.json", load_gears),
+    "spells": ("SpellCards.json", load_spells),
+    "relics": ("RelicCards.json", load_relics),
+    "glyphs": ("GlyphCards.json", load_glyphs),
+    "gates": ("GateCards.json", load_gates),
+    "heroes": ("HeroCards.json", load_heroes),
+})
+
+# The latest card data version
+def current_cards() -> CardSet:
+    return CARDS.current
+
+# Every card set of the latest version. Hold on to the result for as long as one match needs
+# consistent data; a reload replaces the version but never changes one already handed out.
+def card_pool() -> Mapping[str, Tuple[Any, ...]]:
+    return CARDS.current.pool
+
+# Pickled card data for the protocol's preset dictionary (network.protocol.set_preset_dictionary),
+# rarest sets first since zlib only looks back 32KB, so card names and ability text compress
+# well from a connection's first frames
+def compression_dictionary() -> bytes:
+    loaders = (load_ruins, load_minions, load_gears, load_spells, load_relics, load_glyphs, load_gates, load_heroes)
+    corpus = b"".join(_pickle_without_memo(loader()) for loader in loaders)
+    return corpus[-32768:]
+
+# Ordinary pickles refer back to objects already written, so their bytes depend on which strings
+# happen to be shared (compiled Ruin rules share theirs across loads). Without the memo every
+# process gets the same bytes.
+def _pickle_without_memo(obj) -> bytes:
+    buffer = io.BytesIO()
+    pickler = pickle.Pickler(buffer, protocol=pickle.DEFAULT_PROTOCOL)
+    pickler.fast = True
+    pickler.dump(obj)
+    return buffer.getvalue()
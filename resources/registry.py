@@ -0,0 +1,133 @@
+# External Imports
+import hashlib
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+# (mtime_ns, size) of a data file, to tell when it has changed
+Stamp = Tuple[int, int]
+
+# One immutable version of the card data. Prototypes are frozen, so a match that dealt its
+# cards from a version keeps playing with exactly that version however often the files change.
+# `version` counts reloads within one process; `digest` names the file contents, so it is the
+# same in every process and across restarts.
+@dataclass(frozen=True)
+class CardSet:
+    version: int
+    pool: Mapping[str, Tuple[Any, ...]]
+    stamps: Mapping[str, Stamp]
+    # Content hash of each data file
+    hashes: Mapping[str, str] = field(default_factory=lambda: MappingProxyType({}))
+
+    @property
+    def digest(self) -> str:
+        combined = hashlib.blake2b(digest_size=16)
+        for filename, file_hash in sorted(self.hashes.items()):
+            combined.update(f"{filename}:{file_hash}\n".encode())
+        return combined.hexdigest()
+
+# Holds the latest CardSet and replaces it when card files change. `sources` maps each pool
+# key to its data file and the loader that parses it. Readers never lock: `current` is a single
+# reference that is swapped once a complete new version has been built.
+class CardRegistry:
+    def __init__(self, directory, sources: Dict[str, Tuple[str, Callable[[], list]]]):
+        self.directory = Path(directory)
+        self.sources = sources
+        self._current: Optional[CardSet] = None
+        # Stamps of files that failed to parse, so each bad save is reported once
+        self._failed: Dict[str, Optional[Stamp]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    @property
+    def current(self) -> CardSet:
+        cards = self._current
+        if cards is None:
+            with self._lock:
+                if self._current is None:
+                    self._current = self._build()
+                cards = self._current
+        return cards
+
+    def _stamp(self, filename: str) -> Optional[Stamp]:
+        try:
+            st = os.stat(self.directory / filename)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _hash(self, filename: str) -> str:
+        try:
+            return hashlib.blake2b((self.directory / filename).read_bytes(), digest_size=16).hexdigest()
+        except OSError:
+            return ""
+
+    # Parse one source; the stamp and hash are taken first, so a write racing the parse is seen next time
+    def _load(self, key: str) -> Tuple[Tuple[Any, ...], Optional[Stamp], str]:
+        filename, load = self.sources[key]
+        stamp = self._stamp(filename)
+        file_hash = self._hash(filename)
+        return tuple(load()), stamp, file_hash
+
+    def _build(self) -> CardSet:
+        pool, stamps, hashes = {}, {}, {}
+        for key, (filename, _) in self.sources.items():
+            pool[key], stamps[filename], hashes[filename] = self._load(key)
+        return CardSet(1, MappingProxyType(pool), MappingProxyType(stamps), MappingProxyType(hashes))
+
+    # Reparse the files that changed since the current version and swap in a new version sharing
+    # everything else. A file that fails to parse (often one caught halfway through being saved)
+    # keeps its old cards and is retried once it changes again. Returns whether a new version was swapped in.
+    def reload(self) -> bool:
+        with self._lock:
+            previous = self._current
+            if previous is None:
+                self._current = self._build()
+                return True
+            pool, stamps, hashes = dict(previous.pool), dict(previous.stamps), dict(previous.hashes)
+            reloaded = []
+            for key, (filename, _) in self.sources.items():
+                stamp = self._stamp(filename)
+                if stamp == previous.stamps.get(filename) or stamp == self._failed.get(filename):
+                    continue
+                try:
+                    pool[key], stamps[filename], hashes[filename] = self._load(key)
+                except (OSError, ValueError, KeyError, TypeError):
+                    self.logger.exception("Could not reload %s, keeping its cards from version %d",
+                                          filename, previous.version)
+                    self._failed[filename] = stamp
+                    continue
+                self._failed.pop(filename, None)
+                reloaded.append(filename)
+            if not reloaded:
+                return False
+            cards = CardSet(previous.version + 1, MappingProxyType(pool), MappingProxyType(stamps),
+                            MappingProxyType(hashes))
+            self._current = cards
+        self.logger.info("Card data version %d: reloaded %s", cards.version, ", ".join(reloaded))
+        return True
+
+    # Poll for changed files on a daemon thread, so reloads never hold up a match
+    def watch(self, interval: float):
+        if self._watcher is not None:
+            return
+        self.current
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch_loop, args=(interval,), name="card-reload", daemon=True)
+        self._watcher.start()
+
+    def _watch_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            self.reload()
+
+    def stop(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
@@ -2,86 +2,410 @@
 import sys
 import os
 import logging
-from types import SimpleNamespace
+import random
+import threading
+import argparse
+import functools
+import sqlite3
+import uuid
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Internal imports
-from config import SERVER_HOST, SERVER_PORT
-from network.server_core import start_server, accept_clients
-from network.protocol import send_obj
+from config import (
+    SERVER_HOST, SERVER_PORT, REPLAY_DIR, REPLAY_CHECKPOINT_EVERY,
+    METRICS_HOST, METRICS_PORT, METRICS_FILE, CHECKPOINT_DB, WORKER_PORT,
+    SPECTATOR_PORT, SPECTATOR_QUEUE_FRAMES, RATINGS_FILE, RECORDS_DIR, CARD_RELOAD_INTERVAL,
+)
+from network.server_core import Acceptor, start_server, serve_spectators
+from network.protocol import send_obj, recv_obj, set_preset_dictionary
+from network.broadcast import Broadcaster, LiveMatches
+from network.matchmaking import MatchmakingService, RatingTable
+from network.match_loop import MatchLoop
+from network.sessions import ReconnectTable, new_token, token_digest
+from network.supervisor import Supervisor, watch_progress
 from utils import setup_logging
-from game.init import initialize_game
-from game.phases import ExplorePhase
+from metrics import REGISTRY, start_metrics_server, write_metrics_file
+from profiling import PROFILER
+from game.board import parse_board_size
+from game.init import initialize_game, build_game_state, request_deck_choice, prepare_match
+from game.phases import play_game
+from game.replay import ReplayWriter
+from game.persistence import CheckpointStore
+from game.views import PLAYER_LABELS
+from resources.loader import CARDS, compression_dictionary
 
+# Broadcasters of matches in progress, keyed by match ID, for attaching spectators.
+LIVE_MATCHES = LiveMatches()
 
-# Set up the initial 6×5 board so clients render immediately.
-def setup_initial_board(state):
-    state.rows, state.cols = 6, 5
 
-    ruins_proxy = SimpleNamespace(
-        card_type="Ruin",
-        name="Hidden Ruin",
-        terrain="Ruins",
-        ability="",
-        connections=[],
-    )
+# Player label -> socket, for the flow drivers
+def player_connections(conn1, conn2):
+    return dict(zip(PLAYER_LABELS, (conn1, conn2)))
 
-    slot_proxy = SimpleNamespace(
-        card_type="GateSlot",
-        name="Starting Slot",
-        terrain="Gate",
-        ability="",
-        connections=[],
-    )
 
-    state.map = {}
-    for r in range(state.rows):
-        for c in range(state.cols):
-            state.map[(r, c)] = {"card": ruins_proxy, "face_up": False}
+# Play one match between two connected clients, recording it to a replay file.
+# A flow (see game.flow); returns the winning player label.
+def run_match(conn1, conn2, store, match_id=None, choices=None, board_size=None, records=None):
+    logger = logging.getLogger("Server")
+    match_id = match_id or uuid.uuid4().hex
+    seed = random.randrange(2 ** 32)
+    rng = random.Random(seed)
 
-    mid = state.cols // 2
-    state.map[(1, mid)] = {"card": slot_proxy, "face_up": True}
-    state.map[(4, mid)] = {"card": slot_proxy, "face_up": True}
+    # Build game state from deck choices (asking the clients unless matchmaking already did).
+    if choices is None:
+        state, players = yield from initialize_game(conn1, conn2, rng=rng, board_size=board_size)
+    else:
+        state, players = build_game_state(choices[0], choices[1], rng=rng, board_size=board_size)
+    state.match_id = match_id
+    choices = [{"hero": p.hero, "gate": p.gate} for p in players]
+    recorder = ReplayWriter(REPLAY_DIR / f"{match_id}.ror", match_id, seed, choices,
+                            rng=rng, checkpoint_every=REPLAY_CHECKPOINT_EVERY,
+                            board_size=(state.rows, state.cols), card_version=state.card_version,
+                            card_digest=state.card_digest)
+    logger.info("Match %s started with seed %d on a %dx%d board (card data version %d)",
+                match_id, seed, state.rows, state.cols, state.card_version)
 
-    state.gate_positions = {}
+    # Seed the blank board.
+    prepare_match(state)
+    store.save(match_id, seed, state, rng)
 
+    # Each player gets a secret for their seat, to rejoin the match if the server restarts
+    tokens = [new_token() for _ in PLAYER_LABELS]
+    for conn, label, token in zip((conn1, conn2), PLAYER_LABELS, tokens):
+        send_obj(conn, {"type": "seat", "match_id": match_id, "player": label, "token": token})
+    store.seat(match_id, [token_digest(token) for token in tokens])
 
-# Main server loop.
-def main():
-    setup_logging()
+    return (yield from play_match(state, conn1, conn2, recorder, store, seed, rng, records))
+
+
+# Continue a match from its last checkpoint once both players have reconnected (see
+# network.sessions.ReconnectTable). A flow.
+def resume_match(conn1, conn2, store, saved, records=None):
     logger = logging.getLogger("Server")
+    state = saved.state
+    rng = random.Random()
+    if saved.rng_state is not None:
+        rng.setstate(saved.rng_state)
 
-    # Listen and accept two clients.
-    server_sock = start_server(SERVER_HOST, SERVER_PORT)
-    logger.info("Server listening on %s:%d", SERVER_HOST, SERVER_PORT)
-    conn1, conn2 = accept_clients(server_sock)
-    logger.info("Two clients connected: %s, %s", conn1.getpeername(), conn2.getpeername())
+    resume_msg = {"type": "resume", "match_id": saved.match_id, "turn": state.turn}
+    send_obj(conn1, resume_msg)
+    send_obj(conn2, resume_msg)
 
-    # Build game state from deck choices and deal starting hands.
-    state, _ = initialize_game(conn1, conn2)
-    state.deal_starting_hands()
+    choices = [{"hero": p.hero, "gate": p.gate} for p in state.players]
+    recorder = ReplayWriter(REPLAY_DIR / f"{saved.match_id}.ror", saved.match_id, saved.seed, choices,
+                            rng=rng, checkpoint_every=REPLAY_CHECKPOINT_EVERY,
+                            board_size=(state.rows, state.cols), card_version=state.card_version,
+                            card_digest=state.card_digest)
+    # Mark the restart point so replays skip the turn that was interrupted
+    recorder.checkpoint(state)
+    logger.info("Match %s resumed at turn %d", saved.match_id, state.turn)
 
-    # Seed the blank board.
-    setup_initial_board(state)
+    return (yield from play_match(state, conn1, conn2, recorder, store, saved.seed, rng, records))
+
+
+# Play Explore then Adventure turns until someone wins (game.phases.play_game), checkpointing
+# each turn. A flow; returns the winner.
+def play_match(state, conn1, conn2, recorder, store, seed, rng, records=None):
+    match_id = state.match_id
+    broadcaster = Broadcaster((conn1, conn2), max_spectator_frames=SPECTATOR_QUEUE_FRAMES)
+    LIVE_MATCHES.add(match_id, broadcaster)
+    try:
+        # Each player sees only their own hand and face-up tiles.
+        winner = yield from play_game(state, (conn1, conn2), recorder=recorder, broadcaster=broadcaster,
+                                      records=records, after_turn=lambda state: store.save(match_id, seed, state, rng))
+        store.finish(match_id)
+        return winner
+    finally:
+        LIVE_MATCHES.remove(match_id)
+        broadcaster.close()
+        recorder.close()
+        if METRICS_FILE:
+            write_metrics_file(METRICS_FILE)
+        REGISTRY.finish_match(match_id)
+        PROFILER.finish(match_id)
+
+
+# Read a new player's reply to the deck offer, on its own thread. A player rejoining an
+# interrupted match is seated there when their token checks out, or sent to the worker that
+# owns the match; everyone else, including a refused rejoin (which then picks a deck), goes on
+# to on_player(conn, addr, reply).
+def greet(conn, addr, reconnects, on_player):
+    logger = logging.getLogger("Server")
+    try:
+        reply = request_deck_choice(conn)
+        if isinstance(reply, dict) and 'resume' in reply:
+            port = reconnects.redirect(reply['resume'])
+            if port is not None:
+                logger.info("Sending %s rejoining match %s to port %d", addr, reply['resume'], port)
+                send_obj(conn, {"type": "redirect", "match_id": reply['resume'], "port": port})
+                conn.close()
+                return
+            refused = reconnects.claim(conn, reply)
+            if refused is None:
+                return
+            logger.info("Refused %s rejoining match %s: %s", addr, reply['resume'], refused)
+            send_obj(conn, {"type": "resume_refused", "match_id": reply['resume'], "reason": refused})
+            reply = recv_obj(conn)
+    except (OSError, EOFError, ValueError):
+        conn.close()
+        return
+    if not isinstance(reply, dict) or 'deck_choice' not in reply:
+        logger.warning("Dropping %s: expected a deck choice", addr)
+        conn.close()
+        return
+    on_player(conn, addr, reply)
+
+
+# Accept players forever on background threads, one per listener, greeting each player on a
+# thread of its own, so nobody waiting for an opponent (or to rejoin) holds up anyone else.
+def accept_players(listeners, reconnects, on_player):
+    def on_accept(conn, addr):
+        greet(conn, addr, reconnects, on_player)
 
-    # Repeat Explore turns until a valid path connects Gates.
-    while True:
-        update = {"type": "state_update", "state": state}
-        send_obj(conn1, update)
-        send_obj(conn2, update)
+    for server_sock in listeners:
+        port = server_sock.getsockname()[1]
+        acceptor = Acceptor(server_sock, on_accept, f"player-accept-{port}").start()
+        watch_progress(acceptor.thread.name, lambda acceptor=acceptor: acceptor.passes)
 
-        ExplorePhase(state, (conn1, conn2)).run()
 
-        if state.check_path_between_gates():
-            winner = state.current_player()
-            end_msg = {"type": "game_end", "winner": winner, "phase": "explore"}
-            send_obj(conn1, end_msg)
-            send_obj(conn2, end_msg)
-            break
+# on_ready for the ReconnectTable: continue a match on the loop once both its players are back
+def resume_on(loop, store, records=None):
+    logger = logging.getLogger("Server")
+
+    def start(saved, conn1, conn2):
+        def done(winner, error):
+            if error is not None:
+                logger.warning("Resumed match %s aborted: %s", saved.match_id, error)
+            conn1.close()
+            conn2.close()
+
+        loop.add(saved.match_id, resume_match(conn1, conn2, store, saved, records),
+                 player_connections(conn1, conn2), done)
+
+    return start
+
+
+# Accept players forever, queue them by rating and deck, and play every pairing on the match loop.
+def serve_matchmaking(listeners, store, loop, reconnects, board_size=None, records=None):
+    logger = logging.getLogger("Server")
+    ratings = RatingTable(RATINGS_FILE)
+
+    def play_pair(first, second):
+        def done(winner, error):
+            try:
+                if error is not None:
+                    logger.warning("Match between %s and %s aborted: %s", first.player_id, second.player_id, error)
+                elif winner and first.rated and second.rated:
+                    won, lost = (first, second) if winner == PLAYER_LABELS[0] else (second, first)
+                    new_w, new_l = ratings.record_result(won.player_id, lost.player_id)
+                    logger.info("%s beat %s, ratings now %.0f / %.0f", won.player_id, lost.player_id, new_w, new_l)
+            finally:
+                first.conn.close()
+                second.conn.close()
+
+        match_id = uuid.uuid4().hex
+        flow = run_match(first.conn, second.conn, store, match_id, choices=(first.deck_choice, second.deck_choice),
+                         board_size=board_size, records=records)
+        loop.add(match_id, flow, player_connections(first.conn, second.conn), done)
+
+    service = MatchmakingService(ratings, play_pair)
+
+    # A name is registered to the first player to use it, who gets a token to prove it from then
+    # on. Players without a name play as unrated guests.
+    def on_player(conn, addr, reply):
+        player_id = reply.get('player_id')
+        if not player_id:
+            service.submit(f"guest:{addr[0]}:{addr[1]}", conn, reply['deck_choice'], rated=False)
+            return
+        try:
+            if not ratings.verify(player_id, reply.get('token')):
+                token = ratings.register(player_id)
+                if token is None:
+                    logger.info("Refused %s from %s: wrong token for that name", player_id, addr)
+                    send_obj(conn, {"type": "login_refused", "player_id": player_id,
+                                    "reason": "that name is registered to another player"})
+                    conn.close()
+                    return
+                send_obj(conn, {"type": "registered", "player_id": player_id, "token": token})
+        except OSError:
+            conn.close()
+            return
+        service.submit(player_id, conn, reply['deck_choice'])
+
+    accept_players(listeners, reconnects, on_player)
+    threading.Event().wait()
+
+
+# Pair players in arrival order and play every pair's match on the match loop. Runs forever,
+# or until max_matches of them have ended.
+def serve_pairs(listeners, store, loop, reconnects, board_size=None, records=None, max_matches=None):
+    logger = logging.getLogger("Server")
+    waiting = []
+    lock = threading.Lock()
+    started = 0
+    ended = threading.Semaphore(0)
+
+    def on_player(conn, addr, reply):
+        nonlocal started
+        with lock:
+            if max_matches is not None and started >= max_matches:
+                pair = None
+            else:
+                waiting.append((conn, addr, reply['deck_choice']))
+                if len(waiting) < 2:
+                    return
+                pair, waiting[:] = list(waiting), []
+                started += 1
+        if pair is None:
+            conn.close()
+            return
+        (conn1, addr1, choice1), (conn2, addr2, choice2) = pair
+        logger.info("Two clients connected: %s, %s", addr1, addr2)
+        match_id = uuid.uuid4().hex
 
-    conn1.close()
-    conn2.close()
+        def done(winner, error):
+            if error is not None:
+                logger.warning("Match %s aborted: %s", match_id, error)
+            conn1.close()
+            conn2.close()
+            ended.release()
+
+        flow = run_match(conn1, conn2, store, match_id, choices=(choice1, choice2),
+                         board_size=board_size, records=records)
+        loop.add(match_id, flow, player_connections(conn1, conn2), done)
+
+    accept_players(listeners, reconnects, on_player)
+    if max_matches is None:
+        threading.Event().wait()
+    for _ in range(max_matches):
+        ended.acquire()
+
+
+# Turn-record writer for this process; workers write to their own subdirectory so shards never
+# collide. Recording needs NumPy and is skipped without it.
+def open_records(worker_id=None):
+    if RECORDS_DIR is None:
+        return None
+    try:
+        from game.records import RecordWriter
+    except ImportError:
+        logging.getLogger("Server").warning("NumPy is not installed, turn records are disabled")
+        return None
+    return RecordWriter(RECORDS_DIR if worker_id is None else RECORDS_DIR / f"w{worker_id}")
+
+
+# locate() for a worker's ReconnectTable: the port of the worker that owns a running match, when
+# that is another worker. Matches a single-process server saved count as worker 0's.
+def owner_port(store, worker_id, workers):
+    logger = logging.getLogger(f"Worker{worker_id}")
+
+    def locate(match_id):
+        try:
+            running, owner = store.owner_of(match_id)
+        except sqlite3.Error:
+            logger.exception("Could not look up the owner of match %s", match_id)
+            return None
+        if not running:
+            return None
+        worker = (owner or 0) % workers
+        return None if worker == worker_id else WORKER_PORT + worker
+
+    return locate
+
+
+# Serve from an already-bound socket. Workers share the checkpoint database and get their own
+# ports; each takes back the interrupted matches it owns (see owner_port).
+def serve(server_sock, worker_id=None, matchmaking=False, board_size=None, workers=None):
+    logger = logging.getLogger("Server" if worker_id is None else f"Worker{worker_id}")
+    offset = 0 if worker_id is None else worker_id + 1
+
+    if METRICS_PORT:
+        start_metrics_server(METRICS_HOST, METRICS_PORT + offset, routes=PROFILER.admin_routes())
+        logger.info("Metrics available at http://%s:%d/metrics", METRICS_HOST, METRICS_PORT + offset)
+
+    # Pick up edited card files without restarting; the reload runs on its own thread
+    if CARD_RELOAD_INTERVAL:
+        CARDS.watch(CARD_RELOAD_INTERVAL)
+
+    # Matches to profile can be named up front in the environment or later with SIGUSR1
+    PROFILER.load_env()
+    PROFILER.install_signal_handler()
+    store = CheckpointStore(CHECKPOINT_DB, owner=worker_id)
+    records = open_records(worker_id)
+
+    # Spectators connect on their own port and pick a match to watch.
+    spectator_sock = start_server(SERVER_HOST, SPECTATOR_PORT + offset, backlog=64)
+    serve_spectators(spectator_sock, LIVE_MATCHES)
+    logger.info("Spectators can connect on %s:%d", SERVER_HOST, SPECTATOR_PORT + offset)
+
+    # Every match runs on one loop thread, which the worker heartbeat vouches for
+    loop = MatchLoop()
+    loop.start()
+    watch_progress("match-loop", lambda: loop.passes)
+
+    # Players of matches interrupted by a crash rejoin them alongside new matches starting. A
+    # worker also listens on a port of its own, for players rejoining its matches via another.
+    listeners = [server_sock]
+    if worker_id is None:
+        reconnects = ReconnectTable(resume_on(loop, store, records))
+        unfinished = store.unfinished_matches()
+    else:
+        listeners.append(start_server(SERVER_HOST, WORKER_PORT + worker_id, backlog=64))
+        reconnects = ReconnectTable(resume_on(loop, store, records), owner_port(store, worker_id, workers))
+        unfinished = [saved for saved in store.unfinished_matches() if (saved.owner or 0) % workers == worker_id]
+    reconnects.expect(unfinished)
+    for saved in unfinished:
+        if saved.seats:
+            logger.info("Waiting for players to reconnect to match %s", saved.match_id)
+        else:
+            logger.warning("Match %s was saved without seat tokens, so nobody can rejoin it", saved.match_id)
+
+    if matchmaking:
+        serve_matchmaking(listeners, store, loop, reconnects, board_size, records)
+    if worker_id is not None:
+        serve_pairs(listeners, store, loop, reconnects, board_size, records)
+
+    # A single-match server stops after its match, once any resumed matches have ended too
+    serve_pairs(listeners, store, loop, reconnects, board_size, records, max_matches=1)
+    loop.wait_idle()
+    store.close()
+    if records is not None:
+        records.close()
+
+
+# Worker process entry point used by the supervisor.
+def serve_worker(server_sock, worker_id, matchmaking=False, board_size=None, workers=1):
+    setup_logging()
+    serve(server_sock, worker_id=worker_id, matchmaking=matchmaking, board_size=board_size, workers=workers)
+
+
+# Main server loop.
+def main():
+    parser = argparse.ArgumentParser(description="Ruins of Ragnir game server")
+    parser.add_argument("--matchmaking", action="store_true",
+                        help="Keep accepting players and pair them by rating instead of running one match")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Pre-fork this many worker processes sharing the game port")
+    parser.add_argument("--board-size", type=parse_board_size, default=None, metavar="ROWSxCOLS",
+                        help="Board dimensions for new matches, e.g. 64 or 64x48 (default from config)")
+    args = parser.parse_args()
+
+    setup_logging()
+    logger = logging.getLogger("Server")
+    # Built before forking, so every worker offers clients the same card dictionary
+    set_preset_dictionary(compression_dictionary())
+
+    if args.workers:
+        target = functools.partial(serve_worker, matchmaking=args.matchmaking, board_size=args.board_size,
+                                   workers=args.workers)
+        Supervisor(target, args.workers, SERVER_HOST, SERVER_PORT).run()
+        return
+
+    # Listen for players; a single-match server also takes back players of interrupted matches.
+    server_sock = start_server(SERVER_HOST, SERVER_PORT, backlog=128 if args.matchmaking else 8)
+    logger.info("Server listening on %s:%d", SERVER_HOST, SERVER_PORT)
+    serve(server_sock, matchmaking=args.matchmaking, board_size=args.board_size)
 
 
 if __name__ == "__main__":
@@ -0,0 +1 @@
+# Intentially Left Blank
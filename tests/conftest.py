@@ -0,0 +1,6 @@
+# External Imports
+import os
+import sys
+
+# Allow running pytest from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,24 @@
+# Internal Imports
+from benchmarks.harness import Benchmark, compare_results, run_suite, save_results
+
+def test_setup_runs_before_every_round_and_is_passed_in():
+    calls = []
+    bench = Benchmark("count", calls.append, setup=lambda: "round", number=3, rounds=4, warmup=1)
+    result = bench.run()
+    assert calls == ["round"] * 3 * 5
+    assert result["rounds"] == 4 and result["min"] <= result["median"]
+
+def test_run_suite_filters_by_name():
+    benches = [Benchmark("engine.a", lambda: None, rounds=2), Benchmark("render.b", lambda: None, rounds=2)]
+    assert [r["name"] for r in run_suite(benches, "engine")] == ["engine.a"]
+
+def _result(name, median):
+    return {"name": name, "rounds": 1, "number": 1, "min": median, "median": median,
+            "mean": median, "stdev": 0.0, "ops_per_sec": 1.0 / median}
+
+def test_compare_flags_only_regressions_past_the_threshold(tmp_path):
+    old = save_results([_result("fast", 1.0), _result("slow", 1.0)], tmp_path / "old.json")
+    same = save_results([_result("fast", 1.05), _result("slow", 0.5)], tmp_path / "same.json")
+    worse = save_results([_result("fast", 1.2), _result("slow", 1.0)], tmp_path / "worse.json")
+    assert not compare_results(old, same)
+    assert compare_results(old, worse)
@@ -0,0 +1,60 @@
+# External Imports
+import pickle
+import random
+
+import pytest
+
+# Internal Imports
+from game.board import EMPTY_CODE, FACE_DOWN_CODE, ChunkedBoard, parse_board_size, tile_code
+from resources.loader import card_pool
+
+def _tile(face_up=False):
+    return {"card": card_pool()["ruins"][0], "face_up": face_up}
+
+def test_behaves_like_a_dict_of_positions():
+    board, reference = ChunkedBoard(40, 40, chunk_size=8), {}
+    rng = random.Random(3)
+    for _ in range(300):
+        pos = (rng.randrange(40), rng.randrange(40))
+        if pos in reference and rng.random() < 0.4:
+            del board[pos], reference[pos]
+        else:
+            board[pos] = reference[pos] = _tile()
+    assert len(board) == len(reference)
+    assert dict(board.tiles()) == reference
+    assert board.chunk_count() == len({board.chunk_of(pos) for pos in reference})
+    with pytest.raises(KeyError):
+        board[(40, 0)] = _tile()
+
+def test_neighbours_and_paths_cross_chunk_edges():
+    board = ChunkedBoard(32, 32, chunk_size=8)
+    path = [(7, c) for c in range(6, 11)] + [(8, 11)]
+    for pos in path:
+        board[pos] = _tile(face_up=True)
+    assert {pos for pos, _ in board.neighbours((7, 7))} == {(7, 6), (7, 8)}
+    assert {pos for pos, _ in board.neighbours((8, 10))} == {(7, 9), (7, 10), (8, 11)}
+    assert board.face_up_path((7, 6), (8, 11))
+    board.set_face_up((7, 8), False)
+    assert not board.face_up_path((7, 6), (8, 11))
+    assert sorted(pos for pos, _ in board.tiles_in_rect(7, 9, 9, 12)) == [(7, 9), (7, 10), (8, 11)]
+
+def test_dense_codes_follow_changes_but_are_not_pickled():
+    board = ChunkedBoard(16, 16, chunk_size=4)
+    board[(1, 2)] = _tile()
+    codes = board.dense_codes()
+    board.set_face_up((1, 2))
+    board[(5, 5)] = _tile()
+    assert codes[1 * 16 + 2] == tile_code(board[(1, 2)]) != FACE_DOWN_CODE
+    assert codes[5 * 16 + 5] == FACE_DOWN_CODE
+    del board[(5, 5)]
+    assert codes[5 * 16 + 5] == EMPTY_CODE
+    copy = pickle.loads(pickle.dumps(board))
+    assert copy._codes is None and copy.dense_codes() == codes
+
+def test_board_sizes_parse_square_or_rectangular():
+    assert parse_board_size("64") == (64, 64)
+    assert parse_board_size("64x48") == (64, 48)
+    with pytest.raises(ValueError):
+        parse_board_size("2x5")
+    with pytest.raises(ValueError):
+        ChunkedBoard(8, 8, chunk_size=6)
@@ -0,0 +1,24 @@
+# Internal Imports
+from game.client_policy import respond
+from game.headless import new_headless_match
+from resources.loader import card_pool
+
+PROMPT = {"phase": "explore", "step": "placement", "player": "Player1", "plans": True}
+
+def test_step_mode_places_each_ruin_on_a_new_cell():
+    state, _ = new_headless_match(3)
+    hand = list(card_pool()["ruins"][:3])
+    placed = set()
+    replies = []
+    for remaining in range(len(hand), 0, -1):
+        replies.append(respond({**PROMPT, "hand": hand[:remaining]}, state, "Player1", step_mode=True, placed=placed))
+    cells = [reply["pos"] for reply in replies]
+    assert len(set(cells)) == 3 and placed == set(cells)
+    assert not any(cell in state.map for cell in cells)
+
+def test_plans_cover_the_hand_with_distinct_cells():
+    state, _ = new_headless_match(3)
+    hand = list(card_pool()["ruins"][:3])
+    plan = respond({**PROMPT, "hand": hand}, state, "Player1")["plan"]
+    assert [entry["card_index"] for entry in plan] == [0, 1, 2]
+    assert len({entry["pos"] for entry in plan}) == 3
@@ -0,0 +1,20 @@
+# External Imports
+import random
+
+# Internal Imports
+from game.headless import greedy_adventure_plan, new_headless_match, play_headless_match
+from resources.loader import card_pool
+
+# A Hero in hand has no cost and is summoned for free, once
+def test_greedy_plan_summons_hero_from_hand():
+    state, _ = new_headless_match(3)
+    hero = card_pool()["heroes"][0]
+    mine = state.players[0]
+    mine.hero_area = []
+    mine.hand = [hero, hero]
+    mine.echoes = 0
+    plan = greedy_adventure_plan(state, "Player1", random.Random(0))
+    assert plan["plan"]["summon"] == [0]
+
+def test_headless_match_is_deterministic():
+    assert play_headless_match(11) == play_headless_match(11)
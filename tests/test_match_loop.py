@@ -0,0 +1,125 @@
+# External Imports
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+# Internal Imports
+import network.match_loop as match_loop
+import network.supervisor as supervisor
+from game.flow import AwaitInput
+from network.match_loop import MatchLoop
+from network.protocol import recv_obj, send_obj
+
+# Answers every prompt it reads with "ok" until the match ends, on a thread of its own
+def _answer(conn):
+    def run():
+        try:
+            while recv_obj(conn).get("type") != "end":
+                send_obj(conn, "ok")
+        except (OSError, EOFError):
+            pass
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+# Prompts Player2 `rounds` times, sending `blob` bytes of incompressible data to Player1 with each
+def _flow(conns, rounds, blob=0):
+    for _ in range(rounds):
+        if blob:
+            send_obj(conns["Player1"], {"type": "blob", "data": os.urandom(blob)})
+        send_obj(conns["Player2"], {"type": "prompt"})
+        assert (yield AwaitInput("Player2", "step")) == "ok"
+    for conn in conns.values():
+        send_obj(conn, {"type": "end", "data": os.urandom(blob)})
+    return "done"
+
+def _match(loop, match_id, rounds, blob=0):
+    pairs = {label: socket.socketpair() for label in ("Player1", "Player2")}
+    server = {label: ends[0] for label, ends in pairs.items()}
+    client = {label: ends[1] for label, ends in pairs.items()}
+    ended = threading.Event()
+    outcome = {}
+
+    def done(result, error):
+        outcome.update(result=result, error=error)
+        ended.set()
+
+    loop.add(match_id, _flow(server, rounds, blob), server, done)
+    return client, ended, outcome
+
+@pytest.fixture
+def loop(monkeypatch):
+    monkeypatch.setattr(match_loop, "PLAYER_SEND_BUFFER", 256 * 1024)
+    loop = MatchLoop()
+    loop.start()
+    return loop
+
+def test_a_waiting_match_does_not_hold_up_the_others(loop):
+    idle, idle_end, idle_outcome = _match(loop, "idle", rounds=1)
+    busy, busy_end, busy_outcome = _match(loop, "busy", rounds=3)
+    busy["Player2"].settimeout(5)
+    for _ in range(3):
+        assert recv_obj(busy["Player2"]) == {"type": "prompt"}
+        send_obj(busy["Player2"], "ok")
+    assert busy_end.wait(5) and busy_outcome == {"result": "done", "error": None}
+    assert not idle_end.is_set()
+    # The silent player leaves, which ends only their match
+    idle["Player2"].close()
+    assert idle_end.wait(5) and idle_outcome["error"] is not None
+
+def test_replies_sent_early_wait_for_the_prompt(loop):
+    client, ended, outcome = _match(loop, "eager", rounds=2)
+    send_obj(client["Player2"], "ok")
+    send_obj(client["Player2"], "ok")
+    assert ended.wait(5) and outcome == {"result": "done", "error": None}
+
+def test_a_player_who_stops_reading_only_ends_their_own_match(loop):
+    stalled, stalled_end, stalled_outcome = _match(loop, "stalled", rounds=1000, blob=64 * 1024)
+    _answer(stalled["Player2"])
+    healthy, healthy_end, healthy_outcome = _match(loop, "healthy", rounds=200)
+    for conn in healthy.values():
+        _answer(conn)
+    assert stalled_end.wait(10) and healthy_end.wait(10)
+    assert "stopped reading" in str(stalled_outcome["error"])
+    assert healthy_outcome == {"result": "done", "error": None}
+    assert loop.wait_idle(5)
+
+def test_last_frames_reach_a_slow_reader_before_the_match_is_done(loop):
+    client, ended, outcome = _match(loop, "slow", rounds=3, blob=100 * 1024)
+    _answer(client["Player2"])
+    received = []
+    # Player1 reads only once the flow has ended with frames still queued for it
+    while not loop.draining and not ended.is_set():
+        threading.Event().wait(0.01)
+    client["Player1"].settimeout(5)
+    while not received or received[-1].get("type") != "end":
+        received.append(recv_obj(client["Player1"]))
+    assert ended.wait(5) and outcome == {"result": "done", "error": None}
+    assert [msg["type"] for msg in received] == ["blob"] * 3 + ["end"]
+
+def test_heartbeat_follows_the_loop_not_the_clock(loop, monkeypatch):
+    monkeypatch.setattr(supervisor, "_progress", {})
+    supervisor.watch_progress("match-loop", lambda: loop.passes)
+    last = {}
+    supervisor._progressing(last)
+    # An idle loop still passes, so the worker keeps beating
+    time.sleep(match_loop.IDLE_POLL_SECONDS * 3)
+    assert supervisor._progressing(last)
+    # A loop stuck in one match stops it
+    stuck = threading.Event()
+
+    def hang(conns):
+        stuck.wait(10)
+        return "done"
+        yield
+
+    loop.add("hang", hang(None), {})
+    time.sleep(match_loop.IDLE_POLL_SECONDS * 3)
+    supervisor._progressing(last)
+    time.sleep(match_loop.IDLE_POLL_SECONDS * 3)
+    assert not supervisor._progressing(last)
+    stuck.set()
+    assert loop.wait_idle(10)
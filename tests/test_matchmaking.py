@@ -0,0 +1,124 @@
+# External Imports
+import json
+import socket
+import threading
+
+# Internal Imports
+from network.matchmaking import MatchmakingQueue, MatchmakingService, RatingTable, Ticket
+
+DECK_A = {"hero": "Aldric", "gate": "North Gate"}
+DECK_B = {"hero": "Brenna", "gate": "South Gate"}
+
+def _ticket(player_id, rating=1500.0, deck=DECK_A, at=0.0, conn=None):
+    return Ticket(player_id, conn, rating, deck, at)
+
+def test_same_deck_players_are_paired():
+    queue = MatchmakingQueue()
+    first, second = _ticket("a"), _ticket("b")
+    assert queue.enqueue(first, now=0.0) is None
+    assert queue.enqueue(second, now=0.0) == (first, second)
+    assert len(queue) == 0
+
+def test_a_lone_ticket_never_matches_itself():
+    queue = MatchmakingQueue()
+    queue.enqueue(_ticket("a"), now=0.0)
+    assert queue.tick(now=100.0) == []
+    assert len(queue) == 1
+
+def test_tick_pairs_same_deck_tickets_once_windows_widen():
+    queue = MatchmakingQueue(base_window=50.0, widen_per_second=10.0)
+    low, high = _ticket("low", 1400.0), _ticket("high", 1600.0)
+    queue.enqueue(low, now=0.0)
+    queue.enqueue(high, now=0.0)
+    assert queue.tick(now=1.0) == []
+    assert queue.tick(now=20.0) == [(low, high)]
+    assert len(queue) == 0
+
+def test_closest_rating_wins_across_decks():
+    queue = MatchmakingQueue(base_window=100.0, widen_per_second=0.0)
+    far, near = _ticket("far", 1700.0, DECK_B), _ticket("near", 1520.0, DECK_A)
+    queue.enqueue(far, now=0.0)
+    queue.enqueue(near, now=0.0)
+    queue.base_window = 400.0
+    newcomer = _ticket("new", 1500.0, DECK_B)
+    assert queue.enqueue(newcomer, now=0.0) == (near, newcomer)
+
+def test_cancelled_tickets_are_not_paired():
+    queue = MatchmakingQueue()
+    gone = _ticket("gone")
+    queue.enqueue(gone, now=0.0)
+    queue.cancel(gone)
+    assert queue.enqueue(_ticket("b"), now=0.0) is None
+    assert len(queue) == 1
+
+def test_names_need_their_token(tmp_path):
+    path = tmp_path / "ratings.json"
+    path.write_text(json.dumps({"veteran": 1600.0}))
+    ratings = RatingTable(path)
+    assert ratings.get("veteran") == 1600.0
+    token = ratings.register("veteran")
+    assert token and ratings.register("veteran") is None
+    assert ratings.verify("veteran", token)
+    assert not ratings.verify("veteran", "guess") and not ratings.verify("veteran", None)
+    ratings.record_result("veteran", "rookie")
+    reloaded = RatingTable(path)
+    assert reloaded.verify("veteran", token) and reloaded.get("veteran") > 1600.0
+
+def test_players_who_leave_the_queue_are_cancelled():
+    paired = []
+    service = MatchmakingService(RatingTable(), lambda first, second: paired.append((first, second)),
+                                 tick_interval=0.05)
+    server_end, client_end = socket.socketpair()
+    try:
+        ticket = service.submit("leaver", server_end, DECK_A)
+        assert len(service.queue) == 1
+        client_end.close()
+        for _ in range(100):
+            if not ticket.active:
+                break
+            threading.Event().wait(0.02)
+        assert not ticket.active and len(service.queue) == 0
+        assert server_end.fileno() == -1
+        service.submit("next", None, DECK_A)
+        assert paired == [] and len(service.queue) == 1
+    finally:
+        service.stop()
+
+def test_players_who_send_while_queued_are_dropped():
+    paired = []
+    service = MatchmakingService(RatingTable(), lambda first, second: paired.append((first, second)),
+                                 tick_interval=0.05)
+    server_end, client_end = socket.socketpair()
+    try:
+        ticket = service.submit("chatty", server_end, DECK_A)
+        client_end.sendall(b"x")
+        for _ in range(100):
+            if not ticket.active:
+                break
+            threading.Event().wait(0.02)
+        assert not ticket.active and len(service.queue) == 0
+        assert server_end.fileno() == -1
+        service.submit("next", None, DECK_A)
+        assert paired == []
+    finally:
+        service.stop()
+        client_end.close()
+
+def test_paired_players_are_handed_over_open():
+    paired = []
+    service = MatchmakingService(RatingTable(), lambda first, second: paired.append((first, second)),
+                                 tick_interval=0.05)
+    sockets = [socket.socketpair() for _ in range(2)]
+    try:
+        first = service.submit("a", sockets[0][0], DECK_A)
+        second = service.submit("b", sockets[1][0], DECK_A)
+        assert paired == [(first, second)]
+        # A reply sent early is the match's to read, not a sign of leaving
+        sockets[0][1].sendall(b"x")
+        threading.Event().wait(0.2)
+        assert sockets[0][0].recv(1) == b"x"
+    finally:
+        service.stop()
+        for pair in sockets:
+            for sock in pair:
+                sock.close()
@@ -0,0 +1,46 @@
+# External Imports
+from urllib.request import urlopen
+
+# Internal Imports
+from metrics import FINISHED_MATCHES, Registry, start_metrics_server
+
+def test_histogram_renders_cumulative_buckets():
+    registry = Registry()
+    steps = registry.histogram("steps", "Step time", ("step",), buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.5, 2.0):
+        steps.observe(seconds, "draw")
+    rendered = registry.render()
+    assert 'steps_bucket{step="draw",le="0.1"} 1' in rendered
+    assert 'steps_bucket{step="draw",le="1.0"} 2' in rendered
+    assert 'steps_bucket{step="draw",le="+Inf"} 3' in rendered
+    assert 'steps_count{step="draw"} 3' in rendered
+
+def test_finished_matches_fold_into_one_series():
+    registry = Registry()
+    steps = registry.histogram("steps", "Step time", ("match", "step"), buckets=(0.1, 1.0))
+    waits = registry.counter("waits", "Waits", ("match", "step"))
+    for match_id, seconds in (("a", 0.05), ("b", 0.5), ("live", 2.0)):
+        steps.observe(seconds, match_id, "draw")
+        waits.inc(1, match_id, "draw")
+    registry.finish_match("a")
+    registry.finish_match("b")
+    assert steps.count("a", "draw") == 0
+    assert steps.count(FINISHED_MATCHES, "draw") == 2
+    assert steps.count("live", "draw") == 1
+    assert waits.value(FINISHED_MATCHES, "draw") == 2
+    rendered = registry.render()
+    assert 'steps_bucket{match="finished",step="draw",le="0.1"} 1' in rendered
+    assert 'steps_bucket{match="finished",step="draw",le="1.0"} 2' in rendered
+    assert 'match="a"' not in rendered
+
+def test_metrics_server_serves_the_registry():
+    registry = Registry()
+    registry.counter("hits", "Hits").inc(3)
+    httpd = start_metrics_server("127.0.0.1", 0, registry)
+    try:
+        port = httpd.server_address[1]
+        with urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            assert "hits 3" in response.read().decode("utf-8")
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,35 @@
+# External Imports
+import copy
+import dataclasses
+import pickle
+
+import pytest
+
+# Internal Imports
+from models import GateInstance, UnitInstance
+from resources.loader import card_pool
+
+def test_prototypes_are_frozen():
+    pool = card_pool()
+    for card in (pool["heroes"][0], pool["minions"][0], pool["gates"][0]):
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            card.name = "Renamed"
+        assert not hasattr(card, "__dict__")
+
+def test_instances_change_without_touching_the_prototype():
+    minion = card_pool()["minions"][0]
+    unit = UnitInstance.from_card(minion)
+    unit.health -= 1
+    unit.keywords.append("Fortified")
+    assert unit.health == minion.health - 1 and "Fortified" not in minion.keywords
+    assert (unit.name, unit.cost) == (minion.name, minion.cost)
+    gate = card_pool()["gates"][0]
+    instance = GateInstance.from_card(gate)
+    instance.gate_health = 0
+    assert gate.gate_health > 0 and instance.name == gate.name
+
+def test_instances_survive_pickle_and_copy():
+    unit = UnitInstance.from_card(card_pool()["heroes"][0])
+    unit.attack += 2
+    for clone in (pickle.loads(pickle.dumps(unit)), copy.deepcopy(unit)):
+        assert (clone.name, clone.attack) == (unit.name, unit.attack)
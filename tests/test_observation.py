@@ -0,0 +1,68 @@
+# External Imports
+import copy
+
+# Internal Imports
+from game import rules
+from game.board import NEIGHBOUR_OFFSETS
+from game.headless import PolicyConnection, greedy_adventure_plan, new_headless_match
+from game.observation import ATTACK_GATE, ATTACK_OFFSETS, ObservationEncoder
+from game.phases import AdventurePhase, ExplorePhase
+
+# States at the start of a few Adventure turns of one seeded headless match
+def _adventure_states(seed=1, turns=6):
+    state, conns = new_headless_match(seed)
+    rng = conns[0].rng
+    while not state.check_path_between_gates():
+        ExplorePhase(state, conns).run()
+    states = []
+    for _ in range(turns):
+        states.append(copy.deepcopy(state))
+        AdventurePhase(state, PolicyConnection(state, state.current_player(), greedy_adventure_plan, rng)).run()
+        if state.adventure_winner():
+            break
+    return states
+
+# Whether the rules accept `action` on a copy of the state
+def _allowed(state, action, *args) -> bool:
+    trial = copy.deepcopy(state)
+    trial.moved_units, trial.attacked_units = set(), set()
+    ok, _ = action(trial, *args)
+    return ok
+
+def test_adventure_masks_agree_with_the_rules():
+    states = _adventure_states()
+    encoder = ObservationEncoder(states[0].rows, states[0].cols, capacity=len(states) * 2)
+    perspectives = ["Player1", "Player2"] * len(states)
+    states = [state for state in states for _ in range(2)]
+    obs = encoder.encode(states, perspectives)
+    rows, cols = encoder.rows, encoder.cols
+    for i, (state, player) in enumerate(zip(states, perspectives)):
+        me = 0 if player == "Player1" else 1
+        for j, card in enumerate(state.players[me].hand[:encoder.hand_slots]):
+            trial = copy.deepcopy(state)
+            ok, _ = rules.summon(trial, player, trial.players[me], trial.players[me].hand[j])
+            assert obs.legal_summon[i, j] == ok, card.name
+
+        enemy_gate = state.gate_positions[rules.opponent_of(player)]
+        for pos, occupants in state.occupants.items():
+            if not any(owner == player for owner, _ in occupants):
+                continue
+            r, c = encoder.board_pos(pos, player)
+            for k, (dr, dc) in enumerate(NEIGHBOUR_OFFSETS):
+                if 0 <= r + dr < rows and 0 <= c + dc < cols:
+                    dest = encoder.board_pos((r + dr, c + dc), player)
+                    assert obs.legal_move[i, r, c, k] == _allowed(state, rules.move_unit, player, {"from": pos, "to": dest})
+            for k, (dr, dc) in enumerate(ATTACK_OFFSETS):
+                target = encoder.board_pos((r + dr, c + dc), player)
+                enemies = any(owner != player for owner, _ in state.occupants.get(target, ()))
+                if 0 <= r + dr < rows and 0 <= c + dc < cols and (enemies or target != enemy_gate):
+                    assert obs.legal_attack[i, r, c, k] == _allowed(state, rules.attack, player, {"from": pos, "to": target})
+            if not any(owner != player for owner, _ in state.occupants.get(enemy_gate, ())):
+                assert obs.legal_attack[i, r, c, ATTACK_GATE]
+
+def test_cells_without_friendly_units_have_no_actions():
+    state = _adventure_states(turns=1)[0]
+    obs = ObservationEncoder(state.rows, state.cols, capacity=1).encode([state], ["Player1"])
+    friendly = obs.pieces[0, :, :, 0] > 0
+    assert not obs.legal_move[0][~friendly].any()
+    assert not obs.legal_attack[0][~friendly].any()
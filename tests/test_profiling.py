@@ -0,0 +1,38 @@
+# External Imports
+import sys
+import threading
+from time import perf_counter
+
+# Internal Imports
+from profiling import MatchProfiler
+
+def _busy(seconds=0.05):
+    start = perf_counter()
+    while perf_counter() - start < seconds:
+        pass
+
+def _samplers():
+    return [thread for thread in threading.enumerate() if thread.name == "profile-sampler"]
+
+def test_one_sampler_per_match_and_output_written_when_it_ends(tmp_path):
+    profiler = MatchProfiler(tmp_path, "sample", interval=0.001)
+    profiler.enable("m1")
+    before = len(_samplers())
+    for _ in range(3):
+        with profiler.profile("m1", sys._getframe(), _busy.__code__):
+            _busy()
+    assert len(_samplers()) == before + 1
+    assert not (tmp_path / "m1.folded").exists()
+    profiler.finish("m1")
+    assert len(_samplers()) == before
+    folded = (tmp_path / "m1.folded").read_text()
+    assert folded and all(line.startswith("_busy (") for line in folded.splitlines())
+
+def test_disable_writes_what_was_collected(tmp_path):
+    profiler = MatchProfiler(tmp_path, "cprofile")
+    profiler.enable("m2")
+    with profiler.profile("m2"):
+        _busy(0.01)
+    assert not (tmp_path / "m2.prof").exists()
+    profiler.disable("m2")
+    assert (tmp_path / "m2.prof").exists() and not profiler.is_profiled("m2")
@@ -0,0 +1,111 @@
+# External Imports
+import socket
+import threading
+import zlib
+
+import pytest
+
+# Internal Imports
+import network.protocol as protocol
+from network.protocol import (
+    CONTROL_FRAME, FLAG_COMPRESSED, FLAG_STREAM, LENGTH_MASK, CompressionStream,
+    decode_frame, encode_frame, recv_obj, send_obj, set_preset_dictionary,
+)
+from resources.loader import compression_dictionary
+
+# Large and repetitive enough to be compressed
+BIG = {"type": "state_update", "cards": ["Ruin of Ragnir"] * 400}
+SMALL = {"type": "prompt"}
+
+# Split a run of encoded frames into (header, payload) pairs
+def _frames(data: bytes):
+    frames = []
+    while data:
+        header = int.from_bytes(data[:4], 'big')
+        end = 4 + (header & LENGTH_MASK)
+        frames.append((header, data[4:end]))
+        data = data[end:]
+    return frames
+
+def _decode_all(data: bytes, stream: CompressionStream):
+    decoded = (decode_frame(header, raw, stream) for header, raw in _frames(data))
+    return [obj for obj in decoded if obj is not CONTROL_FRAME]
+
+# The card dictionary, as the server and client set it at startup
+@pytest.fixture
+def dictionary():
+    set_preset_dictionary(compression_dictionary())
+    yield
+    set_preset_dictionary(None)
+
+@pytest.fixture
+def pair():
+    left, right = socket.socketpair()
+    left.settimeout(10)
+    right.settimeout(10)
+    yield left, right
+    left.close()
+    right.close()
+
+def test_small_frames_are_sent_raw():
+    header, raw = _frames(encode_frame(SMALL))[0]
+    assert header & (FLAG_COMPRESSED | FLAG_STREAM) == 0
+    assert decode_frame(header, raw, CompressionStream()) == SMALL
+
+def test_shared_frames_compress_without_a_dictionary():
+    header, raw = _frames(encode_frame(BIG))[0]
+    assert header & FLAG_COMPRESSED and not header & FLAG_STREAM
+    assert len(raw) == header & LENGTH_MASK
+    assert zlib.decompress(raw) == protocol.serialize_message(BIG)
+
+def test_stream_opens_with_hello_and_switches_once_the_peer_matches(dictionary):
+    sender, receiver = CompressionStream(), CompressionStream()
+    first = encode_frame(BIG, stream=sender)
+    assert [header & (FLAG_COMPRESSED | FLAG_STREAM) for header, _ in _frames(first)] == [FLAG_STREAM, FLAG_COMPRESSED | FLAG_STREAM]
+    assert _decode_all(first + encode_frame(BIG, stream=sender), receiver) == [BIG, BIG]
+    assert not sender.using_dictionary
+    # The peer's hello names the same dictionary
+    _decode_all(encode_frame(SMALL, stream=receiver), sender)
+    switched = encode_frame(BIG, stream=sender)
+    assert sender.using_dictionary and len(_frames(switched)) == 2
+    assert _decode_all(switched + encode_frame(BIG, stream=sender), receiver) == [BIG, BIG]
+
+def test_peers_with_other_dictionaries_fall_back_to_none(dictionary):
+    sender, receiver = CompressionStream(), CompressionStream()
+    sender.on_control({"control": "hello", "dictionary": "some other card data"})
+    frames = encode_frame(BIG, stream=sender) + encode_frame(BIG, stream=sender)
+    assert not sender.using_dictionary
+    assert _decode_all(frames, receiver) == [BIG, BIG]
+    with pytest.raises(ValueError):
+        receiver.on_control({"control": "switch", "dictionary": "some other card data"})
+
+def test_round_trip_over_a_socket_skips_control_frames(pair, dictionary):
+    left, right = pair
+    messages = [SMALL, BIG, BIG, SMALL]
+    # Both directions at once, so each side switches part way through
+    sender = threading.Thread(target=lambda: [send_obj(right, msg) for msg in messages])
+    sender.start()
+    for msg in messages:
+        send_obj(left, msg)
+        assert recv_obj(left) == msg
+    sender.join()
+    assert [recv_obj(right) for _ in messages] == messages
+    assert protocol.stream_for(left).using_dictionary
+
+def test_streams_never_switch_without_a_dictionary():
+    sender, receiver = CompressionStream(), CompressionStream()
+    _decode_all(encode_frame(SMALL, stream=receiver), sender)
+    assert _decode_all(encode_frame(BIG, stream=sender), receiver) == [BIG]
+    assert not sender.using_dictionary
+    with pytest.raises(ValueError):
+        receiver.on_control({"control": "switch", "dictionary": None})
+
+def test_oversized_frames_are_refused(monkeypatch):
+    monkeypatch.setattr(protocol, "MAX_MESSAGE_BYTES", 1024)
+    with pytest.raises(ValueError):
+        protocol.check_frame_length(2048)
+    # Small on the wire, but inflating past the limit
+    header, raw = _frames(encode_frame({"type": "state_update", "padding": bytes(4096)}))[0]
+    assert header & FLAG_COMPRESSED and len(raw) < 1024
+    with pytest.raises(ValueError):
+        decode_frame(header, raw, CompressionStream())
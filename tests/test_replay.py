@@ -0,0 +1,100 @@
+# External Imports
+import random
+
+import pytest
+
+# Internal Imports
+from game.flow import drive
+from game.headless import PolicyConnection, greedy_adventure_plan, random_placement_plan
+from game.init import build_game_state, deck_choice_from_decklist, deck_choice_from_names, prepare_match
+from game.phases import play_game
+from game.replay import Replayer, ReplayError, ReplayWriter
+from resources.loader import card_pool, load_decks
+
+SEED = 5
+
+def _policy(state, player, rng):
+    if state.check_path_between_gates():
+        return greedy_adventure_plan(state, player, rng)
+    return random_placement_plan(state, player, rng)
+
+# What a state looks like from outside, as plain values that compare by content
+def _snapshot(state):
+    players = tuple(
+        ([c.name for c in p.hand], [c.name for c in p.exp_deck], [c.name for c in p.adventure_deck],
+         p.echoes, [(u.name, getattr(u, "health", None)) for u in p.hero_area + p.staging_area])
+        for p in state.players
+    )
+    board = sorted((pos, tile["card"].name, tile["face_up"]) for pos, tile in state.map.items())
+    occupants = sorted((pos, [(owner, unit.name) for owner, unit in units])
+                       for pos, units in state.occupants.items() if units)
+    return state.turn, state.active_player, players, board, occupants
+
+# Play one bot match to the end, recording it to `path`. Returns the snapshot and the RNG
+# state at the start of every turn after the first, by turn.
+def _record_match(path, checkpoint_every=4, card_digest=None, choices=None):
+    pool = card_pool()
+    if choices is None:
+        choices = [deck_choice_from_names(pool["heroes"][i].name, pool["gates"][i].name) for i in range(2)]
+    rng = random.Random(SEED)
+    state, _ = build_game_state(choices[0], choices[1], rng=rng, board_size=(7, 7))
+    prepare_match(state)
+    writer = ReplayWriter(path, "replay-test", SEED, tuple(choices), rng=rng, checkpoint_every=checkpoint_every,
+                          board_size=(7, 7), card_version=state.card_version,
+                          card_digest=state.card_digest if card_digest is None else card_digest)
+    conns = (PolicyConnection(state, "Player1", _policy, rng), PolicyConnection(state, "Player2", _policy, rng))
+    seen = {}
+
+    def after_turn(s):
+        seen[s.turn] = (_snapshot(s), rng.getstate())
+
+    drive(play_game(state, conns, recorder=writer, after_turn=after_turn),
+          lambda player: conns[0 if player == "Player1" else 1])
+    return state, seen
+
+def test_run_reproduces_the_live_match(tmp_path):
+    live, _ = _record_match(tmp_path / "match.ror")
+    replayer = Replayer(tmp_path / "match.ror")
+    assert replayer.result["winner"] == live.adventure_winner()
+    assert _snapshot(replayer.run()) == _snapshot(live)
+
+def test_chosen_decks_are_dealt_again_from_the_header(tmp_path):
+    choices = [deck_choice_from_decklist(entry) for entry in load_decks()[:2]]
+    live, seen = _record_match(tmp_path / "match.ror", choices=choices)
+    replayer = Replayer(tmp_path / "match.ror")
+    for deck, choice in zip(replayer.header["decks"], choices):
+        assert [line["name"] for line in deck["exp_deck"] for _ in range(line["count"])] == \
+            [card.name for card in choice["exp_deck"]]
+    assert _snapshot(replayer.seek(min(seen))) == seen[min(seen)][0]
+    assert _snapshot(replayer.run()) == _snapshot(live)
+
+def test_replays_with_only_hero_and_gate_names_still_load(tmp_path):
+    live, _ = _record_match(tmp_path / "match.ror")
+    replayer = Replayer(tmp_path / "match.ror")
+    replayer.header["decks"] = [(deck["hero_name"], deck["gate_name"]) for deck in replayer.header["decks"]]
+    assert _snapshot(replayer.run()) == _snapshot(live)
+
+def test_seek_matches_live_states_and_restores_rng(tmp_path):
+    _, seen = _record_match(tmp_path / "match.ror")
+    replayer = Replayer(tmp_path / "match.ror")
+    assert replayer.checkpoints
+    for turn in sorted(seen)[::3]:
+        view, rng_state = seen[turn]
+        assert _snapshot(replayer.seek(turn)) == view
+    # Seeking to a checkpointed turn resumes the match RNG where the live match had it
+    turn = replayer.checkpoints[-1][0]
+    replayer.seek(turn)
+    assert replayer.rng.getstate() == seen[turn][1]
+
+def test_states_walks_every_turn(tmp_path):
+    _, seen = _record_match(tmp_path / "match.ror")
+    replayer = Replayer(tmp_path / "match.ror")
+    walked = {state.turn: _snapshot(state) for state in replayer.states(start=2)}
+    assert walked == {turn: view for turn, (view, _) in seen.items() if turn >= 2}
+
+def test_replay_of_other_card_data_is_refused(tmp_path):
+    _record_match(tmp_path / "match.ror", card_digest="0" * 32)
+    replayer = Replayer(tmp_path / "match.ror")
+    assert replayer.header["card_digest"] == "0" * 32
+    with pytest.raises(ReplayError):
+        replayer.run()
@@ -0,0 +1,146 @@
+# External Imports
+import socket
+import sqlite3
+
+import pytest
+
+# Internal Imports
+import server
+from game.headless import new_headless_match
+from game.persistence import CheckpointStore
+from network.match_loop import MatchLoop
+from network.protocol import recv_obj
+from network.sessions import ReconnectTable, token_digest
+
+TOKENS = ("token-one", "token-two")
+
+@pytest.fixture
+def store(tmp_path):
+    store = CheckpointStore(tmp_path / "matches.sqlite3")
+    yield store
+    store.close()
+
+# A match checkpointed at its first turn, with a token for each seat
+def _saved_match(store, match_id="m1", seed=7):
+    state, conns = new_headless_match(seed)
+    state.match_id = match_id
+    store.save(match_id, seed, state, conns[0].rng)
+    store.seat(match_id, [token_digest(token) for token in TOKENS])
+    store.flush()
+    return state
+
+def _claim(player, token, match_id="m1"):
+    return {"resume": match_id, "player": player, "token": token}
+
+def test_checkpoint_round_trip_keeps_seats(store):
+    state = _saved_match(store)
+    store.save("m1", 7, state)
+    store.flush()
+    (saved,) = store.unfinished_matches()
+    assert (saved.match_id, saved.seed, saved.turn) == ("m1", 7, state.turn)
+    assert saved.seats == tuple(token_digest(token) for token in TOKENS)
+    store.finish("m1")
+    store.flush()
+    assert store.unfinished_matches() == []
+
+def test_store_adds_seats_to_older_databases(tmp_path):
+    path = tmp_path / "old.sqlite3"
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE matches (match_id TEXT PRIMARY KEY, seed INTEGER NOT NULL, status TEXT NOT NULL, "
+                   "turn INTEGER NOT NULL, snapshot BLOB, updated_at REAL NOT NULL)")
+    store = CheckpointStore(path)
+    try:
+        _saved_match(store)
+        assert store.unfinished_matches()[0].seats
+    finally:
+        store.close()
+
+def test_claims_need_the_seat_token(store):
+    _saved_match(store)
+    ready = []
+    table = ReconnectTable(lambda saved, conn1, conn2: ready.append((conn1, conn2)))
+    table.expect(store.unfinished_matches())
+    assert table.claim("a", _claim("Player1", TOKENS[1])) is not None
+    assert table.claim("a", _claim("Player3", TOKENS[0])) is not None
+    assert table.claim("a", _claim("Player1", TOKENS[0], match_id="other")) is not None
+    assert table.claim("a", {"resume": "m1", "player": "Player1"}) is not None
+    assert ready == [] and table.waiting() == 1
+
+def test_pair_is_seated_by_token_not_arrival_order(store):
+    _saved_match(store)
+    ready = []
+    table = ReconnectTable(lambda saved, conn1, conn2: ready.append((saved.match_id, conn1, conn2)))
+    table.expect(store.unfinished_matches())
+    assert table.claim("second", _claim("Player2", TOKENS[1])) is None
+    assert ready == []
+    assert table.claim("first", _claim("Player1", TOKENS[0])) is None
+    assert ready == [("m1", "first", "second")]
+    assert table.waiting() == 0
+    # The match is no longer waiting, so its seats can't be claimed again
+    assert table.claim("late", _claim("Player1", TOKENS[0])) is not None
+
+def test_reconnecting_while_waiting_replaces_the_held_connection(store):
+    _saved_match(store)
+    table = ReconnectTable(lambda *args: None)
+    table.expect(store.unfinished_matches())
+    old, other = socket.socketpair()
+    try:
+        assert table.claim(old, _claim("Player1", TOKENS[0])) is None
+        assert table.claim("new", _claim("Player1", TOKENS[0])) is None
+        assert old.fileno() == -1
+    finally:
+        other.close()
+
+def test_resumed_match_reaches_each_player_in_their_seat(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(server, "REPLAY_DIR", tmp_path / "replays")
+    state = _saved_match(store)
+    loop = MatchLoop()
+    loop.start()
+    table = ReconnectTable(server.resume_on(loop, store))
+    table.expect(store.unfinished_matches())
+    pairs = {label: socket.socketpair() for label in ("Player1", "Player2")}
+    try:
+        # Player2 gets back first; it must still get Player2's view
+        for label, token in (("Player2", TOKENS[1]), ("Player1", TOKENS[0])):
+            assert table.claim(pairs[label][0], _claim(label, token)) is None
+        for label, (_, client) in pairs.items():
+            client.settimeout(10)
+            resume = recv_obj(client)
+            assert resume == {"type": "resume", "match_id": "m1", "turn": state.turn}
+            update = recv_obj(client)
+            assert update["type"] == "state_update" and update["player"] == label
+    finally:
+        for _, client in pairs.values():
+            client.close()
+    assert loop.wait_idle(10)
+
+def test_workers_share_one_store_and_tag_their_matches(tmp_path):
+    path = tmp_path / "matches.sqlite3"
+    stores = [CheckpointStore(path, owner=worker) for worker in (0, 1)]
+    try:
+        _saved_match(stores[1], "m1")
+        _saved_match(stores[0], "m2")
+        assert {saved.match_id: saved.owner for saved in stores[0].unfinished_matches()} == {"m1": 1, "m2": 0}
+        assert stores[0].owner_of("m1") == (True, 1)
+        stores[1].finish("m1")
+        stores[1].flush()
+        assert stores[0].owner_of("m1") == (False, None)
+    finally:
+        for store in stores:
+            store.close()
+
+def test_rejoins_are_sent_to_the_worker_that_owns_the_match(tmp_path):
+    path = tmp_path / "matches.sqlite3"
+    stores = [CheckpointStore(path, owner=worker) for worker in (0, 1)]
+    try:
+        _saved_match(stores[1], "m1")
+        tables = [ReconnectTable(lambda *args: None, server.owner_port(store, worker, 2))
+                  for worker, store in enumerate(stores)]
+        for worker, table in enumerate(tables):
+            table.expect(saved for saved in stores[worker].unfinished_matches() if saved.owner == worker)
+        assert tables[0].redirect("m1") == server.WORKER_PORT + 1
+        assert tables[1].redirect("m1") is None
+        assert tables[0].redirect("unknown") is None
+    finally:
+        for store in stores:
+            store.close()
@@ -0,0 +1,136 @@
+# External Imports
+import socket
+import threading
+
+import pytest
+
+# Internal Imports
+from network.broadcast import Broadcaster, LiveMatches, SpectatorFeed, make_frame
+from network.protocol import recv_obj, send_obj
+from network.server_core import serve_spectators, start_server
+
+@pytest.fixture
+def pair():
+    left, right = socket.socketpair()
+    right.settimeout(5.0)
+    yield left, right
+    left.close()
+    right.close()
+
+def test_players_get_every_message(pair):
+    player, client = pair
+    broadcaster = Broadcaster([player])
+    try:
+        broadcaster.broadcast({"type": "state_update", "turn": 1})
+        broadcaster.broadcast({"type": "prompt"})
+        assert recv_obj(client) == {"type": "state_update", "turn": 1}
+        assert recv_obj(client) == {"type": "prompt"}
+    finally:
+        broadcaster.close()
+
+def test_late_spectators_start_from_the_last_keyframe(pair):
+    spectator, client = pair
+    broadcaster = Broadcaster([])
+    try:
+        broadcaster.broadcast({"type": "state_update", "turn": 1})
+        broadcaster.broadcast({"type": "state_update", "turn": 2})
+        broadcaster.broadcast({"type": "gate_placed"})
+        broadcaster.add_spectator(spectator)
+        broadcaster.broadcast({"type": "reveal"})
+        assert recv_obj(client) == {"type": "state_update", "turn": 2}
+        assert recv_obj(client) == {"type": "reveal"}
+    finally:
+        broadcaster.close()
+
+def test_slow_feeds_drop_their_backlog_and_resync():
+    feed = SpectatorFeed(None, max_frames=2)
+    keyframe = make_frame({"type": "state_update", "turn": 3})
+    for step in range(2):
+        feed.push(make_frame({"type": "reveal", "step": step}), keyframe)
+    feed.push(make_frame({"type": "reveal", "step": 2}), keyframe)
+    assert feed.dropped == 2
+    assert [frame.keyframe for frame in feed.frames] == [True, False]
+
+@pytest.fixture
+def live():
+    matches = LiveMatches()
+    broadcasters = {match_id: Broadcaster([]) for match_id in ("first", "second")}
+    for match_id, broadcaster in broadcasters.items():
+        matches.add(match_id, broadcaster)
+    yield matches, broadcasters
+    for broadcaster in broadcasters.values():
+        broadcaster.close()
+
+@pytest.fixture
+def spectator_port(live):
+    srv = start_server("127.0.0.1", 0, backlog=8)
+    serve_spectators(srv, live[0], choice_timeout=5.0)
+    yield srv.getsockname()[1]
+    srv.close()
+
+def _watch(port, match_id):
+    conn = socket.create_connection(("127.0.0.1", port))
+    conn.settimeout(5.0)
+    listing = recv_obj(conn)
+    send_obj(conn, {"watch": match_id})
+    return conn, listing
+
+def test_spectator_lists_matches_and_watches_the_one_chosen(live, spectator_port):
+    _, broadcasters = live
+    conn, listing = _watch(spectator_port, "first")
+    try:
+        assert listing == {"type": "matches", "matches": [{"match_id": "first", "spectators": 0},
+                                                          {"match_id": "second", "spectators": 0}]}
+        for _ in range(50):
+            if broadcasters["first"].spectator_count():
+                break
+            threading.Event().wait(0.02)
+        broadcasters["second"].broadcast({"type": "state_update", "state": "second"})
+        broadcasters["first"].broadcast({"type": "state_update", "state": "first"})
+        assert recv_obj(conn) == {"type": "state_update", "state": "first"}
+    finally:
+        conn.close()
+
+def test_unknown_or_finished_matches_are_refused(live, spectator_port):
+    matches, broadcasters = live
+    conn, _ = _watch(spectator_port, "missing")
+    try:
+        assert recv_obj(conn)["type"] == "watch_refused"
+    finally:
+        conn.close()
+    # A match that ended after the listing was sent
+    broadcasters["second"].close()
+    conn, _ = _watch(spectator_port, "second")
+    try:
+        assert recv_obj(conn)["type"] == "watch_refused"
+    finally:
+        conn.close()
+
+def test_registry_survives_concurrent_changes():
+    matches = LiveMatches()
+    stop = threading.Event()
+    errors = []
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            matches.add(f"m{i}", Broadcaster([]))
+            matches.remove(f"m{i - 3}")
+            i += 1
+
+    def read():
+        try:
+            while not stop.is_set():
+                matches.listing()
+                matches.latest()
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=churn), threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    threading.Event().wait(0.3)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == [] and len(matches) <= 4
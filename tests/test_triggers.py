@@ -0,0 +1,39 @@
+# External Imports
+import pickle
+from types import SimpleNamespace
+
+# Internal Imports
+from game.triggers import ON_ENTER, ON_EXIT, ON_OCCUPY, TriggerContext, TriggerIndex, compile_rules
+
+PENALTY = ("Entry Penalty: Requires 2 Movement to enter. Take 1 damage. "
+           "Occupy Penalty: If Defense is less than 3, at end of turn take 2 damage.")
+
+def test_sections_compile_to_costs_and_effects():
+    rules = compile_rules(PENALTY)
+    assert rules.events == {ON_ENTER, ON_OCCUPY}
+    ctx = TriggerContext(None, "Player1", SimpleNamespace(keywords=()), (0, 0))
+    rules.apply_costs(ON_ENTER, SimpleNamespace(terrain="Swamp"), ctx)
+    assert ctx.cost == 2 and not ctx.free
+
+def test_free_movement_and_unmatched_text():
+    rules = compile_rules("Units do not require Movement to enter or exit this Ruin. Sing a song.")
+    assert rules.events == {ON_ENTER, ON_EXIT}
+    assert not rules.effects
+    assert not compile_rules("Nothing here applies")
+
+def test_rules_are_shared_and_pickle_as_their_text():
+    # Called the way the loader calls it (game.triggers.compile_ruin_rules)
+    rules = compile_rules(PENALTY, "", "", "", "", "")
+    assert compile_rules(PENALTY, "", "", "", "", "") is rules
+    assert pickle.loads(pickle.dumps(rules)) is rules
+
+def test_index_only_holds_face_up_tiles_with_rules():
+    card = SimpleNamespace(rules=compile_rules(PENALTY))
+    plain = SimpleNamespace(rules=None)
+    index = TriggerIndex.from_map({(0, 0): {"card": card, "face_up": True},
+                                   (0, 1): {"card": card, "face_up": False},
+                                   (0, 2): {"card": plain, "face_up": True}})
+    assert index.subscribers(ON_ENTER) == [((0, 0), card)]
+    assert index.subscriber(ON_EXIT, (0, 0)) is None
+    index.unregister_tile((0, 0))
+    assert index.subscribers(ON_OCCUPY) == []
@@ -0,0 +1,89 @@
+# External Imports
+import argparse
+import json
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# Pack without opening a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+# Allow running from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Internal Imports
+from config import ART_DIR, ATLAS_DIR, ATLAS_PAGE_SIZE, ATLAS_CARD_SIZE
+from resources.loader import card_pool
+from ui.atlas import MANIFEST, art_key
+from utils import setup_logging
+
+ART_SUFFIXES = (".png", ".jpg", ".jpeg", ".bmp", ".webp")
+
+# Art files in `art_dir` by card key
+def find_art(art_dir: Path) -> Dict[str, Path]:
+    if not art_dir.is_dir():
+        return {}
+    return {art_key(path.stem): path for path in sorted(art_dir.iterdir()) if path.suffix.lower() in ART_SUFFIXES}
+
+# Every named card in the pool
+def card_names() -> Iterable[str]:
+    return sorted({card.name for cards in card_pool().values() for card in cards if card.name})
+
+# Scale each card's art to card_size and pack the cells row by row into pages of page_size,
+# the last page cut down to the rows it uses. Writes page-N.png files and the manifest to
+# out_dir and returns the manifest.
+def build_atlas(art_dir: Path = ART_DIR, out_dir: Path = ATLAS_DIR, card_size: Tuple[int, int] = ATLAS_CARD_SIZE,
+                page_size: Tuple[int, int] = ATLAS_PAGE_SIZE, names: Optional[Iterable[str]] = None) -> dict:
+    logger = logging.getLogger("BuildAtlas")
+    art = find_art(Path(art_dir))
+    keys = [art_key(name) for name in (names if names is not None else card_names())]
+    packed = [key for key in keys if key in art]
+    missing = [key for key in keys if key not in art]
+    if not art:
+        logger.warning("No art found in %s", art_dir)
+    elif missing:
+        logger.info("%d cards have no art: %s", len(missing), ", ".join(missing))
+
+    w, h = card_size
+    cols, rows = page_size[0] // w, page_size[1] // h
+    if not cols or not rows:
+        raise ValueError(f"Cards of {w}x{h} don't fit on a {page_size[0]}x{page_size[1]} page")
+    per_page = cols * rows
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"card_size": [w, h], "pages": [], "cards": {}}
+    for first in range(0, len(packed), per_page):
+        chunk = packed[first:first + per_page]
+        index = len(manifest["pages"])
+        used_rows = (len(chunk) + cols - 1) // cols
+        page = pygame.Surface((cols * w, used_rows * h), pygame.SRCALPHA)
+        for i, key in enumerate(chunk):
+            x, y = (i % cols) * w, (i // cols) * h
+            image = pygame.image.load(str(art[key]))
+            # smoothscale needs 32-bit pixels; source files may be paletted
+            full = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+            full.blit(image, (0, 0))
+            page.blit(pygame.transform.smoothscale(full, (w, h)), (x, y))
+            manifest["cards"][key] = [index, x, y, w, h]
+        filename = f"page-{index}.png"
+        pygame.image.save(page, str(out_dir / filename))
+        manifest["pages"].append(filename)
+
+    (out_dir / MANIFEST).write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    logger.info("Packed %d cards into %d pages in %s", len(packed), len(manifest["pages"]), out_dir)
+    return manifest
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack card art into texture atlas pages for the client")
+    parser.add_argument("--art", type=Path, default=ART_DIR, help="Folder of art files named after their cards")
+    parser.add_argument("--output", type=Path, default=ATLAS_DIR)
+    args = parser.parse_args()
+    setup_logging()
+    build_atlas(args.art, args.output)
+
+if __name__ == "__main__":
+    main()
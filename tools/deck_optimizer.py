@@ -0,0 +1,238 @@
+# External Imports
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Allow running from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Internal Imports
+from config import DECK_SIZE, ADVENTURE_COPY_LIMIT
+from game.board import parse_board_size
+from game.headless import play_headless_match
+from game.init import deck_choice_from_decklist, deck_choice_from_names
+from game.state import adventure_eligible
+from resources.loader import card_pool, load_decks
+from utils import setup_logging
+
+ADVENTURE_SETS = ("minions", "gears", "spells", "relics", "glyphs")
+
+# A deck as card name -> copies
+Counts = Dict[str, int]
+
+# Most copies of each card a deck for this hero may hold. Unnamed placeholder cards are left out.
+def deck_limits(hero) -> Tuple[Counts, Counts]:
+    pool = card_pool()
+    exp_limits = {card.name: card.limit for card in pool["ruins"] if card.name}
+    adv_limits = {card.name: ADVENTURE_COPY_LIMIT for key in ADVENTURE_SETS for card in pool[key]
+                  if card.name and adventure_eligible(card, hero)}
+    for deck, limits in (("Explore", exp_limits), ("Adventure", adv_limits)):
+        if sum(limits.values()) < DECK_SIZE:
+            raise ValueError(f"Not enough {deck} cards for {hero.name} to build a {DECK_SIZE}-card deck")
+    return exp_limits, adv_limits
+
+# Bring a deck back within its limits and to exactly DECK_SIZE cards, adding and removing random copies
+def repair(counts: Counts, limits: Counts, rng: random.Random) -> Counts:
+    counts = {name: min(n, limits[name]) for name, n in counts.items() if name in limits and n > 0}
+    total = sum(counts.values())
+    while total > DECK_SIZE:
+        name = rng.choice([name for name, n in counts.items() for _ in range(n)])
+        counts[name] -= 1
+        if not counts[name]:
+            del counts[name]
+        total -= 1
+    while total < DECK_SIZE:
+        name = rng.choice([name for name, limit in limits.items() if counts.get(name, 0) < limit])
+        counts[name] = counts.get(name, 0) + 1
+        total += 1
+    return counts
+
+def random_deck(limits: Counts, rng: random.Random) -> Counts:
+    return repair({}, limits, rng)
+
+# Uniform crossover: each card's copy count comes from one parent or the other
+def crossover(a: Counts, b: Counts, limits: Counts, rng: random.Random) -> Counts:
+    child = {name: (a if rng.random() < 0.5 else b).get(name, 0) for name in sorted(set(a) | set(b))}
+    return repair(child, limits, rng)
+
+# Swap up to `swaps` copies for other cards
+def mutate(counts: Counts, limits: Counts, rng: random.Random, swaps: int = 2) -> Counts:
+    counts = dict(counts)
+    for _ in range(rng.randint(0, swaps)):
+        name = rng.choice([name for name, n in counts.items() for _ in range(n)])
+        counts[name] -= 1
+    return repair(counts, limits, rng)
+
+# A decks.json entry for a candidate
+def deck_entry(name: str, hero_name: str, gate_name: str, exp: Counts, adv: Counts) -> dict:
+    return {
+        "name": name,
+        "hero_name": hero_name,
+        "gate_name": gate_name,
+        "exp_deck": [{"name": card, "count": n} for card, n in sorted(exp.items())],
+        "adventure_deck": [{"name": card, "count": n} for card, n in sorted(adv.items())],
+    }
+
+# Fitness cache key: the decklists plus everything else the score depends on
+def fitness_key(entry: dict, settings: dict) -> str:
+    payload = json.dumps({**entry, "name": "", "settings": settings}, sort_keys=True)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+# Score of `entry` against every opponent: wins count 1, unfinished matches 1/2. Each pairing is
+# played from both seats on the same seeds for every candidate, so candidates face identical draws.
+def evaluate(entry: dict, opponents: Sequence[dict], settings: dict) -> float:
+    me = deck_choice_from_decklist(entry)
+    score = 0.0
+    for i, opponent in enumerate(opponents):
+        them = deck_choice_from_decklist(opponent)
+        for game in range(settings["games"]):
+            seat = game % 2
+            choices = (me, them) if seat == 0 else (them, me)
+            seed = settings["seed"] + i * settings["games"] + game // 2
+            winner = play_headless_match(seed, choices, settings["board_size"], settings["max_turns"])
+            if winner is None:
+                score += 0.5
+            elif winner == ("Player1", "Player2")[seat]:
+                score += 1.0
+    return score / (len(opponents) * settings["games"])
+
+def _evaluate_task(task) -> float:
+    # Engine steps log warnings for rejected moves; keep worker output quiet
+    logging.disable(logging.WARNING)
+    return evaluate(*task)
+
+# Evolves decklists for one hero and gate against the reference decks. Every generation's
+# uncached candidates are scored in parallel on a process pool.
+class DeckOptimizer:
+    def __init__(self, hero_name: str, gate_name: str, opponents: Sequence[dict], population: int = 32,
+                 elite: int = 2, games: int = 8, seed: int = 0, board_size: Optional[Tuple[int, int]] = None,
+                 max_turns: int = 200, workers: Optional[int] = None, cache: Optional[Dict[str, float]] = None):
+        choice = deck_choice_from_names(hero_name, gate_name)
+        self.hero_name = hero_name
+        self.gate_name = gate_name
+        self.opponents = list(opponents)
+        self.population = population
+        self.elite = elite
+        self.workers = workers
+        self.rng = random.Random(seed)
+        self.settings = {"games": games, "seed": seed, "board_size": board_size, "max_turns": max_turns,
+                         "opponents": [opponent["name"] for opponent in self.opponents]}
+        self.exp_limits, self.adv_limits = deck_limits(choice["hero"])
+        self.cache = cache if cache is not None else {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def _entry(self, genome, name: str = "") -> dict:
+        return deck_entry(name, self.hero_name, self.gate_name, genome[0], genome[1])
+
+    # Fitness of each genome, evaluating only decklists not already in the cache
+    def score(self, genomes, executor) -> List[float]:
+        entries = [self._entry(genome) for genome in genomes]
+        keys = [fitness_key(entry, self.settings) for entry in entries]
+        todo = {key: entry for key, entry in zip(keys, entries) if key not in self.cache}
+        tasks = [(entry, self.opponents, self.settings) for entry in todo.values()]
+        for key, fitness in zip(todo, executor.map(_evaluate_task, tasks)):
+            self.cache[key] = fitness
+        self.logger.debug("Scored %d new decklists, %d from cache", len(todo), len(keys) - len(todo))
+        return [self.cache[key] for key in keys]
+
+    def _tournament(self, ranked, size: int = 3):
+        return max(self.rng.sample(ranked, min(size, len(ranked))), key=lambda pair: pair[0])[1]
+
+    def _child(self, ranked):
+        a, b = self._tournament(ranked), self._tournament(ranked)
+        exp = mutate(crossover(a[0], b[0], self.exp_limits, self.rng), self.exp_limits, self.rng)
+        adv = mutate(crossover(a[1], b[1], self.adv_limits, self.rng), self.adv_limits, self.rng)
+        return exp, adv
+
+    # Run the search and return (fitness, decks.json entry) pairs, best first
+    def run(self, generations: int, seeds: Sequence[dict] = ()) -> List[Tuple[float, dict]]:
+        genomes = [(repair(_counts(entry["exp_deck"]), self.exp_limits, self.rng),
+                    repair(_counts(entry["adventure_deck"]), self.adv_limits, self.rng)) for entry in seeds]
+        while len(genomes) < self.population:
+            genomes.append((random_deck(self.exp_limits, self.rng), random_deck(self.adv_limits, self.rng)))
+        genomes = genomes[:self.population]
+
+        with ProcessPoolExecutor(self.workers) as executor:
+            for generation in range(generations + 1):
+                ranked = sorted(zip(self.score(genomes, executor), genomes), key=lambda pair: -pair[0])
+                self.logger.info("Generation %d: best %.3f, mean %.3f", generation, ranked[0][0],
+                                 sum(fitness for fitness, _ in ranked) / len(ranked))
+                if generation == generations:
+                    break
+                genomes = [genome for _, genome in ranked[:self.elite]]
+                while len(genomes) < self.population:
+                    genomes.append(self._child(ranked))
+        return [(fitness, self._entry(genome)) for fitness, genome in ranked]
+
+def _counts(lines) -> Counts:
+    counts: Counts = {}
+    for line in lines:
+        counts[line["name"]] = counts.get(line["name"], 0) + line["count"]
+    return counts
+
+def _load_cache(path: Optional[Path]) -> Dict[str, float]:
+    if path is None or not path.exists():
+        return {}
+    return json.loads(path.read_text())
+
+# Append entries to a decks.json-style file, creating it if needed
+def write_decks(path: Path, entries: Sequence[dict]):
+    data = json.loads(path.read_text()) if path.exists() else {"decks": []}
+    data["decks"].extend(entries)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+
+def main():
+    parser = argparse.ArgumentParser(description="Evolve Explore and Adventure decklists by simulated win rate")
+    parser.add_argument("--base", help="Reference deck whose hero and gate to build for (default: the first)")
+    parser.add_argument("--hero", help="Hero name (overrides --base)")
+    parser.add_argument("--gate", help="Gate name (overrides --base)")
+    parser.add_argument("--population", type=int, default=32)
+    parser.add_argument("--generations", type=int, default=20)
+    parser.add_argument("--elite", type=int, default=2, help="Best decks carried unchanged into the next generation")
+    parser.add_argument("--games", type=int, default=8, help="Matches per reference deck, alternating seats")
+    parser.add_argument("--max-turns", type=int, default=200, help="Unfinished matches after this many turns count as draws")
+    parser.add_argument("--board-size", type=parse_board_size, default=None, metavar="ROWSxCOLS")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--top", type=int, default=1, help="Number of decks to output")
+    parser.add_argument("--name", default="Evolved", help="Name prefix for the output decks")
+    parser.add_argument("--cache", type=Path, help="JSON file of fitness scores by decklist hash, reused across runs")
+    parser.add_argument("--output", type=Path, help="Append the decks to this decks.json-style file (default: print)")
+    args = parser.parse_args()
+    setup_logging()
+
+    references = load_decks()
+    base = next((deck for deck in references if deck["name"] == args.base), None) if args.base else references[0]
+    if base is None:
+        parser.error(f"No reference deck named {args.base!r}")
+    hero_name = args.hero or base["hero_name"]
+    gate_name = args.gate or base["gate_name"]
+
+    cache = _load_cache(args.cache)
+    optimizer = DeckOptimizer(hero_name, gate_name, references, population=args.population, elite=args.elite,
+                              games=args.games, seed=args.seed, board_size=args.board_size,
+                              max_turns=args.max_turns, workers=args.workers, cache=cache)
+    seeds = [deck for deck in references if (deck["hero_name"], deck["gate_name"]) == (hero_name, gate_name)]
+    ranked = optimizer.run(args.generations, seeds=seeds)
+    if args.cache:
+        args.cache.write_text(json.dumps(cache))
+
+    entries = []
+    for i, (fitness, entry) in enumerate(ranked[:args.top]):
+        entry["name"] = f"{args.name} {hero_name}" + (f" {i + 1}" if args.top > 1 else "")
+        logging.getLogger("DeckOptimizer").info("%s: %.1f%% against the reference decks", entry["name"], 100 * fitness)
+        entries.append(entry)
+    if args.output:
+        write_decks(args.output, entries)
+    else:
+        print(json.dumps({"decks": entries}, indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,328 @@
+# External Imports
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import shlex
+import subprocess
+import sys
+import threading
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+# Allow running from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Internal Imports
+from config import SERVER_PORT
+from game.client_policy import respond
+from network.protocol import (
+    CONTROL_FRAME, CompressionStream, check_frame_length, decode_frame, encode_frame, set_preset_dictionary,
+)
+from resources.loader import compression_dictionary
+from utils import setup_logging
+
+SERVER_HOST = "127.0.0.1"
+SERVER_SCRIPT = Path(__file__).resolve().parent.parent / "server.py"
+
+# What one stage of the ramp saw. Matches and turns are counted from the Player1 seat only,
+# so each is counted once; latencies come from both seats.
+@dataclass
+class StageStats:
+    clients: int
+    seconds: float = 0.0
+    matches: int = 0
+    turns: int = 0
+    errors: int = 0
+    latencies: List[float] = field(default_factory=list)
+    rss: Optional[int] = None
+
+    def merge(self, other: "StageStats"):
+        self.clients += other.clients
+        self.seconds = max(self.seconds, other.seconds)
+        self.matches += other.matches
+        self.turns += other.turns
+        self.errors += other.errors
+        self.latencies.extend(other.latencies)
+
+# Value at quantile q of an already sorted list
+def percentile(values: Sequence[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+# Resident memory of a process and all its descendants in bytes, from /proc (Linux only)
+def process_rss(pid: int) -> Optional[int]:
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+    except (OSError, StopIteration):
+        return None
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children += [int(child) for child in f.read().split()]
+    except OSError:
+        pass
+    return rss + sum(process_rss(child) or 0 for child in children)
+
+# Peak server RSS over time, sampled on a thread while the bots run
+class RssSampler:
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            rss = process_rss(self.pid)
+            if rss is not None:
+                self.samples.append((time.time(), rss))
+            if self._stop.wait(self.interval):
+                break
+
+    def peak(self, start: float, end: float) -> Optional[int]:
+        return max((rss for at, rss in self.samples if start <= at <= end), default=None)
+
+async def read_message(reader: asyncio.StreamReader, stream: CompressionStream):
+    while True:
+        header = int.from_bytes(await reader.readexactly(4), 'big')
+        raw = await reader.readexactly(check_frame_length(header))
+        message = decode_frame(header, raw, stream)
+        if message is not CONTROL_FRAME:
+            return message
+
+# Shared between a worker's bots: the stage currently collecting their numbers
+class Ramp:
+    def __init__(self):
+        self.stats: Optional[StageStats] = None
+
+# Connect, pick a random hero and gate, and answer prompts like client.py until the match ends
+async def play_match(host: str, port: int, bot_id: str, rng: random.Random, ramp: Ramp):
+    reader, writer = await asyncio.open_connection(host, port)
+    stream = CompressionStream()
+    try:
+        options = await read_message(reader, stream)
+        choice = {'hero': rng.choice(options['heroes']), 'gate': rng.choice(options['gates'])}
+        # Bots play as unrated guests, so runs don't fill the ratings file with their names
+        writer.write(encode_frame({'deck_choice': choice}, stream=stream))
+        await writer.drain()
+
+        player_id = state_obj = None
+        last_turn = None
+        while True:
+            data = await read_message(reader, stream)
+            if data.get('type') == 'state_update':
+                player_id = player_id or data.get('player')
+                state_obj = data['state']
+                # Bots answer at once, so the gap between turns is the server's turn time
+                now = time.perf_counter()
+                if last_turn is not None:
+                    ramp.stats.latencies.append(now - last_turn)
+                    if player_id == "Player1":
+                        ramp.stats.turns += 1
+                last_turn = now
+            elif data.get('type') == 'game_end':
+                if player_id == "Player1":
+                    ramp.stats.matches += 1
+                return
+            elif 'phase' in data:
+                reply = respond(data, state_obj, player_id)
+                if reply is not None:
+                    writer.write(encode_frame(reply, stream=stream))
+                    await writer.drain()
+    finally:
+        writer.close()
+
+# Play matches back to back until cancelled
+async def bot_loop(host: str, port: int, bot_id: str, rng: random.Random, ramp: Ramp):
+    logger = logging.getLogger("LoadTest")
+    while True:
+        try:
+            await play_match(host, port, bot_id, rng, ramp)
+        except (OSError, EOFError, ValueError, zlib.error) as e:
+            ramp.stats.errors += 1
+            logger.debug("%s: match failed: %s", bot_id, e)
+            await asyncio.sleep(rng.uniform(0.5, 1.5))
+
+# Run every stage of the ramp from `start_at` (wall clock), holding each for stage_seconds.
+# Bots are added (or cancelled) at `connect_rate` per second when a stage begins.
+async def run_ramp(stages: Sequence[int], stage_seconds: float, host: str, port: int, start_at: float,
+                   name: str, seed: int, connect_rate: float) -> List[StageStats]:
+    ramp = Ramp()
+    bots = []
+    results = []
+    await asyncio.sleep(max(0.0, start_at - time.time()))
+    try:
+        for i, clients in enumerate(stages):
+            ramp.stats = StageStats(clients)
+            began = time.perf_counter()
+            while len(bots) > clients:
+                bots.pop().cancel()
+            while len(bots) < clients:
+                bot_id = f"{name}-{len(bots)}"
+                rng = random.Random(f"{seed}:{bot_id}")
+                bots.append(asyncio.create_task(bot_loop(host, port, bot_id, rng, ramp)))
+                await asyncio.sleep(1 / connect_rate)
+            await asyncio.sleep(max(0.0, start_at + (i + 1) * stage_seconds - time.time()))
+            ramp.stats.seconds = time.perf_counter() - began
+            results.append(ramp.stats)
+    finally:
+        for bot in bots:
+            bot.cancel()
+        await asyncio.gather(*bots, return_exceptions=True)
+    return results
+
+def _ramp_task(task) -> List[dict]:
+    # Many bots share one process, so their per-message warnings would drown the output
+    logging.disable(logging.WARNING)
+    _raise_file_limit()
+    return [asdict(stats) for stats in asyncio.run(run_ramp(*task))]
+
+# Thousands of sockets need more descriptors than the usual soft limit
+def _raise_file_limit():
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+# Split each stage's clients across worker processes, run them in step and merge what they saw
+def load_test(stages: Sequence[int], stage_seconds: float, host: str = SERVER_HOST, port: int = SERVER_PORT,
+              processes: int = 1, server_pid: Optional[int] = None, seed: int = 0,
+              connect_rate: float = 200.0) -> List[StageStats]:
+    start_at = time.time() + 1.0
+    tasks = []
+    for worker in range(processes):
+        share = [clients // processes + (worker < clients % processes) for clients in stages]
+        tasks.append((share, stage_seconds, host, port, start_at, f"bot{worker}", seed, connect_rate / processes))
+
+    sampler = RssSampler(server_pid) if server_pid else None
+    if sampler:
+        sampler.start()
+    try:
+        with ProcessPoolExecutor(processes) as executor:
+            per_worker = list(executor.map(_ramp_task, tasks))
+    finally:
+        if sampler:
+            sampler.stop()
+
+    results = [StageStats(0) for _ in stages]
+    for worker_stats in per_worker:
+        for stage, stats in zip(results, worker_stats):
+            stage.merge(StageStats(**stats))
+    for i, stage in enumerate(results):
+        stage.latencies.sort()
+        if sampler:
+            stage.rss = sampler.peak(start_at + i * stage_seconds, start_at + (i + 1) * stage_seconds)
+    return results
+
+# Whether something is listening on the TCP port, from /proc (None where that isn't available).
+# Connecting to find out would hand the server a player that leaves at once.
+def port_listening(port: int) -> Optional[bool]:
+    found = None
+    for table in ("/proc/net/tcp", "/proc/net/tcp6"):
+        try:
+            with open(table) as f:
+                lines = f.readlines()[1:]
+        except OSError:
+            continue
+        found = found or any(fields[1].endswith(f":{port:04X}") and fields[3] == "0A"
+                             for fields in (line.split() for line in lines))
+    return found
+
+# Start server.py with the given arguments and wait until it is listening on its game port
+def spawn_server(server_args: str, port: int, log_path: Optional[Path] = None,
+                 timeout: float = 30.0) -> subprocess.Popen:
+    log = open(log_path, "ab") if log_path else subprocess.DEVNULL
+    process = subprocess.Popen([sys.executable, str(SERVER_SCRIPT), *shlex.split(server_args)],
+                               stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with status {process.returncode}")
+        listening = port_listening(port)
+        if listening is None:
+            time.sleep(3.0)
+            break
+        if listening:
+            break
+        time.sleep(0.2)
+    else:
+        process.terminate()
+        raise RuntimeError(f"Server did not start listening on port {port}")
+    return process
+
+def _ms(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds * 1000:.1f}"
+
+def format_report(results: Sequence[StageStats]) -> str:
+    lines = [f"{'clients':>8} {'matches/s':>10} {'turns/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7} {'server RSS':>11}"]
+    for stage in results:
+        rss = "-" if stage.rss is None else f"{stage.rss / 2 ** 20:.1f} MB"
+        lines.append(f"{stage.clients:>8} {stage.matches / stage.seconds:>10.2f} {stage.turns / stage.seconds:>9.1f} "
+                     f"{_ms(percentile(stage.latencies, 0.5)):>8} {_ms(percentile(stage.latencies, 0.99)):>8} "
+                     f"{stage.errors:>7} {rss:>11}")
+    return "\n".join(lines)
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive a server with many bot clients and report how it keeps up")
+    parser.add_argument("--stages", default="10,100,500,1000",
+                        help="Comma-separated client counts to ramp through (default: %(default)s)")
+    parser.add_argument("--stage-seconds", type=float, default=30.0, help="How long each stage runs")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--processes", type=int, default=1,
+                        help="Bot processes; use more when one process can't keep up with its bots")
+    parser.add_argument("--connect-rate", type=float, default=200.0, help="New connections per second")
+    parser.add_argument("--seed", type=int, default=0, help="Seeds the bots' deck picks")
+    parser.add_argument("--spawn", metavar="ARGS", nargs="?", const="--matchmaking",
+                        help="Start server.py with these arguments for the test (default: --matchmaking)")
+    parser.add_argument("--server-log", type=Path, help="Append the spawned server's output to this file")
+    parser.add_argument("--server-pid", type=int, help="Report the RSS of an already running server")
+    parser.add_argument("--json", type=Path, help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    setup_logging()
+    logger = logging.getLogger("LoadTest")
+    # Bots compress against the card dictionary like client.py; forked bot processes inherit it
+    set_preset_dictionary(compression_dictionary())
+
+    stages = [int(part) for part in args.stages.split(",")]
+    server = spawn_server(args.spawn, args.port, args.server_log) if args.spawn is not None else None
+    server_pid = server.pid if server else args.server_pid
+    logger.info("Ramping through %s clients, %.0fs each", ", ".join(map(str, stages)), args.stage_seconds)
+    try:
+        results = load_test(stages, args.stage_seconds, args.host, args.port, processes=args.processes,
+                            server_pid=server_pid, seed=args.seed, connect_rate=args.connect_rate)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    print(format_report(results))
+    if args.json:
+        args.json.write_text(json.dumps([
+            {**{key: value for key, value in asdict(stage).items() if key != "latencies"},
+             "p50": percentile(stage.latencies, 0.5), "p99": percentile(stage.latencies, 0.99)}
+            for stage in results], indent=2))
+
+if __name__ == "__main__":
+    main()
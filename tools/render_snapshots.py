@@ -0,0 +1,54 @@
+# External Imports
+import argparse
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+# Allow running from the repository root or this folder
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Internal Imports
+from config import ATLAS_DIR, SNAPSHOT_DIR, SNAPSHOT_SIZE
+from game.replay import Replayer
+from ui.snapshots import SnapshotRenderer
+from utils import setup_logging
+
+def parse_size(text: str):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+# A PNG of the board at the start of every `every`th turn of each replay, in
+# <output>/<match id>/turn-NNNN.png. Returns how many were written.
+def render_replays(paths, output: Path, renderer: SnapshotRenderer, start: int = 0, every: int = 1) -> int:
+    written = 0
+    for path in paths:
+        replayer = Replayer(path)
+        match_id = replayer.header.get("match_id") or Path(path).stem
+        items = ((f"turn-{state.turn:04d}", state) for state in replayer.states(start)
+                 if (state.turn - start) % every == 0)
+        written += len(renderer.save(items, output / match_id))
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description="Render board snapshots of recorded matches as PNG thumbnails")
+    parser.add_argument("replays", nargs="+", type=Path, help="Replay files (.ror)")
+    parser.add_argument("--output", type=Path, default=SNAPSHOT_DIR)
+    parser.add_argument("--from", dest="start", type=int, default=0, help="First turn to snapshot")
+    parser.add_argument("--every", type=int, default=1, help="Snapshot every Nth turn")
+    parser.add_argument("--size", type=parse_size, default=SNAPSHOT_SIZE, help="Thumbnail size, e.g. 320x240")
+    parser.add_argument("--workers", type=int, default=None, help="Render processes (default: one per CPU)")
+    parser.add_argument("--no-art", action="store_true", help="Plain colours even when an atlas is built")
+    args = parser.parse_args()
+    setup_logging()
+
+    started = time.perf_counter()
+    with SnapshotRenderer(args.workers, size=args.size, atlas_dir=None if args.no_art else ATLAS_DIR) as renderer:
+        written = render_replays(args.replays, args.output, renderer, args.start, max(args.every, 1))
+    elapsed = time.perf_counter() - started
+    logging.getLogger("RenderSnapshots").info("%d snapshots in %.2fs (%.0f/s)", written, elapsed,
+                                              written / elapsed if elapsed else 0.0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+# External Imports
+import json
+import logging
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+# Internal Imports
+from config import ATLAS_DIR, ART_CACHE_SIZE
+
+MANIFEST = "atlas.json"
+
+# Card name -> the key art files and atlas cells go by ("Ashen Vale" -> "ashen-vale")
+def art_key(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+# Card art packed into pages by tools/build_atlas.py. A page is decoded the first time one of its
+# cards is drawn; each card is cut from its page and scaled once per size, keeping the most
+# recently drawn `cache_size` results, so a frame of hands and tiles is only blits.
+class CardAtlas:
+    def __init__(self, manifest: dict, directory=ATLAS_DIR, cache_size: int = ART_CACHE_SIZE):
+        self.directory = Path(directory)
+        self.page_files: List[str] = manifest["pages"]
+        # key -> (page, x, y, width, height)
+        self.cells: Dict[str, Tuple[int, int, int, int, int]] = {key: tuple(cell) for key, cell in manifest["cards"].items()}
+        self.cache_size = cache_size
+        self._pages: Dict[int, pygame.Surface] = {}
+        self._scaled: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    # The atlas in `directory`, or None when no art has been built (callers draw plain colours)
+    @classmethod
+    def load(cls, directory=ATLAS_DIR, cache_size: int = ART_CACHE_SIZE) -> Optional["CardAtlas"]:
+        try:
+            manifest = json.loads((Path(directory) / MANIFEST).read_text())
+        except (OSError, ValueError):
+            return None
+        return cls(manifest, directory, cache_size)
+
+    def __contains__(self, name: str) -> bool:
+        return art_key(name) in self.cells
+
+    def _page(self, index: int) -> pygame.Surface:
+        page = self._pages.get(index)
+        if page is None:
+            page = pygame.image.load(str(self.directory / self.page_files[index]))
+            # Converting to the display's format makes every later blit a plain copy
+            if pygame.display.get_surface() is not None:
+                page = page.convert_alpha()
+            self._pages[index] = page
+            self.logger.debug("Loaded atlas page %s", self.page_files[index])
+        return page
+
+    # A card's art scaled to `size`, or None if it has none. `square` takes the top square of
+    # the art instead of the whole card, for board tiles.
+    def art(self, name: str, size: Tuple[int, int], square: bool = False) -> Optional[pygame.Surface]:
+        key = (name, size, square)
+        surface = self._scaled.get(key)
+        if surface is not None:
+            self._scaled.move_to_end(key)
+            return surface
+        cell = self.cells.get(art_key(name))
+        if cell is None:
+            return None
+
+        page, x, y, w, h = cell
+        if square:
+            h = w = min(w, h)
+        source = self._page(page).subsurface((x, y, w, h))
+        surface = source if (w, h) == size else pygame.transform.smoothscale(source, size)
+        self._scaled[key] = surface
+        if len(self._scaled) > self.cache_size:
+            self._scaled.popitem(last=False)
+        return surface
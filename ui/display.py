@@ -1,14 +1,31 @@
 # External Imports
 import pygame
 import sys
-from typing import Tuple
+from functools import lru_cache
+from typing import Sequence, Tuple
 
+# Internal Imports
+from config import ART_MIN_TILE
+from ui.viewport import Viewport
+
+# Decoded once per path; card art should come from a CardAtlas instead
+@lru_cache(maxsize=64)
 def load_image(path: str) -> pygame.Surface:
     return pygame.image.load(path)
 
 def draw_card(surface: pygame.Surface, image: pygame.Surface, position: Tuple[int, int]):
     surface.blit(image, position)
 
+# Fonts are opened once per size; a fresh SysFont costs more than drawing a whole board
+@lru_cache(maxsize=None)
+def get_font(font_size: int) -> pygame.font.Font:
+    return pygame.font.SysFont(None, font_size)
+
+# Rendered text, reused for tile labels and the legend that repeat every frame
+@lru_cache(maxsize=256)
+def text_surface(text: str, font_size: int, color: Tuple[int, int, int]) -> pygame.Surface:
+    return get_font(font_size).render(text, True, color)
+
 def render_text(
     surface: pygame.Surface,
     text: str,
@@ -17,18 +34,38 @@ def render_text(
     color: Tuple[int, int] = (255, 255, 255)
     ):
 
-    font = pygame.font.SysFont(None, font_size)
-    surface.blit(font.render(text, True, color), position)
+    surface.blit(text_surface(text, font_size, tuple(color)), position)
 
-# Original dynamic renderer 
-def render_state(surface: pygame.Surface, state):
+# Default view for boards small enough to fit: 50px tiles starting 50px in from the corner
+def default_viewport(surface: pygame.Surface) -> Viewport:
+    W, H = surface.get_size()
+    return Viewport(pygame.Rect(50, 50, max(W - 50, 1), max(H - 50, 1)), tile_size=50)
+
+# A row of cards from `position`, with their art when the atlas has it
+def draw_hand(surface: pygame.Surface, cards: Sequence, position: Tuple[int, int], atlas=None,
+              card_size: Tuple[int, int] = (60, 84), gap: int = 4):
+    x, y = position
+    for card in cards:
+        rect = pygame.Rect(x, y, *card_size)
+        art = atlas.art(card.name, card_size) if atlas is not None else None
+        if art is not None:
+            surface.blit(art, rect)
+        else:
+            pygame.draw.rect(surface, (90, 90, 90), rect)
+            render_text(surface, card.name[:8], (x + 3, y + 3), font_size=14)
+        x += card_size[0] + gap
+
+# Original dynamic renderer; draws only the board chunks inside the viewport.
+# Face-up tiles show their card's art when an atlas is given and the tiles are big enough.
+def render_state(surface: pygame.Surface, state, viewport: Viewport = None, atlas=None):
     
     # Draw grid, tiles, and units based on current state.
     surface.fill((0, 0, 0))
-    tile_size = 50
-    off_x = off_y = 50
+    viewport = viewport or default_viewport(surface)
+    tile_size = viewport.tile_size
     rows = getattr(state, "rows", 5)
     cols = getattr(state, "cols", 5)
+    top, left, bottom, right = viewport.visible_cells(rows, cols)
 
     # Terrain Colors
     terrain_colors = {
@@ -42,52 +79,67 @@ def render_state(surface: pygame.Surface, state):
     "Gate":       (36, 105, 128)
     }
 
-    for r in range(rows):
-        for c in range(cols):
-            x, y = off_x + c * tile_size, off_y + r * tile_size
-            rect = pygame.Rect(x, y, tile_size - 2, tile_size - 2)
-
-            if (r, c) in state.map:
-                tile = state.map[(r, c)]
-                card = tile["card"]
-                face_up = tile.get("face_up", True)
-                if not face_up:
-                    color = (80, 80, 80)
-                
-                else:
-                    terrain = getattr(card, "terrain", "")
-                    color = terrain_colors.get(terrain, (160, 160, 160))
-                
-                pygame.draw.rect(surface, color, rect)
-                if face_up:
-                    label = (getattr(card, "terrain", "") or "?")[0]
-                    render_text(surface, label,
-                                (x + tile_size // 2 - 8, y + tile_size // 2 - 8),
-                                font_size=16)
-            
-            else:
-                pygame.draw.rect(surface, (0, 0, 0), rect)
-
-            pygame.draw.rect(surface, (60, 60, 60),
-                             (x, y, tile_size, tile_size), 1)
-
+    previous_clip = surface.get_clip()
+    surface.set_clip(viewport.rect)
+
+    # Empty cells: one rect for the visible board, then grid lines while tiles are large enough to see them
+    x0, y0 = viewport.cell_to_screen((top, left))
+    x1, y1 = viewport.cell_to_screen((bottom, right))
+    pygame.draw.rect(surface, (0, 0, 0), (x0, y0, x1 - x0, y1 - y0))
+    if tile_size >= 12:
+        for r in range(top, bottom + 1):
+            y = viewport.cell_to_screen((r, left))[1]
+            pygame.draw.line(surface, (60, 60, 60), (x0, y), (x1, y))
+        for c in range(left, right + 1):
+            x = viewport.cell_to_screen((top, c))[0]
+            pygame.draw.line(surface, (60, 60, 60), (x, y0), (x, y1))
+
+    use_art = atlas is not None and tile_size >= ART_MIN_TILE
+    for (r, c), tile in state.map.tiles_in_rect(top, left, bottom, right):
+        x, y = viewport.cell_to_screen((r, c))
+        rect = pygame.Rect(x, y, max(tile_size - 2, 1), max(tile_size - 2, 1))
+        card = tile["card"]
+        face_up = tile.get("face_up", True)
+        art = atlas.art(card.name, rect.size, square=True) if use_art and face_up else None
+        if art is not None:
+            surface.blit(art, rect)
+            continue
+        if not face_up:
+            color = (80, 80, 80)
+        
+        else:
+            terrain = getattr(card, "terrain", "")
+            color = terrain_colors.get(terrain, (160, 160, 160))
+        
+        pygame.draw.rect(surface, color, rect)
+        if face_up and tile_size >= 24:
+            label = (getattr(card, "terrain", "") or "?")[0]
+            render_text(surface, label,
+                        (x + tile_size // 2 - 8, y + tile_size // 2 - 8),
+                        font_size=16)
+
+    radius = max(tile_size // 10, 2)
     for pos, occ in state.occupants.items():
-        if not occ:
+        if not occ or not (top <= pos[0] < bottom and left <= pos[1] < right):
             continue
         
-        x, y = off_x + pos[1] * tile_size, off_y + pos[0] * tile_size
+        x, y = viewport.cell_to_screen(pos)
         
         for i, (owner, _unit) in enumerate(occ):
             color = (255, 0, 0) if owner == "Player1" else (0, 0, 255)
-            radius = 5
             dx, dy = (i % 3) * 2 * radius, (i // 3) * 2 * radius
-            pygame.draw.circle(surface, color, (x + 10 + dx, y + 10 + dy), radius)
+            pygame.draw.circle(surface, color, (x + 2 * radius + dx, y + 2 * radius + dy), radius)
+
+    surface.set_clip(previous_clip)
 
     if hasattr(state, "players"):
         p1, p2 = state.players
-        render_text(surface, f"P1: Echoes={p1.echoes} Hand={len(p1.hand)}",
+        # Projected views carry only a hand count for the opponent
+        p1_hand = getattr(p1, "hand_count", len(p1.hand))
+        p2_hand = getattr(p2, "hand_count", len(p2.hand))
+        render_text(surface, f"P1: Echoes={p1.echoes} Hand={p1_hand}",
                     (10, 10), font_size=20)
-        render_text(surface, f"P2: Echoes={p2.echoes} Hand={len(p2.hand)}",
+        render_text(surface, f"P2: Echoes={p2.echoes} Hand={p2_hand}",
                     (400, 10), font_size=20)
 
 # Static background 
@@ -160,11 +212,18 @@ def draw_board_background(surface: pygame.Surface):
         render_text(surface, text, (legend_left + 8, y + 6),
                     font_size=22, color=(0, 0, 0))
 
+# The static background painted once per surface size, so each frame is a single blit
+@lru_cache(maxsize=8)
+def board_background(size: Tuple[int, int]) -> pygame.Surface:
+    background = pygame.Surface(size)
+    background.fill((255, 255, 255))
+    draw_board_background(background)
+    return background
+
 # Wrapper 
 _original_render_state = render_state
-def render_state(surface: pygame.Surface, state):
-    surface.fill((255, 255, 255))
-    draw_board_background(surface)
-    _original_render_state(surface, state)
+def render_state(surface: pygame.Surface, state, viewport: Viewport = None, atlas=None):
+    surface.blit(board_background(surface.get_size()), (0, 0))
+    _original_render_state(surface, state, viewport, atlas)
 
 sys.modules[__name__].render_state = render_state
\ No newline at end of file
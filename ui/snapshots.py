@@ -0,0 +1,162 @@
+# External Imports
+import logging
+import multiprocessing
+import os
+import pickle
+import struct
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+import pygame
+
+# Internal Imports
+from config import ATLAS_DIR, SNAPSHOT_RENDER_SIZE, SNAPSHOT_SIZE, SNAPSHOT_PNG_LEVEL, SNAPSHOT_CHUNK_SIZE
+from game.views import GameView, project_state
+from ui.atlas import CardAtlas
+from ui.display import render_state, board_background, get_font
+from ui.viewport import Viewport
+
+# Font sizes render_state and the board background draw with
+FONT_SIZES = (14, 16, 20, 22)
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+def _png_chunk(tag: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data))
+
+# An RGB PNG of the surface with unfiltered rows. Boards are large flat colours, so fast zlib
+# settings stay small, and this is a fraction of the cost of pygame.image.save.
+def encode_png(surface: pygame.Surface, level: int = SNAPSHOT_PNG_LEVEL) -> bytes:
+    w, h = surface.get_size()
+    pixels = pygame.image.tobytes(surface, "RGB")
+    stride = w * 3
+    rows = b"".join(b"\x00" + pixels[i:i + stride] for i in range(0, len(pixels), stride))
+    return (PNG_SIGNATURE
+            + _png_chunk(b"IHDR", struct.pack(">IIBBBBB", w, h, 8, 2, 0, 0, 0))
+            + _png_chunk(b"IDAT", zlib.compress(rows, level))
+            + _png_chunk(b"IEND", b""))
+
+# Start pygame with no window: the SDL dummy driver, and a 1x1 display so surfaces and atlas
+# pages can be converted to a display format
+def init_headless():
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((1, 1))
+
+# Draws states offscreen at render_size and encodes them as PNGs of `size`.
+# Needs pygame started, by init_headless or a live window.
+class BoardSnapshotter:
+    def __init__(self, render_size: Tuple[int, int] = SNAPSHOT_RENDER_SIZE, size: Tuple[int, int] = SNAPSHOT_SIZE,
+                 atlas: Optional[CardAtlas] = None):
+        self.render_size = tuple(render_size)
+        self.size = tuple(size)
+        self.atlas = atlas
+        self.canvas = pygame.Surface(self.render_size).convert()
+        self.thumbnail = pygame.Surface(self.size).convert() if self.size != self.render_size else None
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    # Open the fonts and paint the background now rather than on the first snapshot
+    def warm(self):
+        for font_size in FONT_SIZES:
+            get_font(font_size)
+        board_background(self.render_size)
+
+    # Tiles as large as the client's (50px) or small enough for the whole board to fit
+    def viewport(self, state) -> Viewport:
+        W, H = self.render_size
+        rows, cols = getattr(state, "rows", 5), getattr(state, "cols", 5)
+        tile_size = max(min(50, (W - 50) // max(cols, 1), (H - 50) // max(rows, 1)), Viewport.MIN_TILE)
+        return Viewport(pygame.Rect(50, 50, max(W - 50, 1), max(H - 50, 1)), tile_size=tile_size)
+
+    def draw(self, state) -> pygame.Surface:
+        render_state(self.canvas, state, self.viewport(state), self.atlas)
+        if self.thumbnail is None:
+            return self.canvas
+        return pygame.transform.smoothscale(self.canvas, self.size, self.thumbnail)
+
+    def png(self, state) -> bytes:
+        return encode_png(self.draw(state))
+
+# Each pool worker's snapshotter, built once by _init_worker
+_snapshotter: Optional[BoardSnapshotter] = None
+
+def _init_worker(render_size, size, atlas_dir):
+    global _snapshotter
+    init_headless()
+    atlas = CardAtlas.load(atlas_dir) if atlas_dir is not None else None
+    _snapshotter = BoardSnapshotter(render_size, size, atlas)
+    _snapshotter.warm()
+
+def _render_chunk(payloads: List[bytes]) -> List[bytes]:
+    return [_snapshotter.png(pickle.loads(payload)) for payload in payloads]
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# PNG snapshots of many states across worker processes, each with its fonts, background and
+# atlas ready before the first state arrives. Use as a context manager, or call close().
+class SnapshotRenderer:
+    def __init__(self, workers: Optional[int] = None, render_size: Tuple[int, int] = SNAPSHOT_RENDER_SIZE,
+                 size: Tuple[int, int] = SNAPSHOT_SIZE, atlas_dir=ATLAS_DIR, chunk_size: int = SNAPSHOT_CHUNK_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        # A parent with a live window would hand forked workers its display, so they start fresh
+        context = multiprocessing.get_context("spawn") if pygame.display.get_init() else None
+        self.executor = ProcessPoolExecutor(self.workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(tuple(render_size), tuple(size), atlas_dir))
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    # PNG bytes for each state, in order. GameStates are projected for `viewer` (None for a
+    # spectator) and pickled as they are read, so a state advanced in place, as Replayer.states
+    # yields it, can be passed straight in. Two chunks per worker are kept in flight.
+    def render(self, states: Iterable, viewer: Optional[str] = None) -> Iterator[bytes]:
+        payloads = (pickle.dumps(state if isinstance(state, GameView) else project_state(state, viewer),
+                                 pickle.HIGHEST_PROTOCOL) for state in states)
+        pending = deque()
+        for chunk in _chunks(payloads, self.chunk_size):
+            pending.append(self.executor.submit(_render_chunk, chunk))
+            if len(pending) >= 2 * self.workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+    # Write each (name, state) pair's snapshot to directory/<name>.png and return the paths
+    def save(self, items: Iterable[Tuple[str, object]], directory, viewer: Optional[str] = None) -> List[Path]:
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        names = deque()
+
+        def states():
+            for name, state in items:
+                names.append(name)
+                yield state
+
+        paths = []
+        for png in self.render(states(), viewer):
+            path = directory / f"{names.popleft()}.png"
+            path.write_bytes(png)
+            paths.append(path)
+        self.logger.info("Wrote %d snapshots to %s", len(paths), directory)
+        return paths
@@ -0,0 +1,85 @@
+# External Imports
+import pygame
+from typing import Tuple
+
+# Internal Imports
+from utils import clamp
+
+# Window onto the board in screen space; pans with the arrow keys or a right-drag, zooms with the wheel
+class Viewport:
+    MIN_TILE = 6
+    MAX_TILE = 96
+    PAN_STEP = 4  # tiles per arrow key press
+
+    def __init__(self, rect: pygame.Rect, tile_size: int = 50):
+        self.rect = pygame.Rect(rect)
+        self.tile_size = tile_size
+        # Board pixel coordinate shown at the top-left corner of `rect`
+        self.scroll_x = 0.0
+        self.scroll_y = 0.0
+        self._dragging = False
+
+    # Rows/cols range [top, bottom) x [left, right) that is at least partly on screen
+    def visible_cells(self, rows: int, cols: int) -> Tuple[int, int, int, int]:
+        top = int(self.scroll_y // self.tile_size)
+        left = int(self.scroll_x // self.tile_size)
+        bottom = int((self.scroll_y + self.rect.height) // self.tile_size) + 1
+        right = int((self.scroll_x + self.rect.width) // self.tile_size) + 1
+        return max(top, 0), max(left, 0), min(bottom, rows), min(right, cols)
+
+    def cell_to_screen(self, pos) -> Tuple[int, int]:
+        return (int(self.rect.x + pos[1] * self.tile_size - self.scroll_x),
+                int(self.rect.y + pos[0] * self.tile_size - self.scroll_y))
+
+    def screen_to_cell(self, point) -> Tuple[int, int]:
+        return (int((point[1] - self.rect.y + self.scroll_y) // self.tile_size),
+                int((point[0] - self.rect.x + self.scroll_x) // self.tile_size))
+
+    def pan(self, dx: float, dy: float):
+        self.scroll_x += dx
+        self.scroll_y += dy
+
+    # Zoom keeping the board point under `anchor` (a screen position) fixed
+    def zoom(self, factor: float, anchor=None):
+        ax, ay = anchor if anchor is not None else self.rect.center
+        new_size = int(clamp(round(self.tile_size * factor), self.MIN_TILE, self.MAX_TILE))
+        if new_size == self.tile_size:
+            return
+        board_x = (ax - self.rect.x + self.scroll_x) / self.tile_size
+        board_y = (ay - self.rect.y + self.scroll_y) / self.tile_size
+        self.tile_size = new_size
+        self.scroll_x = board_x * new_size - (ax - self.rect.x)
+        self.scroll_y = board_y * new_size - (ay - self.rect.y)
+
+    def center_on(self, pos):
+        self.scroll_x = (pos[1] + 0.5) * self.tile_size - self.rect.width / 2
+        self.scroll_y = (pos[0] + 0.5) * self.tile_size - self.rect.height / 2
+
+    # Keep at least part of the board on screen
+    def clamp_to(self, rows: int, cols: int):
+        self.scroll_x = clamp(self.scroll_x, -self.rect.width / 2, cols * self.tile_size - self.rect.width / 2)
+        self.scroll_y = clamp(self.scroll_y, -self.rect.height / 2, rows * self.tile_size - self.rect.height / 2)
+
+    # Apply a pygame event; returns True when the view changed and needs redrawing
+    def handle_event(self, event) -> bool:
+        if event.type == pygame.KEYDOWN:
+            step = self.PAN_STEP * self.tile_size
+            moves = {pygame.K_LEFT: (-step, 0), pygame.K_RIGHT: (step, 0),
+                     pygame.K_UP: (0, -step), pygame.K_DOWN: (0, step)}
+            if event.key in moves:
+                self.pan(*moves[event.key])
+                return True
+            if event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_MINUS):
+                self.zoom(1.25 if event.key != pygame.K_MINUS else 0.8)
+                return True
+        elif event.type == pygame.MOUSEWHEEL:
+            self.zoom(1.25 if event.y > 0 else 0.8, pygame.mouse.get_pos())
+            return True
+        elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 3:
+            self._dragging = True
+        elif event.type == pygame.MOUSEBUTTONUP and event.button == 3:
+            self._dragging = False
+        elif event.type == pygame.MOUSEMOTION and self._dragging:
+            self.pan(-event.rel[0], -event.rel[1])
+            return True
+        return False